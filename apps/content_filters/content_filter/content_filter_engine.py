@@ -0,0 +1,125 @@
+# -*- coding: utf-8; -*-
+#
+# This file is part of Superdesk.
+#
+# Copyright 2013 - 2018 Sourcefabric z.u. and contributors.
+#
+# For the full copyright and license information, please see the
+# AUTHORS and LICENSE files distributed with this source code, or
+# at https://www.sourcefabric.org/superdesk/license
+
+from eve.utils import config
+from apps.content_filters.filter_condition.filter_condition import FilterCondition
+
+
+class ContentFilterEngine:
+    """Compiled content filters.
+
+    Filter conditions and content filters are compiled into predicates on first use
+    and kept for the lifetime of the engine, so it should be recreated when
+    filters are modified.
+
+    :param dict filters: filters in format returned by ``EnqueueService.get_filters``
+    """
+
+    def __init__(self, filters):
+        self.filter_conditions = {
+            _id: value.get('fc') for _id, value in (filters or {}).get('filter_conditions', {}).items()
+        }
+        self.content_filters = {
+            _id: value.get('cf') for _id, value in (filters or {}).get('content_filters', {}).items()
+        }
+        self._compiled_conditions = {}
+        self._compiled_filters = {}
+
+    def matcher(self, article):
+        """Get matcher for given article.
+
+        Matcher memoizes results of filter conditions and content filters,
+        so it should be used only while the article is not modified.
+
+        :param dict article: article to test
+        """
+        return ContentFilterMatcher(self, article)
+
+    def does_match(self, content_filter, article):
+        return self.matcher(article).does_match(content_filter)
+
+    def get_condition(self, condition_id):
+        try:
+            return self._compiled_conditions[condition_id]
+        except KeyError:
+            predicate = FilterCondition.parse(self.filter_conditions.get(condition_id)).compile()
+            self._compiled_conditions[condition_id] = predicate
+            return predicate
+
+    def get_filter(self, filter_id):
+        try:
+            return self._compiled_filters[filter_id]
+        except KeyError:
+            predicate = self.compile(self.content_filters.get(filter_id))
+            self._compiled_filters[filter_id] = predicate
+            return predicate
+
+    def compile(self, content_filter):
+        """Compile content filter into predicate.
+
+        Predicate is a function taking :class:`ContentFilterMatcher` as parameter.
+
+        :param dict content_filter: content filter
+        """
+        if not content_filter:
+            return lambda matcher: True  # a non-existing filter matches every thing
+
+        expressions = []
+        for expression in content_filter.get('content_filter', []):
+            expressions.append((
+                tuple(expression.get('expression', {}).get('fc', [])),
+                tuple(expression.get('expression', {}).get('pf', [])),
+            ))
+
+        def predicate(matcher):
+            return any(
+                all(matcher.condition_match(f) for f in fc) and all(matcher.filter_match(f) for f in pf)
+                for fc, pf in expressions
+            )
+
+        return predicate
+
+
+class ContentFilterMatcher:
+    """Evaluate content filters for single article using memoized results."""
+
+    def __init__(self, engine, article):
+        self.engine = engine
+        self.article = article
+        self._conditions = {}
+        self._filters = {}
+
+    def condition_match(self, condition_id):
+        try:
+            return self._conditions[condition_id]
+        except KeyError:
+            result = self.engine.get_condition(condition_id)(self.article)
+            self._conditions[condition_id] = result
+            return result
+
+    def filter_match(self, filter_id):
+        try:
+            return self._filters[filter_id]
+        except KeyError:
+            result = self.engine.get_filter(filter_id)(self)
+            self._filters[filter_id] = result
+            return result
+
+    def does_match(self, content_filter):
+        """Test if article matches given content filter.
+
+        :param dict content_filter: content filter
+        """
+        if not content_filter:
+            return True
+        filter_id = content_filter.get(config.ID_FIELD)
+        if filter_id is not None and filter_id in self.engine.content_filters:
+            return self.filter_match(filter_id)
+        return self.engine.compile(content_filter)(self)
@@ -12,7 +12,10 @@ from eve.utils import ParsedRequest
 import json
 import os
 
+from unittest import mock
+
 from apps.content_filters.content_filter.content_filter_service import ContentFilterService
+from apps.content_filters.content_filter.content_filter_engine import ContentFilterEngine
 from apps.prepopulate.app_populate import AppPopulateCommand
 from superdesk import get_backend, get_resource_service
 from superdesk.errors import SuperdeskApiError
@@ -450,6 +453,41 @@ class FilteringDataTests(ContentFilterTests):
             self.assertFalse(self.f.does_match(doc, self.articles[4]))
             self.assertFalse(self.f.does_match(doc, self.articles[5]))
 
+    def _get_filters(self):
+        return {
+            'filter_conditions': {fc['_id']: {'fc': fc}
+                                  for fc in get_resource_service('filter_conditions').get(req=None, lookup={})},
+            'content_filters': {cf['_id']: {'cf': cf}
+                                for cf in get_resource_service('content_filters').get(req=None, lookup={})},
+        }
+
+    def test_engine_does_match_same_as_service(self):
+        with self.app.app_context():
+            filters = self._get_filters()
+            engine = ContentFilterEngine(filters)
+            for value in filters['content_filters'].values():
+                for article in self.articles:
+                    self.assertEqual(self.f.does_match(value['cf'], article),
+                                     engine.does_match(value['cf'], article))
+
+    def test_engine_matcher_evaluates_each_condition_once(self):
+        with self.app.app_context():
+            engine = ContentFilterEngine(self._get_filters())
+            matcher = engine.matcher(self.articles[4])
+            with mock.patch.object(engine, 'get_condition', wraps=engine.get_condition) as get_condition:
+                # filter 3 uses pf 1 and fc 2, filter 2 uses fc 4 and 3
+                for _ in range(10):
+                    self.assertFalse(matcher.does_match({'_id': 3}))
+                    self.assertFalse(matcher.does_match({'_id': 2}))
+                    self.assertFalse(matcher.filter_match(1))
+                self.assertEqual(4, get_condition.call_count)
+
+    def test_engine_missing_pf_matches(self):
+        with self.app.app_context():
+            engine = ContentFilterEngine(self._get_filters())
+            doc = {'content_filter': [{"expression": {"pf": ['missing']}}]}
+            self.assertTrue(engine.does_match(doc, self.articles[0]))
+
     def test_if_pf_is_used(self):
         with self.app.app_context():
             self.assertTrue(self.f._get_content_filters_by_content_filter(1).count() == 1)
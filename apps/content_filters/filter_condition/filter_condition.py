@@ -52,14 +52,33 @@ class FilterCondition:
         return self.operator.contains_not()
 
     def does_match(self, article):
+        return self.compile()(article)
 
-        if not self.field.is_in_article(article):
-            return type(self.operator) is NotInOperator or \
-                type(self.operator) is NotLikeOperator or \
-                self.operator.operator is FilterConditionOperatorsEnum.ne or \
-                (self.operator.operator is FilterConditionOperatorsEnum.eq and
-                 self.value.value.lower() in ("no", "false", "f", "0"))
+    def compile(self):
+        """Compile the condition into a predicate function.
 
-        article_value = self.field.get_value(article)
-        filter_value = self.value.get_value(self.field, self.operator)
-        return self.operator.does_match(article_value, filter_value)
+        The filter value (including the regular expressions) is computed only once
+        so the returned function can be evaluated against many articles cheaply.
+
+        :return: function taking an article and returning True if it matches the condition
+        """
+        field = self.field
+        operator = self.operator
+        missing_match = self._does_match_missing_field()
+        filter_value = []  # computed on first use, it might fail for invalid values
+
+        def predicate(article):
+            if not field.is_in_article(article):
+                return missing_match
+            if not filter_value:
+                filter_value.append(self.value.get_value(field, operator))
+            return operator.does_match(field.get_value(article), filter_value[0])
+
+        return predicate
+
+    def _does_match_missing_field(self):
+        return type(self.operator) is NotInOperator or \
+            type(self.operator) is NotLikeOperator or \
+            self.operator.operator is FilterConditionOperatorsEnum.ne or \
+            (self.operator.operator is FilterConditionOperatorsEnum.eq and
+             self.value.value.lower() in ("no", "false", "f", "0"))
@@ -1,13 +1,17 @@
 
 import superdesk
 from .content_types import ContentTypesResource, ContentTypesService, CONTENT_TYPE_PRIVILEGE
-from .content_types import apply_schema  # noqa
+from .content_types import apply_schema, clear_schema_cache  # noqa
 
 
 def init_app(app):
     endpoint_name = 'content_types'
     service = ContentTypesService(endpoint_name, backend=superdesk.get_backend())
     ContentTypesResource(endpoint_name, app=app, service=service)
+    app.on_inserted_content_types += clear_schema_cache
+    app.on_updated_content_types += clear_schema_cache
+    app.on_replaced_content_types += clear_schema_cache
+    app.on_deleted_item_content_types += clear_schema_cache
     superdesk.privilege(name=CONTENT_TYPE_PRIVILEGE,
                         label='Content Profile',
                         description='Manage content profiles')
@@ -4,8 +4,10 @@ import bson
 import superdesk
 
 from eve.utils import config
+from flask import current_app as app
 from copy import deepcopy
 from superdesk import get_resource_service
+from superdesk.cache import LocalCache
 from superdesk.errors import SuperdeskApiError
 from superdesk.default_schema import DEFAULT_SCHEMA, DEFAULT_EDITOR
 from apps.auth import get_user_id
@@ -485,6 +487,50 @@ def is_enabled(field, schema):
     return schema.get(field) or schema.get(field) == {} or field not in DEFAULT_SCHEMA or field in REQUIRED_FIELDS
 
 
+#: fields disabled per profile id
+_disabled_fields_cache = LocalCache(1000, 60)
+
+
+def get_disabled_fields(schema):
+    """Get fields which are not enabled using given schema.
+
+    :param schema: schema dict
+    """
+    return frozenset(field for field in DEFAULT_SCHEMA if not is_enabled(field, schema))
+
+
+def get_profile_disabled_fields(profile):
+    """Get fields which are not enabled in given profile.
+
+    Fields are cached for ``CONTENT_PROFILE_CACHE_TTL`` seconds, changes
+    of content profiles made via this process clear the cache immediately.
+
+    :param profile: profile id
+    """
+    disabled = _disabled_fields_cache.get(profile)
+    if disabled is not None:
+        return disabled
+    schema = DEFAULT_SCHEMA
+    if profile:
+        try:
+            schema = get_resource_service('content_types').find_one(req=None, _id=profile)['schema']
+        except Exception:
+            pass
+    disabled = get_disabled_fields(schema)
+    ttl = app.config.get('CONTENT_PROFILE_CACHE_TTL', 60)
+    if ttl:
+        _disabled_fields_cache.set(profile, disabled, ttl)
+    return disabled
+
+
+def clear_schema_cache(*args, **kwargs):
+    """Drop cached profile fields.
+
+    Can be used as eve event hook.
+    """
+    _disabled_fields_cache.clear()
+
+
 def apply_schema(item):
     """Return item without fields that should not be there given it's profile.
 
@@ -492,9 +538,5 @@ def apply_schema(item):
     """
     if item.get('type') == 'event':
         return item.copy()
-    try:
-        profile = get_resource_service('content_types').find_one(req=None, _id=item['profile'])
-        schema = profile['schema']
-    except Exception:
-        schema = DEFAULT_SCHEMA
-    return {key: val for key, val in item.items() if is_enabled(key, schema)}
+    disabled = get_profile_disabled_fields(item.get('profile'))
+    return {key: val for key, val in item.items() if key not in disabled}
@@ -15,7 +15,7 @@ import collections
 
 from flask import json, current_app as app, request
 from simplejson.errors import JSONDecodeError
-from eve.utils import config
+from eve.utils import config, ParsedRequest
 
 from superdesk.errors import SuperdeskApiError
 from superdesk.services import BaseService
@@ -192,13 +192,14 @@ class DictionaryService(BaseService):
         if lang and lang.find('-') > 0:
             return lang.split('-')[0]
 
-    def get_dictionaries(self, lang):
+    def get_dictionaries(self, lang, projection=None):
         """Returns all the active dictionaries.
 
         If both the language (en-AU)
         and the base language (en) available, it will return the dict with language
 
         :param lang:
+        :param projection: optional fields projection
         :return:
         """
         languages = [{'language_id': lang}]
@@ -209,7 +210,11 @@ class DictionaryService(BaseService):
         lookup = {'$and': [{'$or': languages},
                            {'$or': [{'is_active': {'$exists': 0}}, {'is_active': 'true'}]},
                            {'$or': [{'type': {'$exists': 0}}, {'type': DictionaryType.DICTIONARY.value}]}]}
-        dicts = list(self.get(req=None, lookup=lookup))
+        req = ParsedRequest()
+        if projection:
+            projection.setdefault('language_id', 1)
+            req.projection = json.dumps(projection)
+        dicts = list(self.get(req=req, lookup=lookup))
         langs = [d['language_id'] for d in dicts]
 
         if base_language and base_language in langs and lang in langs:
@@ -233,6 +238,17 @@ class DictionaryService(BaseService):
                 add_word(model, word, count)
         return model
 
+    def get_model_version(self, lang):
+        """Get version of model for given language.
+
+        It changes whenever any of the dictionaries used for the model is modified,
+        without fetching dictionaries content.
+
+        :param lang: language code
+        """
+        dicts = self.get_dictionaries(lang, projection={'_etag': 1, '_updated': 1})
+        return sorted((str(_dict[config.ID_FIELD]), _dict.get('_etag'), str(_dict.get('_updated'))) for _dict in dicts)
+
     def on_update(self, updates, original):
         if 'content' in updates:
             # works around Eve behaviour which creates sub-dict on each "." it finds in keys
@@ -475,6 +475,42 @@ class UpdateIngestTest(TestCase):
         self.assertEqual(elastic_item['unique_id'], 1)
         self.assertEqual(elastic_item['unique_name'], '#1')
 
+    def test_ingest_items_bulk_write(self):
+        provider, provider_service = self.setup_reuters_provider()
+        items = provider_service.fetch_ingest(reuters_guid)
+        for item in items:
+            item['expiry'] = utcnow() + timedelta(hours=11)
+
+        ingest_service = get_resource_service('ingest')
+        elastic = self.app.data._search_backend('ingest')
+        with patch.dict(self.app.config, {'INGEST_BULK_WRITE': True}):
+            with patch.object(ingest_service, 'find_one', wraps=ingest_service.find_one) as find_one:
+                failed = self.ingest_items(items, provider, provider_service)
+            self.assertEqual(set(), failed)
+            find_one.assert_not_called()
+            for item in items:
+                self.assertIsNotNone(elastic.find_one('ingest', _id=item['_id'], req=None))
+
+            updated = provider_service.fetch_ingest(reuters_guid)[:1]
+            updated[0]['expiry'] = utcnow() + timedelta(hours=11)
+            updated[0]['headline'] = 'Updated headline'
+            self.assertEqual(set(), self.ingest_items(updated, provider, provider_service))
+
+        self.assertEqual(items[0]['_id'], updated[0]['_id'])
+        elastic_item = elastic.find_one('ingest', _id=items[0]['_id'], req=None)
+        self.assertEqual('Updated headline', elastic_item['headline'])
+        self.assertIn('unique_id', elastic_item)
+
+    def test_bulk_write_in_mongo_isolates_failures(self):
+        ingest_service = get_resource_service('ingest')
+        self.app.data.insert('ingest', [{'_id': 'existing', 'guid': 'existing'}])
+        failed = ingest_service.bulk_write_in_mongo([
+            {'_id': 'existing', 'guid': 'existing'},
+            {'_id': 'new', 'guid': 'new'},
+        ], [])
+        self.assertEqual({'existing'}, failed)
+        self.assertIsNotNone(ingest_service.find_one(req=None, _id='new'))
+
     def test_get_article_ids(self):
         provider_name = 'reuters'
         provider, provider_service = self.setup_reuters_provider()
@@ -504,6 +540,36 @@ class UpdateIngestTest(TestCase):
         self.ingest_items(items, provider, provider_service)
         self.assertTrue(len(items[0]['anpa_category']) == 0)
 
+    def test_vocabularies_are_loaded_once_per_update(self):
+        vocab = [{'_id': 'iptc_category_map',
+                  'items': [{'name': 'Finance', 'category': 'f', 'qcode': '04000000', 'is_active': True}]},
+                 {'_id': 'categories',
+                  'items': [{'is_active': True, 'name': 'Finance', 'qcode': 'f', 'subject': '04000000'}]}]
+        self.app.data.insert('vocabularies', vocab)
+
+        vocabularies = ingest.IngestVocabularies().refresh()
+        items = [{'subject': [{'qcode': '04006002'}]} for i in range(10)]
+        items.extend({'anpa_category': [{'qcode': 'F'}, {'qcode': 'x'}]} for i in range(10))
+        with patch.object(get_resource_service('vocabularies'), 'find_one') as find_one:
+            for item in items:
+                if 'subject' in item:
+                    ingest.process_iptc_codes(item, {})
+                    ingest.derive_category(item, {}, vocabularies)
+                else:
+                    ingest.process_anpa_category(item, {}, vocabularies)
+                    ingest.derive_subject(item, vocabularies)
+            vocabularies.refresh()
+            find_one.assert_not_called()
+
+        self.assertEqual(['04006002', '04000000', '04006000'], [s['qcode'] for s in items[0]['subject']])
+        self.assertEqual([{'qcode': 'f', 'name': 'Finance'}], items[0]['anpa_category'])
+        self.assertEqual([{'qcode': 'f', 'name': 'Finance'}], items[-1]['anpa_category'])
+        self.assertEqual('04000000', items[-1]['subject'][0]['qcode'])
+
+        get_resource_service('vocabularies').patch('categories', {
+            'items': [{'is_active': True, 'name': 'Money', 'qcode': 'f'}]})
+        self.assertEqual('Money', vocabularies.refresh().categories['f']['name'])
+
     def setup_reuters_provider(self):
         provider_name = 'reuters'
         provider = get_resource_service('ingest_providers').find_one(name=provider_name, req=None)
@@ -12,6 +12,7 @@ import logging
 import json
 
 from bson.objectid import ObjectId
+from concurrent.futures import ThreadPoolExecutor
 
 import superdesk
 from copy import deepcopy
@@ -41,9 +42,18 @@ def is_legal_archive_enabled():
 
 
 class LegalArchiveImport:
+    """Import of items into legal archive.
+
+    User, desk and stage names used for de-normalizing are cached for the lifetime
+    of the instance, so use single instance when importing multiple items.
+    """
+
     log_msg_format = "{{'_id': {_id}, 'unique_name': {unique_name}, 'version': {_current_version}, " \
                      "'expired_on': {expiry}}}."
 
+    def __init__(self):
+        self._names = {}
+
     def upsert_into_legal_archive(self, item_id):
         """Once publish actions are performed on the article do the below:
 
@@ -56,130 +66,165 @@ class LegalArchiveImport:
         :param dict item_id: id of the document from 'archive' collection.
         """
         try:
+            legal_item = self.prepare_legal_archive_item(item_id)
+            if legal_item:
+                self.save_legal_archive_items([legal_item])
+        except Exception:
+            logger.exception('Failed to import into legal archive {}.'.format(item_id))
+            raise
+
+    def prepare_legal_archive_item(self, item_id):
+        """Get de-normalized legal archive doc, its versions and history to be inserted.
+
+        Nothing is written into legal archive, use :meth:`save_legal_archive_items` for that.
+
+        :param item_id: id of the document from 'archive' collection.
+        :return dict: ``doc``, ``legal_archive_doc``, ``update``, ``versions`` and ``history``
+            or ``None`` if item is not found
+        """
+        logger.info('Import item into legal {}.'.format(item_id))
+
+        doc = get_resource_service(ARCHIVE).find_one(req=None, _id=item_id)
+
+        if not doc:
+            logger.error('Could not find the document {} to import to legal archive.'.format(item_id))
+            return
+
+        # setting default values in case they are missing other log message will fail.
+        doc.setdefault('unique_name', 'NO UNIQUE NAME')
+        doc.setdefault(config.VERSION, 1)
+        doc.setdefault('expiry', utcnow())
+
+        if not doc.get(ITEM_STATE) in \
+                {CONTENT_STATE.PUBLISHED, CONTENT_STATE.CORRECTED, CONTENT_STATE.KILLED, CONTENT_STATE.RECALLED}:
+            # at times we have seen that item is published but the item is different in the archive collection
+            # this will notify admins about the issue but proceed to move the item into legal archive.
+            msg = 'Invalid state: {}. Moving the item to legal archive. item: {}'.\
+                format(doc.get(ITEM_STATE), self.log_msg_format.format(**doc))
+            logger.error(msg)
+            update_notifiers(ACTIVITY_ERROR, msg=msg, resource=ARCHIVE)
+
+        # required for behave test.
+        legal_archive_doc = deepcopy(doc)
+        legal_archive_service = get_resource_service(LEGAL_ARCHIVE_NAME)
+        legal_archive_versions_service = get_resource_service(LEGAL_ARCHIVE_VERSIONS_NAME)
+        legal_archive_history_service = get_resource_service(LEGAL_ARCHIVE_HISTORY_NAME)
+
+        log_msg = self.log_msg_format.format(**legal_archive_doc)
+        version_id_field = versioned_id_field(app.config['DOMAIN'][ARCHIVE])
+        logger.info('Preparing Article to be inserted into Legal Archive ' + log_msg)
+
+        # Removing irrelevant properties
+        legal_archive_doc.pop(config.ETAG, None)
+        legal_archive_doc.pop('lock_user', None)
+        legal_archive_doc.pop('lock_session', None)
+        legal_archive_doc.pop('lock_time', None)
+        legal_archive_doc.pop('lock_action', None)
+
+        logger.info('Removed irrelevant properties from the article {}'.format(log_msg))
+
+        # Step 1
+        article_in_legal_archive = legal_archive_service.find_one(req=None, _id=legal_archive_doc[config.ID_FIELD])
+
+        if article_in_legal_archive and \
+           article_in_legal_archive.get(config.VERSION, 0) > legal_archive_doc.get(config.VERSION):
+            logger.info('Item {} version: {} already in legal archive. Legal Archive document version {}'.format(
+                legal_archive_doc.get(config.ID_FIELD), legal_archive_doc.get(config.VERSION),
+                article_in_legal_archive.get(config.VERSION)
+            ))
+            return {'doc': doc, 'legal_archive_doc': None, 'update': False, 'versions': [], 'history': []}
+
+        # Step 2 - De-normalizing the legal archive doc
+        self._denormalize_user_desk(legal_archive_doc, log_msg)
+        logger.info('De-normalized article {}'.format(log_msg))
+
+        # Step 4 - Get Versions and De-normalize Legal Archive Versions
+        lookup = {version_id_field: legal_archive_doc[config.ID_FIELD]}
+        versions = list(get_resource_service('archive_versions').get(req=None, lookup=lookup))
+        legal_versions = list(legal_archive_versions_service.get(req=None, lookup=lookup))
+
+        logger.info('Fetched version history for article {}'.format(log_msg))
+        legal_version_numbers = {legal_version[config.VERSION] for legal_version in legal_versions}
+        versions_to_insert = [version for version in versions
+                              if version[config.VERSION] not in legal_version_numbers]
+
+        # Step 5 - Get History and de-normalize Legal Archive History
+        lookup = {'item_id': legal_archive_doc[config.ID_FIELD]}
+        history_items = list(get_resource_service('archive_history').get(req=None, lookup=lookup))
+        legal_history_items = list(legal_archive_history_service.get(req=None, lookup=lookup))
+
+        logger.info('Fetched history for article {}'.format(log_msg))
+        legal_history_ids = {legal_history[config.ID_FIELD] for legal_history in legal_history_items}
+        history_to_insert = [history for history in history_items
+                             if history[config.ID_FIELD] not in legal_history_ids]
+
+        # This happens when user kills an article from Dusty Archive
+        if article_in_legal_archive and \
+           article_in_legal_archive[config.VERSION] < legal_archive_doc[config.VERSION] and \
+           len(versions_to_insert) == 0:
+
+            resource_def = app.config['DOMAIN'][ARCHIVE]
+            versioned_doc = deepcopy(legal_archive_doc)
+            versioned_doc[versioned_id_field(resource_def)] = legal_archive_doc[config.ID_FIELD]
+            versioned_doc[config.ID_FIELD] = ObjectId()
+            versions_to_insert.append(versioned_doc)
+
+        for version_doc in versions_to_insert:
+            self._denormalize_user_desk(version_doc,
+                                        self.log_msg_format.format(_id=version_doc[version_id_field],
+                                                                   unique_name=version_doc.get('unique_name'),
+                                                                   _current_version=version_doc[config.VERSION],
+                                                                   expiry=version_doc.get('expiry')))
+            version_doc.pop(config.ETAG, None)
+
+        for history_doc in history_to_insert:
+            self._denormalize_history(history_doc)
+            history_doc.pop(config.ETAG, None)
+
+        return {
+            'doc': doc,
+            'legal_archive_doc': legal_archive_doc,
+            'update': bool(article_in_legal_archive),
+            'versions': versions_to_insert,
+            'history': history_to_insert,
+        }
+
+    def save_legal_archive_items(self, legal_items):
+        """Write items prepared via :meth:`prepare_legal_archive_item` into legal archive.
+
+        New legal archive docs, versions and history of all items are inserted using single
+        insert per collection, only existing legal archive docs are replaced one by one.
+        Items are flagged as moved to legal once all is written.
 
-            logger.info('Import item into legal {}.'.format(item_id))
-
-            doc = get_resource_service(ARCHIVE).find_one(req=None, _id=item_id)
-
-            if not doc:
-                logger.error('Could not find the document {} to import to legal archive.'.format(item_id))
-                return
-
-            # setting default values in case they are missing other log message will fail.
-            doc.setdefault('unique_name', 'NO UNIQUE NAME')
-            doc.setdefault(config.VERSION, 1)
-            doc.setdefault('expiry', utcnow())
-
-            if not doc.get(ITEM_STATE) in \
-                    {CONTENT_STATE.PUBLISHED, CONTENT_STATE.CORRECTED, CONTENT_STATE.KILLED, CONTENT_STATE.RECALLED}:
-                # at times we have seen that item is published but the item is different in the archive collection
-                # this will notify admins about the issue but proceed to move the item into legal archive.
-                msg = 'Invalid state: {}. Moving the item to legal archive. item: {}'.\
-                    format(doc.get(ITEM_STATE), self.log_msg_format.format(**doc))
-                logger.error(msg)
-                update_notifiers(ACTIVITY_ERROR, msg=msg, resource=ARCHIVE)
-
-            # required for behave test.
-            legal_archive_doc = deepcopy(doc)
-            legal_archive_service = get_resource_service(LEGAL_ARCHIVE_NAME)
-            legal_archive_versions_service = get_resource_service(LEGAL_ARCHIVE_VERSIONS_NAME)
-            legal_archive_history_service = get_resource_service(LEGAL_ARCHIVE_HISTORY_NAME)
-
-            log_msg = self.log_msg_format.format(**legal_archive_doc)
-            version_id_field = versioned_id_field(app.config['DOMAIN'][ARCHIVE])
-            logger.info('Preparing Article to be inserted into Legal Archive ' + log_msg)
-
-            # Removing irrelevant properties
-            legal_archive_doc.pop(config.ETAG, None)
-            legal_archive_doc.pop('lock_user', None)
-            legal_archive_doc.pop('lock_session', None)
-            legal_archive_doc.pop('lock_time', None)
-            legal_archive_doc.pop('lock_action', None)
-
-            logger.info('Removed irrelevant properties from the article {}'.format(log_msg))
-
-            # Step 1
-            article_in_legal_archive = legal_archive_service.find_one(req=None, _id=legal_archive_doc[config.ID_FIELD])
-
-            if article_in_legal_archive and \
-               article_in_legal_archive.get(config.VERSION, 0) > legal_archive_doc.get(config.VERSION):
-                logger.info('Item {} version: {} already in legal archive. Legal Archive document version {}'.format(
-                    legal_archive_doc.get(config.ID_FIELD), legal_archive_doc.get(config.VERSION),
-                    article_in_legal_archive.get(config.VERSION)
-                ))
-                self._set_moved_to_legal(doc)
-                return
-
-            # Step 2 - De-normalizing the legal archive doc
-            self._denormalize_user_desk(legal_archive_doc, log_msg)
-            logger.info('De-normalized article {}'.format(log_msg))
-
-            # Step 3 - Upserting Legal Archive
-            logger.info('Upserting Legal Archive Repo with article {}'.format(log_msg))
-
-            if article_in_legal_archive:
+        :param list legal_items: prepared items
+        """
+        legal_archive_docs = [legal_item['legal_archive_doc'] for legal_item in legal_items
+                              if legal_item['legal_archive_doc'] and not legal_item['update']]
+        versions = [version for legal_item in legal_items for version in legal_item['versions']]
+        history = [history for legal_item in legal_items for history in legal_item['history']]
+
+        # Step 3 - Upserting Legal Archive
+        legal_archive_service = get_resource_service(LEGAL_ARCHIVE_NAME)
+        for legal_item in legal_items:
+            if legal_item['legal_archive_doc'] and legal_item['update']:
+                legal_archive_doc = legal_item['legal_archive_doc']
                 legal_archive_service.put(legal_archive_doc[config.ID_FIELD], legal_archive_doc)
-            else:
-                legal_archive_service.post([legal_archive_doc])
-
-            # Step 4 - Get Versions and De-normalize and Inserting Legal Archive Versions
-            lookup = {version_id_field: legal_archive_doc[config.ID_FIELD]}
-            versions = list(get_resource_service('archive_versions').get(req=None, lookup=lookup))
-            legal_versions = list(legal_archive_versions_service.get(req=None, lookup=lookup))
-
-            logger.info('Fetched version history for article {}'.format(log_msg))
-            versions_to_insert = [version for version in versions
-                                  if not any(legal_version for legal_version in legal_versions
-                                             if version[config.VERSION] == legal_version[config.VERSION])]
-
-            # Step 5 - Get History and de-normalize and insert into Legal Archive History
-            lookup = {'item_id': legal_archive_doc[config.ID_FIELD]}
-            history_items = list(get_resource_service('archive_history').get(req=None, lookup=lookup))
-            legal_history_items = list(legal_archive_history_service.get(req=None, lookup=lookup))
-
-            logger.info('Fetched history for article {}'.format(log_msg))
-            history_to_insert = [history for history in history_items
-                                 if not any(legal_version for legal_version in legal_history_items
-                                            if history[config.ID_FIELD] == legal_version[config.ID_FIELD])]
-
-            # This happens when user kills an article from Dusty Archive
-            if article_in_legal_archive and \
-               article_in_legal_archive[config.VERSION] < legal_archive_doc[config.VERSION] and \
-               len(versions_to_insert) == 0:
-
-                resource_def = app.config['DOMAIN'][ARCHIVE]
-                versioned_doc = deepcopy(legal_archive_doc)
-                versioned_doc[versioned_id_field(resource_def)] = legal_archive_doc[config.ID_FIELD]
-                versioned_doc[config.ID_FIELD] = ObjectId()
-                versions_to_insert.append(versioned_doc)
-
-            for version_doc in versions_to_insert:
-                self._denormalize_user_desk(version_doc,
-                                            self.log_msg_format.format(_id=version_doc[version_id_field],
-                                                                       unique_name=version_doc.get('unique_name'),
-                                                                       _current_version=version_doc[config.VERSION],
-                                                                       expiry=version_doc.get('expiry')))
-                version_doc.pop(config.ETAG, None)
-
-            if versions_to_insert:
-                legal_archive_versions_service.post(versions_to_insert)
-                logger.info('Inserted de-normalized versions for article {}'.format(log_msg))
-
-            for history_doc in history_to_insert:
-                self._denormalize_history(history_doc)
-                history_doc.pop(config.ETAG, None)
-
-            if history_to_insert:
-                legal_archive_history_service.post(history_to_insert)
-                logger.info('Inserted de-normalized history for article {}'.format(log_msg))
+        if legal_archive_docs:
+            legal_archive_service.post(legal_archive_docs)
+            logger.info('Inserted {} articles into legal archive'.format(len(legal_archive_docs)))
 
-            # Set the flag that item is moved to legal.
-            self._set_moved_to_legal(doc)
+        if versions:
+            get_resource_service(LEGAL_ARCHIVE_VERSIONS_NAME).post(versions)
+            logger.info('Inserted {} de-normalized versions into legal archive'.format(len(versions)))
 
-            logger.info('Upsert completed for article ' + log_msg)
-        except Exception:
-            logger.exception('Failed to import into legal archive {}.'.format(item_id))
-            raise
+        if history:
+            get_resource_service(LEGAL_ARCHIVE_HISTORY_NAME).post(history)
+            logger.info('Inserted {} de-normalized history items into legal archive'.format(len(history)))
+
+        for legal_item in legal_items:
+            # Set the flag that item is moved to legal.
+            self._set_moved_to_legal(legal_item['doc'])
+            logger.info('Upsert completed for article ' + self.log_msg_format.format(**legal_item['doc']))
 
     def _denormalize_history(self, history_item):
         """
@@ -194,17 +239,17 @@ class LegalArchiveImport:
         history_update = history_item.get('update')
         if history_update:
             if history_update.get('task') and history_update.get('task').get('desk'):
-                desk = get_resource_service('desks').find_one(req=None, _id=str(history_update['task']['desk']))
-                if desk:
-                    history_update['task']['desk'] = desk.get('name')
+                desk_name = self._get_name('desks', history_update['task']['desk'])
+                if desk_name is not None:
+                    history_update['task']['desk'] = desk_name
                     logger.info('De-normalized Desk Details for article history {}'.format(msg))
                 else:
                     logger.info('Desk Details Not Found: {}. {}'.format(history_update['task'].get('desk'), msg))
 
             if history_update.get('task') and history_update['task'].get('stage'):
-                stage = get_resource_service('stages').find_one(req=None, _id=str(history_update['task']['stage']))
-                if stage:
-                    history_update['task']['stage'] = stage.get('name')
+                stage_name = self._get_name('stages', history_update['task']['stage'])
+                if stage_name is not None:
+                    history_update['task']['stage'] = stage_name
                     logger.info('De-normalized Stage Details for article {}'.format(msg))
                 else:
                     logger.info('Stage Details Not Found: {}. {}'.format(history_update['task'].get('stage'),
@@ -229,17 +274,17 @@ class LegalArchiveImport:
         # De-normalizing Desk and Stage details
         if legal_archive_doc.get('task'):
             if legal_archive_doc['task'].get('desk'):
-                desk = get_resource_service('desks').find_one(req=None, _id=str(legal_archive_doc['task']['desk']))
-                if desk:
-                    legal_archive_doc['task']['desk'] = desk.get('name')
+                desk_name = self._get_name('desks', legal_archive_doc['task']['desk'])
+                if desk_name is not None:
+                    legal_archive_doc['task']['desk'] = desk_name
                     logger.info('De-normalized Desk Details for article {}'.format(log_msg))
                 else:
                     logger.info('Desk Details Not Found: {}. {}'.format(legal_archive_doc['task'].get('desk'), log_msg))
 
             if legal_archive_doc['task'].get('stage'):
-                stage = get_resource_service('stages').find_one(req=None, _id=str(legal_archive_doc['task']['stage']))
-                if stage:
-                    legal_archive_doc['task']['stage'] = stage.get('name')
+                stage_name = self._get_name('stages', legal_archive_doc['task']['stage'])
+                if stage_name is not None:
+                    legal_archive_doc['task']['stage'] = stage_name
                     logger.info('De-normalized Stage Details for article {}'.format(log_msg))
                 else:
                     logger.info('Stage Details Not Found: {}. {}'.format(legal_archive_doc['task'].get('stage'),
@@ -256,12 +301,24 @@ class LegalArchiveImport:
         if not user_id:
             return ''
 
-        user = get_resource_service('users').find_one(req=None, _id=user_id)
+        key = ('users', str(user_id))
+        if key not in self._names:
+            user = get_resource_service('users').find_one(req=None, _id=user_id)
+            self._names[key] = get_display_name(user) if user else ''
+        return self._names[key]
 
-        if not user:
-            return ''
+    def _get_name(self, resource, _id):
+        """Get name of desk or stage identified by _id.
 
-        return get_display_name(user)
+        :param str resource: resource name
+        :param _id: document id
+        :return: name or ``None`` if document is not found
+        """
+        key = (resource, str(_id))
+        if key not in self._names:
+            doc = get_resource_service(resource).find_one(req=None, _id=str(_id))
+            self._names[key] = doc.get('name') if doc else None
+        return self._names[key]
 
     def _set_moved_to_legal(self, doc):
         """Set the moved to legal flag.
@@ -303,61 +360,87 @@ class LegalArchiveImport:
         subscribers = list(get_resource_service('subscribers').get(req=None, lookup=query))
         subscribers = {str(subscriber[config.ID_FIELD]): subscriber for subscriber in subscribers}
 
+        legal_queue_items = []
         for queue_item in queue_items:
             try:
-                self._upsert_into_legal_archive_publish_queue(queue_item, subscribers, force_move)
+                legal_queue_items.append((queue_item, self._get_legal_queue_item(queue_item, subscribers)))
             except Exception:
                 logger.exception("Failed to import publish queue item. {}".format(queue_item.get(config.ID_FIELD)))
 
-    def _upsert_into_legal_archive_publish_queue(self, queue_item, subscribers, force_move):
-        """Upsert into legal publish queue.
+        try:
+            self._upsert_into_legal_archive_publish_queue(legal_queue_items, force_move)
+        except Exception:
+            logger.exception('Failed to import publish queue items at once, importing one by one.')
+            for queue_item, legal_queue_item in legal_queue_items:
+                try:
+                    self._upsert_into_legal_archive_publish_queue([(queue_item, legal_queue_item)], force_move)
+                except Exception:
+                    logger.exception("Failed to import publish queue item. {}".format(
+                        queue_item.get(config.ID_FIELD)))
+
+    def _get_legal_queue_item(self, queue_item, subscribers):
+        """Get de-normalized legal publish queue item.
 
         :param dict queue_item: publish_queue collection item
         :param dict subscribers: subscribers information
-        :param bool force_move: true set the flag to move to legal.
         """
-        legal_publish_queue_service = get_resource_service(LEGAL_PUBLISH_QUEUE_NAME)
         legal_queue_item = deepcopy(queue_item)
-        lookup = {
-            'item_id': legal_queue_item.get('item_id'),
-            'item_version': legal_queue_item.get('item_version'),
-            'subscriber_id': legal_queue_item.get('subscriber_id')
-        }
-
-        log_msg = '{item_id} -- version {item_version} -- subscriber {subscriber_id}.'.format(**lookup)
-
-        logger.info('Processing queue item: {}'.format(log_msg))
-
-        existing_queue_item = legal_publish_queue_service.find_one(req=None, _id=legal_queue_item.get(config.ID_FIELD))
+        logger.info('Processing queue item: {}'.format(self._get_queue_log_msg(queue_item)))
         if str(queue_item['subscriber_id']) in subscribers:
             legal_queue_item['subscriber_id'] = subscribers[str(queue_item['subscriber_id'])]['name']
             legal_queue_item['_subscriber_id'] = queue_item['subscriber_id']
         else:
-            logger.warn('Subscriber is deleted from the system: {}'.format(log_msg))
+            logger.warn('Subscriber is deleted from the system: {}'.format(self._get_queue_log_msg(queue_item)))
             legal_queue_item['subscriber_id'] = 'Deleted Subscriber'
             legal_queue_item['_subscriber_id'] = queue_item['subscriber_id']
+        return legal_queue_item
 
-        if not existing_queue_item:
-            legal_publish_queue_service.post([legal_queue_item])
-            logger.info('Inserted queue item: {}'.format(log_msg))
-        else:
-            legal_publish_queue_service.put(existing_queue_item.get(config.ID_FIELD), legal_queue_item)
-            logger.info('Updated queue item: {}'.format(log_msg))
+    def _upsert_into_legal_archive_publish_queue(self, legal_queue_items, force_move):
+        """Upsert into legal publish queue.
 
-        if queue_item['state'] in {QueueState.SUCCESS.value,
-                                   QueueState.CANCELED.value,
-                                   QueueState.FAILED.value} or force_move:
-            updates = dict()
-            updates['moved_to_legal'] = True
+        New items are inserted using single insert, existing items are replaced one by one.
 
-            try:
-                get_resource_service('publish_queue').system_update(queue_item.get(config.ID_FIELD),
-                                                                    updates, queue_item)
-                logger.info('Queue item moved to legal. {}'.format(log_msg))
-            except Exception:
-                logger.exception('Failed to set moved to legal flag for queue item {}.'.format(log_msg))
+        :param list legal_queue_items: list of ``(queue_item, legal_queue_item)`` tuples
+        :param bool force_move: true set the flag to move to legal.
+        """
+        legal_publish_queue_service = get_resource_service(LEGAL_PUBLISH_QUEUE_NAME)
+        ids = [queue_item[config.ID_FIELD] for queue_item, _ in legal_queue_items]
+        existing_ids = {str(doc[config.ID_FIELD])
+                        for doc in legal_publish_queue_service.find({config.ID_FIELD: {'$in': ids}})}
+
+        new_queue_items = []
+        for queue_item, legal_queue_item in legal_queue_items:
+            if str(queue_item[config.ID_FIELD]) in existing_ids:
+                legal_publish_queue_service.put(queue_item[config.ID_FIELD], legal_queue_item)
+                logger.info('Updated queue item: {}'.format(self._get_queue_log_msg(queue_item)))
+            else:
+                new_queue_items.append(legal_queue_item)
+
+        if new_queue_items:
+            legal_publish_queue_service.post(new_queue_items)
+            logger.info('Inserted {} queue items.'.format(len(new_queue_items)))
 
-        logger.info('Processed queue item: {}'.format(log_msg))
+        for queue_item, _ in legal_queue_items:
+            log_msg = self._get_queue_log_msg(queue_item)
+            if queue_item['state'] in {QueueState.SUCCESS.value,
+                                       QueueState.CANCELED.value,
+                                       QueueState.FAILED.value} or force_move:
+                updates = dict()
+                updates['moved_to_legal'] = True
+
+                try:
+                    get_resource_service('publish_queue').system_update(queue_item.get(config.ID_FIELD),
+                                                                        updates, queue_item)
+                    logger.info('Queue item moved to legal. {}'.format(log_msg))
+                except Exception:
+                    logger.exception('Failed to set moved to legal flag for queue item {}.'.format(log_msg))
+
+            logger.info('Processed queue item: {}'.format(log_msg))
+
+    def _get_queue_log_msg(self, queue_item):
+        return '{} -- version {} -- subscriber {}.'.format(queue_item.get('item_id'),
+                                                           queue_item.get('item_version'),
+                                                           queue_item.get('subscriber_id'))
 
     def get_publish_queue_items(self, page_size, expired_items=[]):
         """Get publish queue items that are not moved to legal
@@ -459,40 +542,44 @@ class ImportLegalArchiveCommand(superdesk.Command):
     then you are missing records in legal archive. Use this command to manually import archive
     items into legal archive.
 
+    Items are imported page by page, items of a page are imported by ``--workers`` threads.
+
     Example:
     ::
 
         $ python manage.py legal_archive:import
         $ python manage.py legal_archive:import --page-size=100
+        $ python manage.py legal_archive:import --page-size=1000 --workers=8
     """
 
     default_page_size = 500
 
     option_list = [
-        superdesk.Option('--page-size', '-p', dest='page_size', required=False)
+        superdesk.Option('--page-size', '-p', dest='page_size', required=False),
+        superdesk.Option('--workers', '-w', dest='workers', required=False),
     ]
 
-    def run(self, page_size=None):
+    def run(self, page_size=None, workers=None):
         if not is_legal_archive_enabled():
             return
         logger.info('Import to Legal Archive')
         lock_name = get_lock_id('legal_archive', 'import_to_legal_archive')
         page_size = int(page_size) if page_size else self.default_page_size
+        workers = int(workers) if workers else app.config.get('LEGAL_ARCHIVE_IMPORT_WORKERS', 4)
         if not lock(lock_name, expire=1810):
             return
         try:
             legal_archive_import = LegalArchiveImport()
-            # publish_queue = get_resource_service('publish_queue')
             # move the publish item to legal archive.
             expired_items = set()
             for items in self.get_expired_items(page_size):
-                for item in items:
-                    self._move_to_legal(item.get('item_id'), item.get(config.VERSION), expired_items)
+                self._move_items_to_legal(legal_archive_import, [(item.get('item_id'), item.get(config.VERSION))
+                                                                 for item in items], expired_items, workers)
 
             # get the invalid items from archive.
             for items in get_resource_service(ARCHIVE).get_expired_items(utcnow(), invalid_only=True):
-                for item in items:
-                    self._move_to_legal(item.get(config.ID_FIELD), item.get(config.VERSION), expired_items)
+                self._move_items_to_legal(legal_archive_import, [(item.get(config.ID_FIELD), item.get(config.VERSION))
+                                                                 for item in items], expired_items, workers)
 
             # if publish item is moved but publish_queue item is not.
             if len(expired_items):
@@ -516,13 +603,68 @@ class ImportLegalArchiveCommand(superdesk.Command):
         finally:
             unlock(lock_name)
 
-    def _move_to_legal(self, item_id, item_version, expired_items):
+    def _move_items_to_legal(self, legal_archive_import, items, expired_items, workers=1):
+        """Move page of items to legal archive.
+
+        Items are prepared using up to ``workers`` threads and then written into legal archive
+        using single insert per collection. If that fails items are written one by one.
+
+        :param LegalArchiveImport legal_archive_import: import instance shared by all items
+        :param list items: list of ``(item_id, item_version)`` tuples
+        :param set expired_items: ids of moved items are added here
+        :param int workers: number of threads
+        """
+        versions = {}
+        for item_id, item_version in items:
+            versions.setdefault(item_id, []).append(item_version)
+
+        if workers <= 1 or len(versions) <= 1:
+            prepared = [self._prepare_legal_archive_item(legal_archive_import, item_id) for item_id in versions]
+        else:
+            flask_app = app._get_current_object()
+
+            def prepare(item_id):
+                with flask_app.app_context():
+                    return self._prepare_legal_archive_item(legal_archive_import, item_id)
+
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                prepared = list(executor.map(prepare, versions))
+
+        prepared = [(item_id, legal_item) for item_id, legal_item in zip(versions, prepared) if legal_item is not False]
+        try:
+            legal_archive_import.save_legal_archive_items([legal_item for _, legal_item in prepared if legal_item])
+            moved = [item_id for item_id, _ in prepared]
+        except Exception:
+            logger.exception('Failed to import items into legal archive at once, importing one by one.')
+            moved = []
+            for item_id, legal_item in prepared:
+                try:
+                    if legal_item:
+                        legal_archive_import.save_legal_archive_items([legal_item])
+                    moved.append(item_id)
+                except Exception:
+                    logger.exception('Failed to import into legal archive via command {}.'.format(item_id))
+
+        for item_id in moved:
+            self._set_moved_to_legal(item_id, versions[item_id], expired_items)
+
+    def _prepare_legal_archive_item(self, legal_archive_import, item_id):
+        """Prepare item for legal archive.
+
+        :return: prepared item, ``None`` if item is not in archive or ``False`` if it failed
+        """
+        try:
+            return legal_archive_import.prepare_legal_archive_item(item_id)
+        except Exception:
+            logger.exception('Failed to import into legal archive via command {}.'.format(item_id))
+            return False
+
+    def _set_moved_to_legal(self, item_id, item_versions, expired_items):
         try:
-            legal_archive_import = LegalArchiveImport()
-            legal_archive_import.upsert_into_legal_archive(item_id)
             # set the flag to be set to true.
-            get_resource_service('published').set_moved_to_legal(item_id,
-                                                                 item_version, True)
+            for item_version in item_versions:
+                get_resource_service('published').set_moved_to_legal(item_id,
+                                                                     item_version, True)
             expired_items.add(item_id)
         except Exception:
             logger.exception('Failed to import into legal archive via command {}.'.format(item_id))
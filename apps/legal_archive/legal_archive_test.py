@@ -10,13 +10,14 @@
 
 import json
 
-from unittest.mock import MagicMock
+from copy import deepcopy
+from unittest.mock import MagicMock, patch
 from datetime import timedelta
 
 from eve.versioning import resolve_document_version
 from eve.utils import ParsedRequest
 
-from .commands import LegalArchiveImport
+from .commands import LegalArchiveImport, ImportLegalArchiveCommand
 from apps.archive.common import insert_into_versions, ARCHIVE
 from superdesk import get_resource_service
 from superdesk.tests import TestCase
@@ -66,6 +67,48 @@ class LegalArchiveTestCase(TestCase):
         self.assertEqual(task.get('stage'), 'dddd')
         self.assertEqual(task.get('user'), '')
 
+    def test_denormalize_names_are_cached(self):
+        legal_archive_import = LegalArchiveImport()
+        with patch('apps.legal_archive.commands.get_resource_service', wraps=get_resource_service) as service:
+            legal_archive_import._denormalize_user_desk(deepcopy(self.archive[1]), '')
+            self.assertEqual(2, service.call_count)
+            doc = deepcopy(self.archive[1])
+            legal_archive_import._denormalize_user_desk(doc, '')
+            self.assertEqual(2, service.call_count)
+        self.assertEqual('1234', doc['task']['desk'])
+        self.assertEqual('test user', doc['task']['user'])
+
+    def test_create_existing_docs_once(self):
+        history = [{'_id': 'h1', 'item_id': 'foo', 'version': 1}, {'_id': 'h1', 'item_id': 'foo', 'version': 1},
+                   {'_id': 'h2', 'item_id': 'foo', 'version': 2}]
+        service = get_resource_service('legal_archive_history')
+        self.assertEqual(2, len(service.post(deepcopy(history))))
+        self.assertEqual([], service.post(deepcopy(history)))
+        self.assertEqual(2, service.find({'item_id': 'foo'}).count())
+
+    def test_move_items_to_legal_using_workers(self):
+        legal_archive_import = MagicMock()
+        expired_items = set()
+        with patch('apps.legal_archive.commands.get_resource_service') as service:
+            ImportLegalArchiveCommand()._move_items_to_legal(legal_archive_import, [('a', 1), ('b', 1), ('a', 2)],
+                                                             expired_items, workers=2)
+        self.assertEqual({'a', 'b'}, expired_items)
+        self.assertEqual(2, legal_archive_import.prepare_legal_archive_item.call_count)
+        self.assertEqual(1, legal_archive_import.save_legal_archive_items.call_count)
+        self.assertEqual(2, len(legal_archive_import.save_legal_archive_items.call_args[0][0]))
+        self.assertEqual(3, service.return_value.set_moved_to_legal.call_count)
+
+    def test_move_items_to_legal_one_by_one_on_error(self):
+        legal_archive_import = MagicMock()
+        legal_archive_import.save_legal_archive_items.side_effect = [Exception, None, Exception]
+        expired_items = set()
+        with patch('apps.legal_archive.commands.get_resource_service') as service:
+            ImportLegalArchiveCommand()._move_items_to_legal(legal_archive_import, [('a', 1), ('b', 1), ('a', 2)],
+                                                             expired_items)
+        self.assertEqual({'a'}, expired_items)
+        self.assertEqual(3, legal_archive_import.save_legal_archive_items.call_count)
+        self.assertEqual(2, service.return_value.set_moved_to_legal.call_count)
+
 
 class ImportLegalArchiveCommandTestCase(TestCase):
     desks = [{'name': 'Sports'}]
@@ -107,6 +107,26 @@ class LegalService(Service):
         else:
             legal_archive_docs['_type'] = LEGAL_ARCHIVE_NAME
 
+    def _get_new_docs(self, docs):
+        """Get docs which are not stored yet, using single query.
+
+        Docs without id are always new, for docs with same id only the first one is used.
+
+        :param list docs: docs to insert
+        """
+        ids = [doc[config.ID_FIELD] for doc in docs if doc.get(config.ID_FIELD)]
+        existing = set()
+        if ids:
+            existing = {str(doc[config.ID_FIELD]) for doc in self.find({config.ID_FIELD: {'$in': ids}})}
+        new_docs = []
+        for doc in docs:
+            if doc.get(config.ID_FIELD):
+                if str(doc[config.ID_FIELD]) in existing:
+                    continue
+                existing.add(str(doc[config.ID_FIELD]))
+            new_docs.append(doc)
+        return new_docs
+
     def _change_location_of_items_in_package(self, package):
         """
         Changes location of each item in the package to legal archive instead of archive.
@@ -119,6 +139,14 @@ class LegalService(Service):
 
 
 class LegalArchiveService(LegalService):
+    def create(self, docs, **kwargs):
+        """
+        Overriding this from inserting the same item again. This happens when items inserted at once are retried.
+        """
+
+        new_docs = self._get_new_docs(docs)
+        return super().create(new_docs) if new_docs else []
+
     def on_fetched(self, docs):
         """
         Overriding this to enhance the published article with the one in archive collection
@@ -143,15 +171,8 @@ class LegalPublishQueueService(LegalService):
         package expires and once when the item expires.
         """
 
-        ids = []
-        for doc in docs:
-            doc_if_exists = None
-            if doc.get(config.ID_FIELD):
-                doc_if_exists = self.find_one(req=None, _id=doc.get(config.ID_FIELD))
-            if doc_if_exists is None:
-                ids.extend(super().create([doc]))
-
-        return ids
+        new_docs = self._get_new_docs(docs)
+        return super().create(new_docs) if new_docs else []
 
 
 class LegalArchiveVersionsService(LegalService):
@@ -160,21 +181,13 @@ class LegalArchiveVersionsService(LegalService):
         Overriding this from preventing the same version again. This happens when an item is published more than once.
         """
 
-        ids = []
         for doc in docs:
-            doc_if_exists = None
-
-            if config.ID_FIELD in doc:  # This happens when inserting docs from pre-populate command
-                doc_if_exists = self.find_one(req=None, _id=doc['_id'])
-
-            # This also happens when inserting docs from pre-populate command
+            # This happens when inserting docs from pre-populate command
             if not doc.get('operation'):
                 doc['operation'] = 'create'
 
-            if doc_if_exists is None:
-                ids.extend(super().create([doc]))
-
-        return ids
+        new_docs = self._get_new_docs(docs)
+        return super().create(new_docs) if new_docs else []
 
     def get(self, req, lookup):
         """
@@ -203,12 +216,5 @@ class LegalArchiveHistoryService(LegalService):
         Overriding this from preventing the same version again. This happens when an item is published more than once.
         """
 
-        ids = []
-        for doc in docs:
-            doc_if_exists = None
-            if doc.get('item_id'):
-                doc_if_exists = self.find_one(req=None, _id=doc.get('_id'))
-            if doc_if_exists is None:
-                ids.extend(super().create([doc]))
-
-        return ids
+        new_docs = self._get_new_docs(docs)
+        return super().create(new_docs) if new_docs else []
@@ -23,7 +23,7 @@ from superdesk.metadata.packages import GROUPS, ROOT_GROUP, GROUP_ID, REFS, RESI
 from superdesk.notification import push_notification
 from superdesk.publish import SUBSCRIBER_TYPES
 from superdesk.publish.publish_queue import PUBLISHED_IN_PACKAGE
-from superdesk.publish.formatters import get_formatter
+from superdesk.publish.formatters import get_formatter, is_reusable
 from apps.publish.content.common import BasePublishService
 from copy import deepcopy
 from eve.utils import config, ParsedRequest
@@ -31,6 +31,7 @@ from apps.archive.common import get_user, get_utc_schedule
 from apps.packages.package_service import PackageService
 from apps.publish.published_item import PUBLISH_STATE, QUEUE_STATE
 from apps.content_types import apply_schema
+from apps.content_filters.content_filter.content_filter_engine import ContentFilterEngine
 from datetime import datetime
 import pytz
 
@@ -51,6 +52,8 @@ class EnqueueService:
     package_service = PackageService()
 
     filters = None
+    filter_engine = None
+    products = None
 
     def get_filters(self):
         """Retrieve all of the available filter conditions and content filters if they have not yet been retrieved or
@@ -85,9 +88,59 @@ class EnqueueService:
                 self.filters['content_filters'][cf.get('_id')] = {'cf': cf}
                 self.filters['latest_content_filters'] = cf.get('_updated') if cf.get('_updated') > self.filters.get(
                     'latest_content_filters', mindate) else self.filters.get('latest_content_filters', mindate)
+            self.filter_engine = ContentFilterEngine(self.filters)
         else:
             logger.debug('Using chached content filters and filters conditions')
 
+    def get_products(self):
+        """Retrieve all of the products if they have not yet been retrieved or they have been updated.
+
+        Products are indexed by content filter and geo restrictions, so each distinct combination
+        is tested only once per item no matter how many products and subscribers are using it.
+
+        :return: dict with products by id and groups of product ids sharing content filter and geo restrictions
+        """
+        req = ParsedRequest()
+        req.sort = '-_updated'
+        req.max_results = 1
+        cursor = get_resource_service('products').get_from_mongo(req=req, lookup=None)
+        version = (cursor.count(), next(cursor, {}).get('_updated'))
+
+        if self.products and self.products['version'] == version:
+            logger.debug('Using cached products')
+            return self.products
+
+        logger.debug('Getting products')
+        products = {}
+        groups = {}
+        for product in get_resource_service('products').get_from_mongo(req=None, lookup=None):
+            products[product[config.ID_FIELD]] = product
+            content_filter = product.get('content_filter') or {}
+            filter_id = content_filter.get('filter_id')
+            key = (filter_id, content_filter.get('filter_type') if filter_id else None,
+                   product.get('geo_restrictions'))
+            groups.setdefault(key, {'product': product, 'products': {}})
+            groups[key]['products'][product[config.ID_FIELD]] = self._get_codes(product)
+
+        self.products = {'version': version, 'products': products, 'groups': list(groups.values())}
+        return self.products
+
+    def _get_matching_products(self, doc, matcher=None):
+        """Get products matching given document.
+
+        :param doc: Document to publish/kill/correct
+        :param matcher: content filter matcher for the document
+        :return dict: product codes for every matching product id
+        """
+        if matcher is None:
+            matcher = self._get_filter_matcher(doc)
+        matching_products = {}
+        for group in self.get_products()['groups']:
+            product = group['product']
+            if self.conforms_product_targets(product, doc) and self.conforms_content_filter(product, doc, matcher):
+                matching_products.update(group['products'])
+        return matching_products
+
     def _enqueue_item(self, item, content_type=None):
         item_to_queue = deepcopy(item)
         if item[ITEM_TYPE] == CONTENT_TYPE.COMPOSITE:
@@ -273,11 +326,11 @@ class EnqueueService:
 
     def _get_subscriber_codes(self, subscribers):
         subscriber_codes = {}
-        all_products = list(get_resource_service('products').get(req=None, lookup=None))
+        all_products = self.get_products()['products']
 
         for subscriber in subscribers:
             codes = self._get_codes(subscriber)
-            products = [p for p in all_products if p[config.ID_FIELD] in subscriber.get('products', [])]
+            products = [all_products[p] for p in subscriber.get('products') or [] if p in all_products]
 
             for product in products:
                 codes.extend(self._get_codes(product))
@@ -411,14 +464,19 @@ class EnqueueService:
         ::Important Note:: Format Type across Subscribers can repeat. But we can't have formatted item generated once
         based on the format_types configured across for all the subscribers as the formatted item must have a published
         sequence number generated by Subscriber.
+        Reusable formatters are run once per format, destination config and codes and then only the published
+        sequence number is generated for every other subscriber.
+
+        Queue items for all the subscribers are saved at the end using single bulk insert.
 
         :param dict doc: document to queue for transmission
         :param list subscribers: List of subscriber dict.
         :return : (list, bool) tuple of list of missing formatters and boolean flag. True if queued else False
         """
         try:
-            queued = False
+            queue_items = []
             no_formatters = []
+            format_cache = {}
             for subscriber in subscribers:
                 try:
                     if doc[ITEM_TYPE] not in [CONTENT_TYPE.TEXT, CONTENT_TYPE.PREFORMATTED] and \
@@ -443,10 +501,9 @@ class EnqueueService:
                             no_formatters.append(destination['format'])
                             continue
 
-                        formatter.set_destination(destination, subscriber)
-                        formatted_docs = formatter.format(self.filter_document(doc),
-                                                          subscriber,
-                                                          subscriber_codes.get(subscriber[config.ID_FIELD]))
+                        formatted_docs = self._format_document(formatter, doc, destination, subscriber,
+                                                               subscriber_codes.get(subscriber[config.ID_FIELD]),
+                                                               format_cache)
 
                         for idx, publish_data in enumerate(formatted_docs):
                             if not isinstance(publish_data, dict):
@@ -485,17 +542,115 @@ class EnqueueService:
                             publish_queue_item.pop(ITEM_STATE, None)
 
                             # content api delivery will be marked as SUCCESS in queue
-                            get_resource_service('publish_queue').post([publish_queue_item])
-
-                            queued = True
+                            queue_items.append(publish_queue_item)
                 except Exception:
                     logger.exception("Failed to queue item for id {} with headline {} for subscriber {}."
                                      .format(doc.get(config.ID_FIELD), doc.get('headline'), subscriber.get('name')))
 
+            queued = self._save_queue_items(doc, queue_items)
             return no_formatters, queued
         except Exception:
             raise
 
+    def _format_document(self, formatter, doc, destination, subscriber, codes, format_cache):
+        """Format the document for subscriber destination.
+
+        Output of reusable formatters is cached per format, destination config and codes,
+        so the document is formatted only once and other subscribers only get their
+        publish sequence number set in the formatted item. Filtered document is cached too,
+        so the profile schema is applied only once.
+
+        :param formatter: formatter for the destination
+        :param dict doc: document to format
+        :param dict destination: subscriber destination
+        :param dict subscriber: subscriber
+        :param list codes: subscriber codes
+        :param dict format_cache: formatted items per format, destination config and codes
+        :return list: formatted docs
+        """
+        formatter.set_destination(destination, subscriber)
+        if not is_reusable(formatter):
+            return formatter.format(self._get_filtered_document(doc, format_cache), subscriber, codes)
+
+        key = (destination['format'], type(formatter),
+               json.dumps(destination.get('config') or {}, sort_keys=True, default=str),
+               tuple(sorted(codes or [])))
+
+        if key not in format_cache:
+            formatted_docs = formatter.format(self._get_filtered_document(doc, format_cache), subscriber, codes)
+            # formatted docs are modified when queued so keep a copy
+            format_cache[key] = deepcopy(formatted_docs)
+            return formatted_docs
+
+        subscriber_service = get_resource_service('subscribers')
+        formatted_docs = []
+        for publish_data in deepcopy(format_cache[key]):
+            pub_seq_num = subscriber_service.generate_sequence_number(subscriber)
+            if not isinstance(publish_data, dict):
+                previous_seq_num, formatted_item = publish_data
+                formatted_docs.append((pub_seq_num,
+                                       formatter.set_sequence_number(formatted_item, pub_seq_num, previous_seq_num)))
+            else:
+                publish_data['formatted_item'] = formatter.set_sequence_number(publish_data['formatted_item'],
+                                                                               pub_seq_num,
+                                                                               publish_data['published_seq_num'])
+                publish_data['published_seq_num'] = pub_seq_num
+                formatted_docs.append(publish_data)
+        return formatted_docs
+
+    def _get_filtered_document(self, doc, format_cache):
+        """Get shallow copy of filtered document, filtering it only once.
+
+        :param dict doc: document to filter
+        :param dict format_cache: formatting cache for the document
+        """
+        key = ('filtered', id(doc))
+        if key not in format_cache:
+            format_cache[key] = (doc, self.filter_document(doc))  # keep doc so its id is not reused
+        return format_cache[key][1].copy()
+
+    def _save_queue_items(self, doc, queue_items):
+        """Save queue items using single bulk insert.
+
+        If bulk insert fails, items which were not saved are saved one by one,
+        so failure of one item doesn't affect the others.
+
+        :param dict doc: document queued for transmission
+        :param list queue_items: list of publish queue items
+        :return bool: True if any queue item was saved else False
+        """
+        if not queue_items:
+            return False
+
+        service = get_resource_service('publish_queue')
+        try:
+            service.post(queue_items)
+            return True
+        except Exception:
+            logger.warning('Failed to queue items for id {} in bulk, queueing one by one.'
+                           .format(doc.get(config.ID_FIELD)))
+
+        ids = [queue_item[config.ID_FIELD] for queue_item in queue_items if queue_item.get(config.ID_FIELD)]
+        saved = set()
+        if ids:
+            lookup = {config.ID_FIELD: {'$in': ids}}
+            saved = set(queue_item[config.ID_FIELD] for queue_item in service.get_from_mongo(req=None, lookup=lookup))
+
+        queued = len(saved) > 0
+        for queue_item in queue_items:
+            if queue_item.get(config.ID_FIELD) in saved:
+                continue
+            queue_item.pop(config.ID_FIELD, None)
+            try:
+                service.post([queue_item])
+                queued = True
+            except Exception:
+                logger.exception("Failed to queue item for id {} with headline {} for subscriber {} "
+                                 "and destination {}.".format(doc.get(config.ID_FIELD), doc.get('headline'),
+                                                              queue_item.get('subscriber_id'),
+                                                              queue_item.get('destination', {}).get('name')))
+        return queued
+
     def _embed_package_items(self, package):
         """Embeds all package items in the package document."""
         for group in package.get(GROUPS, []):
@@ -567,13 +722,16 @@ class EnqueueService:
         """
         filtered_subscribers = []
         subscriber_codes = {}
-        existing_products = {p[config.ID_FIELD]: p for p in
-                             list(get_resource_service('products').get(req=None, lookup=None))}
-        global_filters = deepcopy([gf['cf'] for gf in self.filters.get('content_filters', {}).values() if
-                                   gf['cf'].get('is_global', True)])
+        # only `does_match` is set on global filters so shallow copy is enough
+        global_filters = [dict(gf['cf']) for gf in self.filters.get('content_filters', {}).values() if
+                          gf['cf'].get('is_global', True)]
+        matcher = self._get_filter_matcher(doc)
 
         # apply global filters
-        self.conforms_global_filter(global_filters, doc)
+        self.conforms_global_filter(global_filters, doc, matcher)
+
+        # test every distinct product filter and geo restriction once
+        matching_products = self._get_matching_products(doc, matcher)
 
         for subscriber in subscribers:
             if target_media_type and subscriber.get('subscriber_type', '') != SUBSCRIBER_TYPES.ALL:
@@ -593,9 +751,7 @@ class EnqueueService:
             subscriber_added = False
             subscriber['api_enabled'] = False
             # validate against direct products
-            result, codes = self._validate_article_for_subscriber(doc,
-                                                                  subscriber.get('products'),
-                                                                  existing_products)
+            result, codes = self._validate_article_for_subscriber(subscriber.get('products'), matching_products)
             if result:
                 product_codes.extend(codes)
                 if not subscriber_added:
@@ -604,9 +760,8 @@ class EnqueueService:
 
             if content_api.is_enabled():
                 # validate against api products
-                result, codes = self._validate_article_for_subscriber(doc,
-                                                                      subscriber.get('api_products'),
-                                                                      existing_products)
+                result, codes = self._validate_article_for_subscriber(subscriber.get('api_products'),
+                                                                      matching_products)
                 if result:
                     product_codes.extend(codes)
                     subscriber['api_enabled'] = True
@@ -627,12 +782,11 @@ class EnqueueService:
 
         return filtered_subscribers, subscriber_codes
 
-    def _validate_article_for_subscriber(self, doc, products, existing_products):
+    def _validate_article_for_subscriber(self, products, matching_products):
         """Validate the article for subscriber
 
-        :param dict doc: Document to be validated
         :param list products: list of product ids
-        :param dict existing_products: Product lookup
+        :param dict matching_products: codes of products matching the article by product id
         :return tuple bool, list: Boolean flag to add subscriber or not and list of product codes.
         """
         add_subscriber, product_codes = False, []
@@ -641,18 +795,9 @@ class EnqueueService:
             return add_subscriber, product_codes
 
         for product_id in products:
-            # check if the product filter conforms with the story
-            product = existing_products.get(product_id)
-
-            if not product:
-                continue
-
-            if not self.conforms_product_targets(product, doc):
-                continue
-
-            if self.conforms_content_filter(product, doc):
+            if product_id in matching_products:
                 # gather the codes of products
-                product_codes.extend(self._get_codes(product))
+                product_codes.extend(matching_products[product_id])
                 add_subscriber = True
 
         return add_subscriber, product_codes
@@ -676,8 +821,9 @@ class EnqueueService:
 
             assoc_subscribers = set()
             assoc_id = item.get(config.ID_FIELD)
+            # only `api_enabled` is set on subscribers so shallow copy is enough
             filtered_subscribers, subscriber_codes = self.filter_subscribers(item,
-                                                                             deepcopy(subscribers),
+                                                                             [dict(s) for s in subscribers],
                                                                              target_media_type)
 
             for subscriber in filtered_subscribers:
@@ -777,11 +923,25 @@ class EnqueueService:
         # Nothing matches so this subscriber doesn't conform
         return False, False
 
-    def conforms_content_filter(self, product, doc):
+    def _get_filter_matcher(self, doc):
+        """Get content filter matcher for the document.
+
+        Matcher memoizes the result of every filter condition and content filter,
+        so each of those is evaluated only once per document no matter how many
+        products are using it.
+
+        :param doc: Document to test the filters against
+        """
+        if self.filter_engine is None:
+            self.filter_engine = ContentFilterEngine(self.filters)
+        return self.filter_engine.matcher(doc)
+
+    def conforms_content_filter(self, product, doc, matcher=None):
         """Checks if the document matches the subscriber filter
 
         :param product: Product where the filter is used
         :param doc: Document to test the filter against
+        :param matcher: content filter matcher for the document
         :return:
         True if there's no filter
         True if matches and permitting
@@ -794,26 +954,29 @@ class EnqueueService:
         if content_filter is None or 'filter_id' not in content_filter or content_filter['filter_id'] is None:
             return True
 
-        service = get_resource_service('content_filters')
+        if matcher is None:
+            matcher = self._get_filter_matcher(doc)
         filter = self.filters.get('content_filters', {}).get(content_filter['filter_id'], {}).get('cf')
-        does_match = service.does_match(filter, doc, self.filters)
+        does_match = matcher.does_match(filter)
 
         if does_match:
             return content_filter['filter_type'] == 'permitting'
         else:
             return content_filter['filter_type'] == 'blocking'
 
-    def conforms_global_filter(self, global_filters, doc):
+    def conforms_global_filter(self, global_filters, doc, matcher=None):
         """Check global filter
 
         Checks if document matches the global filter
 
         :param global_filters: List of all global filters
         :param doc: Document to test the global filter against
+        :param matcher: content filter matcher for the document
         """
-        service = get_resource_service('content_filters')
+        if matcher is None:
+            matcher = self._get_filter_matcher(doc)
         for global_filter in global_filters:
-            global_filter['does_match'] = service.does_match(global_filter, doc, self.filters)
+            global_filter['does_match'] = matcher.does_match(global_filter)
 
     def conforms_subscriber_global_filter(self, subscriber, global_filters):
         """Check global filter for subscriber
@@ -8,6 +8,7 @@
 # AUTHORS and LICENSE files distributed with this source code, or
 # at https://www.sourcefabric.org/superdesk/license
 
+import superdesk
 from superdesk.tests import TestCase
 from .enqueue.enqueue_service import EnqueueService
 from apps.packages.package_service import PackageService
@@ -272,3 +273,63 @@ class EnqueueServiceTest(TestCase):
         # Mock.assert_called_once is only available in Python 3.6
         # so we emulate it by counting the number of calls
         assert content_api_publish.call_count == 1
+
+    def test_save_queue_items_in_bulk(self):
+        service = EnqueueService()
+        queue_items = [{'item_id': '11', 'item_version': 1, 'subscriber_id': 'sub1', 'published_seq_num': i,
+                        'destination': {'name': 'destination%d' % i, 'delivery_type': 'ftp'}} for i in range(3)]
+        publish_queue = superdesk.get_resource_service('publish_queue')
+        with mock.patch.object(publish_queue, 'post', wraps=publish_queue.post) as post:
+            self.assertTrue(service._save_queue_items({'_id': '11'}, queue_items))
+            self.assertEqual(1, post.call_count)
+        self.assertEqual(3, publish_queue.get(req=None, lookup={'item_id': '11'}).count())
+
+    def test_save_queue_items_isolates_failures(self):
+        service = EnqueueService()
+        queue_items = [{'item_id': '12', 'item_version': 1, 'subscriber_id': 'sub1', 'published_seq_num': i,
+                        'destination': {'name': 'destination%d' % i, 'delivery_type': 'ftp'}} for i in range(3)]
+        publish_queue = superdesk.get_resource_service('publish_queue')
+        post = publish_queue.post
+
+        def failing_post(docs, **kwargs):
+            if len(docs) > 1 or docs[0]['published_seq_num'] == 1:
+                raise ValueError('fail')
+            return post(docs, **kwargs)
+
+        with mock.patch.object(publish_queue, 'post', side_effect=failing_post):
+            self.assertTrue(service._save_queue_items({'_id': '12'}, queue_items))
+        queued = list(publish_queue.get(req=None, lookup={'item_id': '12'}))
+        self.assertEqual([0, 2], sorted(item['published_seq_num'] for item in queued))
+
+    def test_format_document_once_for_same_destination(self):
+        service = EnqueueService()
+        formatter = mock.Mock()
+        formatter.format.return_value = [(1, '<transmitId>1</transmitId>')]
+        formatter.set_sequence_number.side_effect = lambda item, seq, previous: item.replace(str(previous), str(seq))
+        destination = {'name': 'ftp', 'format': 'newsmlg2', 'delivery_type': 'ftp', 'config': {'host': 'foo'}}
+        format_cache = {}
+        with mock.patch.object(EnqueueService, 'filter_document', side_effect=lambda doc: doc), \
+                mock.patch('apps.publish.enqueue.enqueue_service.is_reusable', return_value=True):
+            with mock.patch('superdesk.publish.subscribers.SubscribersService.generate_sequence_number',
+                            side_effect=[7, 8]):
+                formatted = [service._format_document(formatter, {'_id': 'foo'}, destination,
+                                                      {'_id': 'sub%d' % i}, ['a'], format_cache)
+                             for i in range(3)]
+        self.assertEqual(1, formatter.format.call_count)
+        self.assertEqual([(1, '<transmitId>1</transmitId>')], formatted[0])
+        self.assertEqual([(7, '<transmitId>7</transmitId>')], formatted[1])
+        self.assertEqual([(8, '<transmitId>8</transmitId>')], formatted[2])
+
+    def test_filter_document_once_for_all_destinations(self):
+        service = EnqueueService()
+        formatter = mock.Mock()
+        formatter.format.side_effect = lambda doc, subscriber, codes: [(1, doc)]
+        destination = {'name': 'ftp', 'format': 'ninjs', 'delivery_type': 'ftp', 'config': {}}
+        doc = {'_id': 'foo'}
+        format_cache = {}
+        with mock.patch.object(EnqueueService, 'filter_document', side_effect=lambda doc: doc.copy()) as filter_doc:
+            formatted = [service._format_document(formatter, doc, destination, {'_id': 'sub%d' % i}, [], format_cache)
+                         for i in range(3)]
+        self.assertEqual(1, filter_doc.call_count)
+        self.assertEqual([[(1, doc)]] * 3, formatted)
+        self.assertIsNot(formatted[0][0][1], formatted[1][0][1])
@@ -1,8 +1,17 @@
 
-from .spellcheck import SpellcheckService, SpellcheckResource
+from .model import model_cache
+from .spellcheck import SpellcheckService, SpellcheckResource, SpellcheckTextService, SpellcheckTextResource
 
 
 def init_app(app):
     endpoint_name = 'spellcheck'
     service = SpellcheckService(endpoint_name, backend=None)
     SpellcheckResource(endpoint_name, app=app, service=service)
+
+    endpoint_name = 'spellcheck_text'
+    service = SpellcheckTextService(endpoint_name, backend=None)
+    SpellcheckTextResource(endpoint_name, app=app, service=service)
+
+    app.on_inserted_dictionaries += model_cache.clear
+    app.on_updated_dictionaries += model_cache.clear
+    app.on_deleted_item_dictionaries += model_cache.clear
@@ -0,0 +1,138 @@
+# -*- coding: utf-8; -*-
+#
+# This file is part of Superdesk.
+#
+# Copyright 2013 - 2018 Sourcefabric z.u. and contributors.
+#
+# For the full copyright and license information, please see the
+# AUTHORS and LICENSE files distributed with this source code, or
+# at https://www.sourcefabric.org/superdesk/license
+
+import time
+import collections
+
+from array import array
+from bisect import bisect_left
+from flask import current_app as app
+
+import superdesk
+
+
+def deletes(word):
+    """Get all strings created by deleting single character from word.
+
+    :param word
+    """
+    return {word[:i] + word[i + 1:] for i in range(len(word))}
+
+
+def is_edit1(word, other):
+    """Test if words differ by at most one delete, insert, replace or transpose.
+
+    :param word
+    :param other
+    """
+    if abs(len(word) - len(other)) > 1:
+        return False
+    if len(word) > len(other):
+        word, other = other, word
+    i = 0
+    while i < len(word) and word[i] == other[i]:
+        i += 1
+    if len(word) < len(other):  # insert
+        return word[i:] == other[i + 1:]
+    if word[i + 1:] == other[i + 1:]:  # replace
+        return True
+    return word[i] == other[i + 1] and word[i + 1] == other[i] and word[i + 2:] == other[i + 2:]  # transpose
+
+
+class SpellcheckModel:
+    """Compiled spellcheck model.
+
+    Words are kept in a sorted tuple with counts in an array and each word
+    and its single character deletes are indexed, so finding words within
+    edit distance 1 is just a few dict lookups.
+
+    :param words: dict of word counts, as returned by ``get_model_for_lang``
+    """
+
+    def __init__(self, words):
+        self.words = tuple(sorted(words))
+        self.counts = array('q', (words[word] for word in self.words))
+        index = {}
+        for i, word in enumerate(self.words):
+            for key in deletes(word) | {word}:
+                index.setdefault(key, []).append(i)
+        self.index = {key: positions[0] if len(positions) == 1 else array('l', positions)
+                      for key, positions in index.items()}
+
+    def __len__(self):
+        return len(self.words)
+
+    def __contains__(self, word):
+        i = bisect_left(self.words, word)
+        return i < len(self.words) and self.words[i] == word
+
+    def _positions(self, key):
+        positions = self.index.get(key, ())
+        return (positions, ) if isinstance(positions, int) else positions
+
+    def suggest(self, word):
+        """Suggest corrections for given word sorted by frequency.
+
+        Uses same edits as :func:`apps.spellcheck.spellcheck.norvig_suggest`,
+        but it's not limited to ascii letters.
+
+        :param word: word that is probably wrong
+        """
+        word = word.lower()
+        if word in self:
+            return [word]
+        candidates = set()
+        for key in deletes(word) | {word}:
+            candidates.update(i for i in self._positions(key) if is_edit1(word, self.words[i]))
+        return [self.words[i] for i in sorted(candidates, key=lambda i: (-self.counts[i], self.words[i]))]
+
+
+ModelCacheEntry = collections.namedtuple('ModelCacheEntry', 'model, version, checked')
+
+
+class SpellcheckModelCache:
+    """In process cache of compiled models per language.
+
+    Models are compiled on first use and recompiled when any of language dictionaries
+    is modified. Dictionaries are checked at most every ``SPELLCHECK_MODEL_CHECK_INTERVAL``
+    seconds, changes made via this process invalidate the cache immediately.
+    """
+
+    def __init__(self):
+        self._models = {}
+
+    def get(self, lang):
+        """Get compiled model for given language.
+
+        :param lang: language code
+        """
+        now = time.time()
+        entry = self._models.get(lang)
+        if entry and now - entry.checked < app.config.get('SPELLCHECK_MODEL_CHECK_INTERVAL', 60):
+            return entry.model
+
+        service = superdesk.get_resource_service('dictionaries')
+        version = service.get_model_version(lang)
+        if entry and entry.version == version:
+            model = entry.model
+        else:
+            model = SpellcheckModel(service.get_model_for_lang(lang))
+        self._models[lang] = ModelCacheEntry(model, version, now)
+        return model
+
+    def clear(self, *args, **kwargs):
+        """Drop all compiled models.
+
+        Can be used as eve event hook.
+        """
+        self._models.clear()
+
+
+model_cache = SpellcheckModelCache()
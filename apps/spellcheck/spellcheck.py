@@ -1,6 +1,12 @@
 
+import re
 import superdesk
 
+from .model import model_cache
+
+
+WORD_RE = re.compile(r"\w+(?:['’]\w+)*")
+
 
 def norvig_suggest(word, model):
     """Norvig's simple spell check.
@@ -53,10 +59,51 @@ class SpellcheckService(superdesk.Service):
         :param word: word that is probably wrong
         :param lang: language code
         """
-        model = superdesk.get_resource_service('dictionaries').get_model_for_lang(lang)
-        return norvig_suggest(word, model)
+        return model_cache.get(lang).suggest(word)
 
     def create(self, docs, **kwargs):
         for doc in docs:
             doc['corrections'] = self.suggest(doc['word'], doc['language_id'])
         return [doc['word'] for doc in docs]
+
+
+class SpellcheckTextResource(superdesk.Resource):
+
+    resource_methods = ['POST']
+    item_methods = []
+
+    schema = {
+        'text': {'type': 'string', 'required': True},
+        'language_id': {'type': 'string', 'required': True},
+    }
+
+    # you should be able to make edits
+    privileges = {'POST': 'archive'}
+
+
+class SpellcheckTextService(superdesk.Service):
+
+    def check(self, text, lang):
+        """Find unknown words in given text and suggest corrections.
+
+        Returns list of errors with `word`, its `index` in text and `corrections`.
+
+        :param text: text to check
+        :param lang: language code
+        """
+        model = model_cache.get(lang)
+        errors = []
+        corrections = {}
+        for match in WORD_RE.finditer(text):
+            word = match.group()
+            if word.isdigit() or word in model or word.lower() in model:
+                continue
+            if word not in corrections:
+                corrections[word] = model.suggest(word)
+            errors.append({'word': word, 'index': match.start(), 'corrections': corrections[word]})
+        return errors
+
+    def create(self, docs, **kwargs):
+        for doc in docs:
+            doc['errors'] = self.check(doc['text'], doc['language_id'])
+        return [doc['language_id'] for doc in docs]
@@ -1,7 +1,11 @@
 
+import flask
 import unittest
 
-from .spellcheck import norvig_suggest
+from unittest import mock
+
+from .model import SpellcheckModel, SpellcheckModelCache
+from .spellcheck import norvig_suggest, SpellcheckTextService
 
 
 class SpellcheckTestCase(unittest.TestCase):
@@ -11,3 +15,63 @@ class SpellcheckTestCase(unittest.TestCase):
         model = {'foe': 3, 'fox': 5}
         suggestions = norvig_suggest('foo', model)
         self.assertEquals(['fox', 'foe'], suggestions)
+
+    def test_compiled_model_suggestions(self):
+        words = {'foe': 3, 'fox': 5, 'of': 4, 'food': 1, 'fo': 2, 'bar': 9, 'ofo': 1}
+        model = SpellcheckModel(words)
+        for word in ('foo', 'ofo', 'of', 'fxo', 'fooo', 'baz', 'Foe', 'x'):
+            self.assertEqual(sorted(norvig_suggest(word, words)), sorted(model.suggest(word)), word)
+        self.assertEqual(['fox', 'foe', 'fo', 'food', 'ofo'], model.suggest('foo'))
+        self.assertIn('bar', model)
+        self.assertNotIn('baz', model)
+
+    def test_check_text(self):
+        model = SpellcheckModel({'foe': 3, 'fox': 5, 'Berlin': 1, "don't": 1})
+        with mock.patch('apps.spellcheck.spellcheck.model_cache') as model_cache:
+            model_cache.get.return_value = model
+            errors = SpellcheckTextService().check("Fox foo in Berlin, don't foo 2018", 'en')
+        self.assertEqual([
+            {'word': 'foo', 'index': 4, 'corrections': ['fox', 'foe']},
+            {'word': 'in', 'index': 8, 'corrections': []},
+            {'word': 'foo', 'index': 25, 'corrections': ['fox', 'foe']},
+        ], errors)
+        model_cache.get.assert_called_once_with('en')
+
+
+class SpellcheckModelCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.app = flask.Flask(__name__)
+        self.cache = SpellcheckModelCache()
+        self.service = mock.Mock()
+        self.service.get_model_version.return_value = ['1']
+        self.service.get_model_for_lang.return_value = {'foo': 1}
+
+    def get_model(self):
+        with self.app.app_context():
+            with mock.patch('superdesk.get_resource_service', return_value=self.service):
+                return self.cache.get('en')
+
+    def test_model_is_compiled_once(self):
+        model = self.get_model()
+        self.assertIn('foo', model)
+        self.assertIs(model, self.get_model())
+        self.assertEqual(1, self.service.get_model_version.call_count)
+        self.assertEqual(1, self.service.get_model_for_lang.call_count)
+
+    def test_model_is_recompiled_when_modified(self):
+        self.app.config['SPELLCHECK_MODEL_CHECK_INTERVAL'] = 0
+        model = self.get_model()
+        self.assertIs(model, self.get_model())
+        self.assertEqual(1, self.service.get_model_for_lang.call_count)
+
+        self.service.get_model_version.return_value = ['2']
+        self.service.get_model_for_lang.return_value = {'bar': 1}
+        model = self.get_model()
+        self.assertIn('bar', model)
+        self.assertEqual(2, self.service.get_model_for_lang.call_count)
+
+    def test_clear(self):
+        model = self.get_model()
+        self.cache.clear({})
+        self.assertIsNot(model, self.get_model())
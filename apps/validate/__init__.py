@@ -11,7 +11,7 @@
 
 import logging
 
-from .validate import ValidateService, ValidateResource
+from .validate import ValidateService, ValidateResource, validator_cache
 import superdesk
 
 logger = logging.getLogger(__name__)
@@ -23,3 +23,16 @@ def init_app(app):
     ValidateResource(endpoint_name, app=app, service=service)
 
     superdesk.intrinsic_privilege(resource_name=endpoint_name, method=['POST'])
+
+    app.on_inserted_content_types += validator_cache.clear
+    app.on_updated_content_types += validator_cache.clear
+    app.on_replaced_content_types += validator_cache.clear
+    app.on_deleted_item_content_types += validator_cache.clear
+    app.on_inserted_vocabularies += validator_cache.clear
+    app.on_updated_vocabularies += validator_cache.clear
+    app.on_replaced_vocabularies += validator_cache.clear
+    app.on_deleted_item_vocabularies += validator_cache.clear
+    app.on_inserted_validators += validator_cache.clear
+    app.on_updated_validators += validator_cache.clear
+    app.on_replaced_validators += validator_cache.clear
+    app.on_deleted_item_validators += validator_cache.clear
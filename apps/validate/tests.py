@@ -8,7 +8,9 @@
 # AUTHORS and LICENSE files distributed with this source code, or
 # at https://www.sourcefabric.org/superdesk/license
 
-from apps.validate.validate import SchemaValidator, ValidateService
+from unittest.mock import patch
+from apps.validate.validate import SchemaValidator, ValidateService, validator_cache
+from superdesk import get_resource_service
 from superdesk.tests import TestCase
 from superdesk.metadata.item import ITEM_TYPE
 from superdesk.default_settings import VALIDATOR_MEDIA_METADATA
@@ -308,7 +310,7 @@ class ValidateMandatoryInListTest(TestCase):
             },
             'type': 'dict'
         }}
-        self.assertEqual(service._get_validators(doc)[0]['schema'], schema)
+        self.assertEqual(service._get_validators(doc).validators[0][0]['schema'], schema)
 
     def test_validate_field_required_related_content_error(self):
         self.app.data.insert('content_types', [{'_id': 'foo', 'schema': {
@@ -435,3 +437,35 @@ class ValidateMandatoryInListTest(TestCase):
         ValidateService()._process_media(item, validation_schema)
         self.assertIn('media1', item)
         self.assertEqual(media, item['media1'])
+
+    def test_validators_are_cached(self):
+        self.app.data.insert('content_types', [{'_id': 'foo', 'schema': {
+            'headline': {'required': True, 'type': 'string', 'maxlength': 5},
+            'sms': {'required': True, 'type': 'string', 'minlength': 10},
+        }}])
+        service = ValidateService()
+        vocabularies = get_resource_service('vocabularies')
+        docs = [
+            {'act': 'test', 'type': 'test', 'validate': {'profile': 'foo', 'headline': 'foo'}},
+            {'act': 'test', 'type': 'test', 'validate': {'profile': 'foo', 'headline': 'foo bar'}},
+            {'act': 'test', 'type': 'test', 'validate': {'profile': 'foo', 'headline': 'foo',
+                                                         'flags': {'marked_for_sms': True}, 'sms_message': 'foo'}},
+        ]
+        with patch.dict(self.app.config, {'VALIDATOR_CACHE_TTL': 60}):
+            validator_cache.clear()
+            with patch.object(vocabularies, 'get_extra_fields', wraps=vocabularies.get_extra_fields) as extra_fields:
+                errors = service.create(docs)
+                self.assertEqual(errors, service.create(docs))
+                self.assertEqual(1, extra_fields.call_count)
+
+                entry = service._get_validators({'act': 'test', 'type': 'test', 'validate': {'profile': 'foo'}})
+                self.assertEqual(2, len(entry.compiled))
+
+                original = get_resource_service('content_types').find_one(req=None, _id='foo')
+                self.app.data.update('content_types', 'foo', {'schema': {
+                    'headline': {'required': True, 'type': 'string', 'maxlength': 10},
+                }}, original)
+                self.assertEqual([[], [], []], service.create(docs))
+                self.assertEqual(2, extra_fields.call_count)
+
+        self.assertEqual([[], ['HEADLINE is too long'], ['SMS is too short']], errors)
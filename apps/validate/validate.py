@@ -8,13 +8,17 @@
 # AUTHORS and LICENSE files distributed with this source code, or
 # at https://www.sourcefabric.org/superdesk/license
 
+import threading
+import collections
 import superdesk
 
 from copy import deepcopy
 from datetime import datetime
 from flask import current_app as app
 from eve.io.mongo import Validator
+from eve.utils import config
 from superdesk.metadata.item import ITEM_TYPE
+from superdesk.cache import LocalCache
 from superdesk.logging import logger
 from superdesk.text_utils import get_text
 from superdesk import get_resource_service
@@ -156,6 +160,73 @@ class SchemaValidator(Validator):
                         self._error("media's " + field, MAX_LENGTH.format(length=max_length))
 
 
+class CompiledValidator:
+    """Validator created for given schema.
+
+    Schema is only checked once when validator is created instead of on every validation.
+
+    :param schema: validation schema
+    """
+
+    def __init__(self, schema):
+        self.validator = SchemaValidator(schema, allow_unknown=True)
+        self._lock = threading.Lock()
+
+    def validate(self, doc):
+        """Validate document and return errors.
+
+        :param doc: document
+        """
+        with self._lock:
+            self.validator.validate(doc)
+            return self.validator.errors
+
+
+ValidatorCacheEntry = collections.namedtuple('ValidatorCacheEntry', 'validators, extra, compiled')
+
+
+class ValidatorCache:
+    """In process cache of validation schemas and compiled validators.
+
+    Entries are kept per profile id, profile ``_etag``, act, type and embedded for
+    ``VALIDATOR_CACHE_TTL`` seconds, changes of vocabularies and validators made
+    via this process clear the cache immediately.
+    """
+
+    def __init__(self):
+        self._entries = LocalCache(1000, 60)
+
+    def get(self, key):
+        """Get cache entry if it's not expired.
+
+        :param key: cache key
+        """
+        return self._entries.get(key)
+
+    def set(self, key, validators, extra=None):
+        """Store validators.
+
+        :param key: cache key
+        :param validators: list of tuples of validator and its validation schema
+        :param extra: list of extra fields ids for content profile validators
+        """
+        entry = ValidatorCacheEntry(validators, extra, {})
+        ttl = app.config.get('VALIDATOR_CACHE_TTL', 60)
+        if ttl:
+            self._entries.set(key, entry, ttl)
+        return entry
+
+    def clear(self, *args, **kwargs):
+        """Drop all cached validators.
+
+        Can be used as eve event hook.
+        """
+        self._entries.clear()
+
+
+validator_cache = ValidatorCache()
+
+
 class ValidateResource(superdesk.Resource):
     schema = {
         'act': {'type': 'string', 'required': True},
@@ -185,25 +256,53 @@ class ValidateService(superdesk.Service):
 
         In case there is profile defined for item with respective content type it will
         use its schema for validations, otherwise it will fall back to action/item_type filter.
+
+        :return: validator cache entry
         """
-        extra_field_types = {'text': 'string', 'embed': 'dict', 'date': 'date'}
         profile = doc['validate'].get('profile')
+        content_type = None
         if profile and (app.config['AUTO_PUBLISH_CONTENT_PROFILE'] or doc['act'] != 'auto_publish'):
             content_type = superdesk.get_resource_service('content_types').find_one(req=None, _id=profile)
+
+        key = (profile if content_type else None, content_type.get(config.ETAG) if content_type else None,
+               doc['act'], doc[ITEM_TYPE], bool(doc.get('embedded')))
+        entry = validator_cache.get(key)
+        if entry is None:
             if content_type:
-                extra_fields = superdesk.get_resource_service('vocabularies').get_extra_fields()
-                schema = content_type.get('schema', {})
-                schema['extra'] = {'type': 'dict', 'schema': {}}
-                doc['validate'].setdefault('extra', {})  # make sure extra is there so it will validate its fields
-                for extra_field in extra_fields:
-                    if schema.get(extra_field['_id']) and \
-                            extra_field.get('field_type', None) in extra_field_types:
-                        rules = schema.pop(extra_field['_id'])
-                        rules['type'] = extra_field_types.get(extra_field['field_type'], 'string')
-                        schema['extra']['schema'].update({extra_field['_id']: get_validator_schema(rules)})
-                        self._populate_extra(doc['validate'], extra_field['_id'])
-                content_type['schema'] = schema
-                return [content_type]
+                validator, extra = self._get_profile_validator(content_type)
+                entry = validator_cache.set(key, [(validator, self._get_validator_schema(validator))], extra)
+            else:
+                entry = validator_cache.set(key, [(validator, self._get_validator_schema(validator))
+                                                  for validator in self._get_default_validators(doc)])
+
+        if entry.extra is not None:
+            doc['validate'].setdefault('extra', {})  # make sure extra is there so it will validate its fields
+            for extra_field_id in entry.extra:
+                self._populate_extra(doc['validate'], extra_field_id)
+        return entry
+
+    def _get_profile_validator(self, content_type):
+        """Get validator for content profile with extra fields moved to ``extra`` schema.
+
+        :param content_type: content profile
+        :return: tuple of validator and list of extra fields ids
+        """
+        extra_field_types = {'text': 'string', 'embed': 'dict', 'date': 'date'}
+        extra_fields = superdesk.get_resource_service('vocabularies').get_extra_fields()
+        schema = content_type.get('schema', {})
+        schema['extra'] = {'type': 'dict', 'schema': {}}
+        extra = []
+        for extra_field in extra_fields:
+            if schema.get(extra_field['_id']) and \
+                    extra_field.get('field_type', None) in extra_field_types:
+                rules = schema.pop(extra_field['_id'])
+                rules['type'] = extra_field_types.get(extra_field['field_type'], 'string')
+                schema['extra']['schema'].update({extra_field['_id']: get_validator_schema(rules)})
+                extra.append(extra_field['_id'])
+        content_type['schema'] = schema
+        return content_type, extra
+
+    def _get_default_validators(self, doc):
         lookup = {'act': doc['act'], 'type': doc[ITEM_TYPE]}
         if doc.get('embedded'):
             lookup['embedded'] = doc['embedded']
@@ -212,7 +311,19 @@ class ValidateService(superdesk.Service):
         custom_schema = app.config.get('SCHEMA', {}).get(doc[ITEM_TYPE])
         if custom_schema:
             return [{'schema': custom_schema}]
-        return superdesk.get_resource_service('validators').get(req=None, lookup=lookup)
+        return list(superdesk.get_resource_service('validators').get(req=None, lookup=lookup))
+
+    def _get_compiled_validator(self, entry, index, validation_schema):
+        """Get validator compiled for validation schema.
+
+        Schema can differ per document by sms and media metadata rules.
+        """
+        key = (index, 'sms' in validation_schema,
+               bool(validation_schema.get('associations', {}).get('media_metadata')))
+        compiled = entry.compiled.get(key)
+        if compiled is None:
+            compiled = entry.compiled[key] = CompiledValidator(validation_schema)
+        return compiled
 
     def _populate_extra(self, doc, schema):
         """Populates the extra field in the document with fields stored in subject. Used
@@ -304,7 +415,7 @@ class ValidateService(superdesk.Service):
         :return:
         """
         if doc.get('associations'):
-            schema.setdefault('associations', {})['media_metadata'] = True
+            schema['associations'] = dict(schema.get('associations') or {}, media_metadata=True)
 
     def _get_validator_schema(self, validator):
         """Get schema for given validator.
@@ -326,21 +437,19 @@ class ValidateService(superdesk.Service):
 
     def _validate(self, doc, **kwargs):
         use_headline = kwargs and 'headline' in kwargs
-        validators = self._get_validators(doc)
-        for validator in validators:
-            validation_schema = self._get_validator_schema(validator)
+        entry = self._get_validators(doc)
+        for index, (validator, schema) in enumerate(entry.validators):
+            validation_schema = dict(schema)  # copy for per document changes
             self._sanitize_fields(doc['validate'], validator)
             self._set_default_subject_scheme(doc['validate'])
             self._process_media(doc['validate'], validation_schema)
             self._process_sms(doc['validate'], validation_schema)
             self._process_media_metadata(doc['validate'], validation_schema)
-            v = SchemaValidator()
-            v.allow_unknown = True
+            error_list = {}
             try:
-                v.validate(doc['validate'], validation_schema)
+                error_list = self._get_compiled_validator(entry, index, validation_schema).validate(doc['validate'])
             except TypeError as e:
                 logger.exception('Invalid validator schema value "%s" for ' % str(e))
-            error_list = v.errors
             response = []
             for e in error_list:
                 messages = []
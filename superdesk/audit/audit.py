@@ -9,9 +9,16 @@
 # at https://www.sourcefabric.org/superdesk/license
 
 import logging
-from flask import g
+
+from bson import ObjectId
+from copy import deepcopy
+from functools import partial
+from flask import g, current_app as app
+from eve.utils import config
 from superdesk.resource import Resource
 from superdesk.services import BaseService
+from superdesk.utc import utcnow
+from .buffer import audit_buffer
 
 log = logging.getLogger(__name__)
 
@@ -31,6 +38,12 @@ class AuditResource(Resource):
 
 
 class AuditService(BaseService):
+    """Audit service.
+
+    Records are buffered and written in background if ``AUDIT_BUFFER_SIZE`` is set,
+    so auditing doesn't slow down requests.
+    """
+
     def on_generic_inserted(self, resource, docs):
         if resource in AuditResource.exclude:
             return
@@ -55,7 +68,7 @@ class AuditService(BaseService):
             'audit_id': self._extract_doc_id(docs[0])
         }
 
-        self.post([audit])
+        self._save(audit)
 
     def on_generic_updated(self, resource, doc, original):
         if resource in AuditResource.exclude:
@@ -69,12 +82,12 @@ class AuditService(BaseService):
             'user': user.get('_id'),
             'resource': resource,
             'action': 'updated',
-            'extra': doc,
+            'extra': self._get_changes(doc, original) if app.config.get('AUDIT_STORE_DIFF') else doc,
             'audit_id': self._extract_doc_id(doc) if self._extract_doc_id(doc) else self._extract_doc_id(original)
         }
         if '_id' not in doc:
             audit['extra']['_id'] = original.get('_id', None)
-        self.post([audit])
+        self._save(audit)
 
     def on_generic_deleted(self, resource, doc):
         if resource in AuditResource.exclude:
@@ -91,8 +104,58 @@ class AuditService(BaseService):
             'extra': doc,
             'audit_id': self._extract_doc_id(doc)
         }
+        self._save(audit)
+
+    def _save(self, audit):
+        """Save audit record.
+
+        Record is added to buffer if enabled, it's saved synchronously otherwise
+        or when the buffer is full.
+
+        :param dict audit: audit record
+        """
+        size = app.config.get('AUDIT_BUFFER_SIZE', 0)
+        if size:
+            now = utcnow()
+            record = deepcopy(audit)  # docs can be modified before written
+            record.setdefault(config.ID_FIELD, ObjectId())
+            record.setdefault(config.DATE_CREATED, now)
+            record.setdefault(config.LAST_UPDATED, now)
+            audit_buffer.configure(partial(self._write_records, app._get_current_object()), size,
+                                   app.config.get('AUDIT_BATCH_SIZE', 100),
+                                   app.config.get('AUDIT_FLUSH_INTERVAL', 1),
+                                   app.config.get('AUDIT_SPOOL_DIR') or None)
+            if audit_buffer.put(record):
+                return
+            log.warning('audit buffer is full or spool is not writable, saving audit synchronously')
         self.post([audit])
 
+    def _write_records(self, flask_app, records):
+        """Write buffered records.
+
+        Records which are saved already are skipped, those can be in spool files
+        when process failed after writing the records.
+
+        :param flask_app: app instance
+        :param list records: audit records
+        """
+        with flask_app.app_context():
+            try:
+                self.post(records)
+            except Exception:
+                for record in records:
+                    if self.find_one(req=None, _id=record[config.ID_FIELD]) is None:
+                        self.post([record])
+
+    def _get_changes(self, updates, original):
+        """Get id and fields from updates with values different from original.
+
+        :param dict updates: updates
+        :param dict original: original document
+        """
+        return {key: val for key, val in updates.items()
+                if key == config.ID_FIELD or key not in original or original[key] != val}
+
     def _extract_doc_id(self, doc):
         """
         Given an audit item try to extract the id of the item that it relates to
@@ -0,0 +1,209 @@
+# -*- coding: utf-8; -*-
+#
+# This file is part of Superdesk.
+#
+# Copyright 2013 - 2018 Sourcefabric z.u. and contributors.
+#
+# For the full copyright and license information, please see the
+# AUTHORS and LICENSE files distributed with this source code, or
+# at https://www.sourcefabric.org/superdesk/license
+
+import os
+import time
+import fcntl
+import atexit
+import logging
+import threading
+
+from bson import json_util
+from collections import deque
+from celery.signals import worker_process_shutdown
+from superdesk.utils import get_random_string
+
+logger = logging.getLogger(__name__)
+
+#: seconds between checks for spool files left by other processes
+REPLAY_INTERVAL = 60
+
+
+class AuditBuffer:
+    """Bounded in process buffer of audit records.
+
+    Background thread writes records in batches once there are ``batch_size`` records
+    or every ``flush_interval`` seconds, remaining records are written on exit
+    and when celery worker process is shutting down.
+
+    If ``spool_dir`` is set, records are also appended to a spool file locked by the process
+    before those are buffered. Spool file is removed once its records are written, so files
+    which are not locked were left by processes which crashed or failed to write the records.
+    Those are written by background thread of any process every ``REPLAY_INTERVAL`` seconds.
+
+    Parameters are set via :meth:`configure`, so changes of config are used by running buffer.
+    """
+
+    def __init__(self):
+        self.write = None
+        self.size = 0
+        self.batch_size = 100
+        self.flush_interval = 1
+        self.spool_dir = None
+        self._records = deque()
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._spool = None
+        self._pid = None
+        self._next_replay = 0
+
+    def __len__(self):
+        return len(self._records)
+
+    def configure(self, write, size, batch_size, flush_interval, spool_dir=None):
+        """Set buffer parameters.
+
+        :param write: function called with list of records, it should skip records which are saved already
+        :param size: max number of buffered records
+        :param batch_size: max number of records per write
+        :param flush_interval: seconds between writes
+        :param spool_dir: folder for spool files, ``None`` means records are only in memory
+        """
+        self.write = write
+        self.size = size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.spool_dir = spool_dir
+
+    def put(self, record):
+        """Add record to buffer.
+
+        :param dict record: audit record with ``_id``
+        :return: ``False`` if record was not added because buffer is full or it can't be spooled
+        """
+        if self._pid != os.getpid():
+            self._start()
+        with self._cond:
+            if len(self._records) >= self.size:
+                return False
+            if self.spool_dir:
+                try:
+                    self._spool_record(record)
+                except (OSError, TypeError, ValueError):
+                    logger.exception('failed to spool audit record')
+                    return False
+            self._records.append(record)
+            if len(self._records) >= self.batch_size:
+                self._cond.notify()
+        return True
+
+    def flush(self):
+        """Write all buffered records and remove spool file."""
+        with self._flush_lock:
+            with self._cond:
+                records = list(self._records)
+                self._records.clear()
+                spool, self._spool = self._spool, None
+            if records:
+                unsaved = self._write_batches(records)
+            else:
+                unsaved = []
+            if spool is not None:
+                if not unsaved:
+                    os.unlink(spool.name)
+                else:
+                    logger.error('%d audit records not saved, those are kept in %s', len(unsaved), spool.name)
+                spool.close()
+            else:
+                for record in unsaved:
+                    logger.error('audit record not saved: %s', json_util.dumps(record))
+
+    def replay(self):
+        """Write records from spool files which are not used by any process and remove those files."""
+        if not self.spool_dir or not os.path.isdir(self.spool_dir):
+            return
+        for name in sorted(os.listdir(self.spool_dir)):
+            if name.startswith('audit-'):
+                self._replay_file(os.path.join(self.spool_dir, name))
+
+    def _replay_file(self, path):
+        try:
+            spool = open(path, encoding='utf-8')
+        except FileNotFoundError:
+            return
+        with spool:
+            try:
+                fcntl.flock(spool, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                return  # used by other process
+            stat = os.fstat(spool.fileno())
+            if not stat.st_nlink:
+                return  # replayed meanwhile
+            if not stat.st_size and stat.st_mtime > time.time() - REPLAY_INTERVAL:
+                return  # just created, not locked yet
+            records = []
+            for line in spool:
+                try:
+                    records.append(json_util.loads(line))
+                except ValueError:
+                    logger.warning('skipping invalid audit record in %s', path)
+            if not self._write_batches(records):
+                logger.info('replayed %d audit records from %s', len(records), path)
+                os.unlink(path)
+
+    def _write_batches(self, records):
+        """Write records in batches.
+
+        :param list records: records to write
+        :return: list of records which were not written
+        """
+        for i in range(0, len(records), self.batch_size):
+            try:
+                self.write(records[i:i + self.batch_size])
+            except Exception:
+                logger.exception('failed to write audit records')
+                return records[i:]
+        return []
+
+    def _spool_record(self, record):
+        if self._spool is None:
+            os.makedirs(self.spool_dir, exist_ok=True)
+            path = os.path.join(self.spool_dir, 'audit-{}-{}.jsonl'.format(os.getpid(), get_random_string(8)))
+            spool = open(path, 'a', encoding='utf-8')
+            fcntl.flock(spool, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            self._spool = spool
+        self._spool.write(json_util.dumps(record) + '\n')
+        self._spool.flush()
+
+    def _start(self):
+        with self._cond:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            # records and spool file from parent process are written by parent
+            self._records = deque()
+            if self._spool is not None:
+                self._spool.close()
+                self._spool = None
+        thread = threading.Thread(target=self._run, daemon=True)
+        thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if len(self._records) < self.batch_size:
+                    self._cond.wait(self.flush_interval)
+            self.flush()
+            if self.spool_dir and time.time() >= self._next_replay:
+                self._next_replay = time.time() + REPLAY_INTERVAL
+                try:
+                    self.replay()
+                except Exception:
+                    logger.exception('failed to replay audit spool')
+
+
+audit_buffer = AuditBuffer()
+atexit.register(audit_buffer.flush)
+
+
+@worker_process_shutdown.connect
+def flush_audit_buffer(**kwargs):
+    """Write buffered audit records when celery worker process is shutting down."""
+    audit_buffer.flush()
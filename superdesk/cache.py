@@ -1,13 +1,25 @@
 
+import os
+import bson
+import copy
+import time
 import redis
 import hermes
+import threading
+import collections
 import hermes.backend
 import hermes.backend.dict
 import hermes.backend.redis
 
-from flask import current_app as app
+from bson.codec_options import CodecOptions
+from flask import current_app as app, json
+from kombu import Queue
+from kombu.mixins import ConsumerMixin
 from superdesk import json_utils
 from superdesk.logging import logger
+from superdesk.utils import get_random_string
+from superdesk.default_settings import celery_queue
+from superdesk.websockets_comms import SocketBrokerClient, SocketMessageProducer
 
 
 class SuperdeskRedisBackend(hermes.backend.redis.Backend):
@@ -36,6 +48,18 @@ class SuperdeskMangler(hermes.Mangler):
         return json_utils.loads(value)
 
 
+class BSONMangler(SuperdeskMangler):
+    """Encodes values using BSON, so types of mongo documents are kept as they are."""
+
+    codec_options = CodecOptions(tz_aware=True)
+
+    def dumps(self, value):
+        return bson.BSON.encode(value)
+
+    def loads(self, value):
+        return bson.BSON(value).decode(codec_options=self.codec_options)
+
+
 class SuperdeskCacheBackend(hermes.backend.AbstractBackend):
     """Proxy for hermes cache backend.
 
@@ -46,25 +70,30 @@ class SuperdeskCacheBackend(hermes.backend.AbstractBackend):
     or memcached.
     """
 
+    #: app attribute holding the backend
+    app_attr = 'cache'
+
     @property
     def _backend(self):
         if not app:
             raise RuntimeError('You can only use cache within app context.')
 
-        if not app.cache:
+        backend = getattr(app, self.app_attr, None)
+        if not backend:
             cache_url = app.config.get('CACHE_URL', '')
             if 'redis' in cache_url or 'unix' in cache_url:
-                app.cache = SuperdeskRedisBackend(self.mangler, url=cache_url)
+                backend = SuperdeskRedisBackend(self.mangler, url=cache_url)
                 logger.info('using redis cache backend')
             elif cache_url:
                 import hermes.backend.memcached
-                app.cache = hermes.backend.memcached.Backend(self.mangler, servers=[cache_url])
+                backend = hermes.backend.memcached.Backend(self.mangler, servers=[cache_url])
                 logger.info('using memcached cache backend')
             else:
-                app.cache = hermes.backend.dict.Backend(self.mangler)
+                backend = hermes.backend.dict.Backend(self.mangler)
                 logger.info('using dict cache backend')
+            setattr(app, self.app_attr, backend)
 
-        return app.cache
+        return backend
 
     def lock(self, key):
         return self._backend.lock(key)
@@ -84,3 +113,227 @@ class SuperdeskCacheBackend(hermes.backend.AbstractBackend):
 
 
 cache = hermes.Hermes(SuperdeskCacheBackend, SuperdeskMangler, ttl=600)
+
+
+class ResourceCacheBackend(SuperdeskCacheBackend):
+    """Cache backend for :class:`ResourceCache`, it uses same ``CACHE_URL`` with BSON encoding."""
+
+    app_attr = 'resource_cache_backend'
+
+
+class LocalCache:
+    """In process LRU cache with expiration.
+
+    :param maxsize: max number of items
+    :param ttl: seconds after which items expire
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._items = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is None:
+                return None
+            if entry[1] < time.time():
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, value, ttl=None):
+        """Store value.
+
+        :param key: cache key
+        :param value: value
+        :param ttl: seconds after which value expires, ``ttl`` of cache is used by default
+        """
+        with self._lock:
+            self._items[key] = (value, time.time() + (self.ttl if ttl is None else ttl))
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def remove(self, keys):
+        with self._lock:
+            for key in keys:
+                self._items.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+class CacheInvalidationConsumer(SocketBrokerClient, ConsumerMixin):
+    """Consumer of cache invalidation messages.
+
+    :param url: broker url
+    :param cache: resource cache
+    :param exchange_name: fanout exchange name
+    """
+
+    def __init__(self, url, cache, exchange_name=None):
+        super().__init__(url, exchange_name)
+        self.cache = cache
+        self.queue = Queue('cache_consumer_{}'.format(get_random_string()), exchange=self.socket_exchange,
+                           channel=self.channel,
+                           queue_arguments={'x-message-ttl': 10000, 'x-expires': 60000})
+
+    def get_consumers(self, Consumer, channel):
+        return [Consumer(queues=[self.queue], callbacks=[self.on_message])]
+
+    def on_consume_ready(self, connection, channel, consumers, **kwargs):
+        # messages could be lost while not connected
+        self.cache.local.clear()
+        self.cache.listening = True
+
+    def on_connection_error(self, exc, interval):
+        self.cache.listening = False
+        super().on_connection_error(exc, interval)
+
+    def on_consume_end(self, connection, channel):
+        self.cache.listening = False
+
+    def on_message(self, body, message):
+        try:
+            data = json.loads(body)
+            if data.get('pid') != os.getpid():
+                self.cache.remove(data['resource'], data['ids'])
+        except Exception:
+            logger.exception('Failed to invalidate cache {}'.format(body))
+        message.ack()
+
+
+class ResourceCache:
+    """Cache of items from small resources which are not changing often.
+
+    Items are kept in process LRU cache in front of shared ``cache`` backend.
+    Writers remove items from both and publish message via broker, so other processes
+    can remove items from their in process cache. In process cache is only used
+    when connected to broker.
+
+    Resources are configured via ``FIND_ONE_CACHE_RESOURCES``.
+
+    :param backend: shared cache backend
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.local = LocalCache(0, 0)
+        self.listening = False
+        self._pid = None
+        self._producer = None
+        self._lock = threading.Lock()
+
+    def is_cached(self, resource):
+        """Test if items of given resource are cached.
+
+        :param resource: resource name
+        """
+        return resource in app.config.get('FIND_ONE_CACHE_RESOURCES', [])
+
+    def key(self, resource, id):
+        return 'find_one:{}:{}'.format(resource, id)
+
+    def load(self, resource, id):
+        """Get cached item or ``None``.
+
+        :param resource: resource name
+        :param id: item id
+        """
+        key = self.key(resource, id)
+        local = self._get_local()
+        if local is not None:
+            item = local.get(key)
+            if item is not None:
+                return copy.deepcopy(item)
+        item = self.backend.load(key)
+        if item is not None and local is not None:
+            local.set(key, copy.deepcopy(item))
+        return item
+
+    def save(self, resource, id, item):
+        """Store item in cache.
+
+        :param resource: resource name
+        :param id: item id
+        :param item: item
+        """
+        key = self.key(resource, id)
+        self.backend.save(key, item, ttl=app.config.get('FIND_ONE_CACHE_TTL', 300))
+        local = self._get_local()
+        if local is not None:
+            local.set(key, copy.deepcopy(item))
+
+    def remove(self, resource, ids):
+        """Remove items from cache in this process and shared cache.
+
+        :param resource: resource name
+        :param ids: list of item ids
+        """
+        keys = [self.key(resource, id) for id in ids]
+        self.local.remove(keys)
+        self.backend.remove(keys)
+
+    def invalidate(self, resource, ids):
+        """Remove items from cache and notify other processes.
+
+        :param resource: resource name
+        :param ids: list of item ids
+        """
+        self.remove(resource, ids)
+        producer = self._get_producer()
+        if producer is not None:
+            producer.send(json.dumps({'resource': resource, 'ids': [str(id) for id in ids], 'pid': os.getpid()}))
+
+    def _get_local(self):
+        """Get in process cache if it's up to date.
+
+        Starts listening for invalidations on first call in a process.
+        """
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._start(app._get_current_object())
+        return self.local if self.listening else None
+
+    def _get_producer(self):
+        if self._producer is None or self._producer.connection is None:
+            try:
+                self._producer = SocketMessageProducer(app.config['CELERY_BROKER_URL'],
+                                                       celery_queue('cache_invalidation'))
+            except Exception:
+                logger.exception('Failed to connect to broker, cache invalidation is not sent')
+                return None
+        return self._producer
+
+    def _start(self, flask_app):
+        self._pid = os.getpid()
+        self._producer = None
+        self.listening = False
+        self.local = LocalCache(flask_app.config.get('FIND_ONE_CACHE_LOCAL_SIZE', 1000),
+                                flask_app.config.get('FIND_ONE_CACHE_LOCAL_TTL', 60))
+        thread = threading.Thread(target=self._listen, args=(flask_app, ), daemon=True)
+        thread.start()
+
+    def _listen(self, flask_app):
+        with flask_app.app_context():
+            while True:
+                try:
+                    consumer = CacheInvalidationConsumer(flask_app.config['CELERY_BROKER_URL'], self,
+                                                         celery_queue('cache_invalidation'))
+                except Exception:
+                    logger.exception('Failed to connect to broker, in process cache is disabled')
+                    time.sleep(10)
+                    continue
+                consumer.run()
+
+
+resource_cache = ResourceCache(ResourceCacheBackend(BSONMangler()))
@@ -8,10 +8,13 @@
 # AUTHORS and LICENSE files distributed with this source code, or
 # at https://www.sourcefabric.org/superdesk/license
 
+import bson
 import time
 import pymongo
 import superdesk
 
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from flask import current_app as app
 from superdesk.errors import BulkIndexError
 from superdesk import config
@@ -24,79 +27,217 @@ class IndexFromMongo(superdesk.Command):
 
     Use ``-f all`` to index all collections.
 
+    Collection is split by ``_id`` into ``--workers`` shards indexed in parallel, while next page
+    is read from mongo previous ones are being indexed. Progress of every shard is stored in mongo
+    so it can continue where it stopped using ``--resume``.
+
     Example:
     ::
 
         $ python manage.py app:index_from_mongo --from=archive
         $ python manage.py app:index_from_mongo --all
+        $ python manage.py app:index_from_mongo --from=archive --workers=8 --resume
     """
 
     option_list = [
         superdesk.Option('--from', '-f', dest='collection_name'),
         superdesk.Option('--all', action='store_true', dest='all_collections'),
-        superdesk.Option('--page-size', '-p')
+        superdesk.Option('--page-size', '-p'),
+        superdesk.Option('--workers', '-w', type=int, default=1),
+        superdesk.Option('--bulk-bytes', '-b', type=int, dest='bulk_bytes'),
+        superdesk.Option('--resume', '-r', action='store_true'),
     ]
     default_page_size = 500
+    default_bulk_bytes = 5 * 1024 * 1024
+
+    #: max number of bulk requests per worker running while reading next page
+    pending_bulks = 2
 
-    def run(self, collection_name, all_collections, page_size):
+    #: mongo collection with progress of indexing
+    checkpoints_collection = 'index_from_mongo'
+
+    def run(self, collection_name, all_collections, page_size, workers=1, bulk_bytes=None, resume=False):
         if not collection_name and not all_collections:
             raise SystemExit('Specify --all to index from all collections')
         elif all_collections:
             app.data.init_elastic(app)
             resources = app.data.get_elastic_resources()
             for resource in resources:
-                self.copy_resource(resource, page_size)
+                self.copy_resource(resource, page_size, workers, bulk_bytes, resume)
         else:
-            self.copy_resource(collection_name, page_size)
+            self.copy_resource(collection_name, page_size, workers, bulk_bytes, resume)
 
     @classmethod
-    def copy_resource(cls, resource, page_size):
-        for items in cls.get_mongo_items(resource, page_size):
-            print('{} Inserting {} items'.format(time.strftime('%X %x %Z'), len(items)))
-            s = time.time()
-            success, failed = 0, 0
-
-            for i in range(1, 4):
-                try:
-                    success, failed = superdesk.app.data._search_backend(resource).bulk_insert(
-                        resource, items)
-                except Exception as ex:
-                    print('Exception thrown on insert to elastic {}', ex)
-                    time.sleep(10)
-                    continue
-                else:
-                    break
-
-            print('{} Inserted {} items in {:.3f} seconds'.format(time.strftime('%X %x %Z'), success, time.time() - s))
-            if failed:
-                print('Failed to do bulk insert of items {}. Errors: {}'.format(len(failed), failed))
-                raise BulkIndexError(resource=resource, errors=failed)
+    def copy_resource(cls, resource, page_size, workers=1, bulk_bytes=None, resume=False):
+        """Index resource from mongo.
+
+        :param resource: resource name
+        :param page_size: number of items read from mongo at once
+        :param workers: number of shards indexed in parallel
+        :param bulk_bytes: max size of single elastic bulk request
+        :param resume: continue from last checkpoint if there is any
+        """
+        checkpoints = app.data.get_mongo_collection(resource).database[cls.checkpoints_collection]
+        checkpoint = checkpoints.find_one({config.ID_FIELD: resource}) if resume else None
+        if checkpoint:
+            print('Resuming indexing of {}'.format(resource))
+        else:
+            checkpoint = {config.ID_FIELD: resource, 'shards': cls.get_shards(resource, workers or 1)}
+            checkpoints.replace_one({config.ID_FIELD: resource}, checkpoint, upsert=True)
+
+        shards = [shard for shard in checkpoint['shards'] if not shard.get('done')]
+        flask_app = app._get_current_object()
+
+        def worker(shard):
+            with flask_app.app_context():
+                return cls.copy_shard(resource, shard, page_size, bulk_bytes, checkpoints)
 
+        start = time.time()
+        with ThreadPoolExecutor(max_workers=max(len(shards), 1)) as executor:
+            indexed = sum(executor.map(worker, shards))
+
+        elapsed = time.time() - start
+        print('{} Indexed {} items of {} in {:.3f} seconds ({:.1f} docs/sec)'.format(
+            time.strftime('%X %x %Z'), indexed, resource, elapsed, indexed / elapsed if elapsed else 0))
         return 'Finished indexing collection {}'.format(resource)
 
     @classmethod
-    def get_mongo_items(cls, mongo_collection_name, page_size):
-        """Generate list of items from given mongo collection per page size.
+    def get_shards(cls, resource, count):
+        """Split collection by ``_id`` into shards of similar size.
+
+        :param resource: resource name
+        :param count: number of shards
+        """
+        db = app.data.get_mongo_collection(resource)
+        total = db.count()
+        bounds = [None]
+        for i in range(1, count if total > count else 1):
+            docs = list(db.find({}, {config.ID_FIELD: 1}).sort(config.ID_FIELD, pymongo.ASCENDING)
+                        .skip(total * i // count).limit(1))
+            if docs and docs[0][config.ID_FIELD] != bounds[-1]:
+                bounds.append(docs[0][config.ID_FIELD])
+        bounds.append(None)
+        return [{'shard': i, 'start': bounds[i], 'end': bounds[i + 1], 'last_id': None, 'count': 0, 'done': False}
+                for i in range(len(bounds) - 1)]
+
+    @classmethod
+    def copy_shard(cls, resource, shard, page_size, bulk_bytes, checkpoints):
+        """Index single shard.
+
+        Items are sent to elastic in bulks limited by size in bytes, while bulks are being indexed
+        next page is read from mongo. Checkpoint is updated once all items before it are indexed.
+
+        :param resource: resource name
+        :param shard: shard info as returned by :meth:`get_shards`
+        :param page_size: number of items read from mongo at once
+        :param bulk_bytes: max size of single elastic bulk request
+        :param checkpoints: checkpoints collection
+        """
+        count = shard.get('count', 0)
+        last_id = shard.get('last_id')
+        pending = deque()
+
+        def checkpoint(future=None, bulk_last_id=None, done=False):
+            nonlocal count, last_id
+            if future:
+                count += future.result()
+                last_id = bulk_last_id
+            prefix = 'shards.{}.'.format(shard['shard'])
+            checkpoints.update_one({config.ID_FIELD: resource}, {'$set': {
+                prefix + 'last_id': last_id,
+                prefix + 'count': count,
+                prefix + 'done': done,
+            }})
+
+        with ThreadPoolExecutor(max_workers=cls.pending_bulks) as executor:
+            items = cls.get_mongo_items(resource, page_size, shard['start'], shard['end'], last_id)
+            for bulk in cls.get_bulks(items, bulk_bytes):
+                while len(pending) >= cls.pending_bulks or (pending and pending[0][0].done()):
+                    checkpoint(*pending.popleft())
+                pending.append((executor.submit(cls.bulk_insert, resource, bulk), bulk[-1][config.ID_FIELD]))
+            while pending:
+                checkpoint(*pending.popleft())
+
+        checkpoint(done=True)
+        return count - shard.get('count', 0)
+
+    @classmethod
+    def get_bulks(cls, items, bulk_bytes=None):
+        """Group items into lists limited by size in bytes.
+
+        :param items: items iterable
+        :param bulk_bytes: max size of single bulk
+        """
+        max_bytes = bulk_bytes or cls.default_bulk_bytes
+        bulk, size = [], 0
+        for item in items:
+            item_size = len(bson.BSON.encode(item))
+            if bulk and size + item_size > max_bytes:
+                yield bulk
+                bulk, size = [], 0
+            bulk.append(item)
+            size += item_size
+        if bulk:
+            yield bulk
+
+    @classmethod
+    def bulk_insert(cls, resource, items):
+        """Insert items into elastic, retry when elastic is not available.
+
+        :param resource: resource name
+        :param items: list of items
+        """
+        print('{} Inserting {} items'.format(time.strftime('%X %x %Z'), len(items)))
+        s = time.time()
+
+        for i in range(1, 4):
+            try:
+                success, failed = superdesk.app.data._search_backend(resource).bulk_insert(
+                    resource, items)
+            except Exception as ex:
+                print('Exception thrown on insert to elastic {}', ex)
+                if i == 3:
+                    raise
+                time.sleep(10)
+            else:
+                break
+
+        print('{} Inserted {} items in {:.3f} seconds'.format(time.strftime('%X %x %Z'), success, time.time() - s))
+        if failed:
+            print('Failed to do bulk insert of items {}. Errors: {}'.format(len(failed), failed))
+            raise BulkIndexError(resource=resource, errors=failed)
+        return success
+
+    @classmethod
+    def get_mongo_items(cls, mongo_collection_name, page_size, start=None, end=None, last_id=None):
+        """Generate items from given mongo collection reading them per page size.
 
         :param mongo_collection_name: Name of the collection to get the items
-        :param page_size: Size of every list in each iteration
-        :return: list of items
+        :param page_size: Size of every page read from mongo
+        :param start: min ``_id`` of items
+        :param end: ``_id`` of first item after the range
+        :param last_id: ``_id`` of last item already processed
+        :return: items
         """
         bucket_size = int(page_size) if page_size else cls.default_page_size
         print('Indexing data from mongo/{} to elastic/{}'.format(mongo_collection_name, mongo_collection_name))
 
         db = app.data.get_mongo_collection(mongo_collection_name)
         args = {'limit': bucket_size, 'sort': [(config.ID_FIELD, pymongo.ASCENDING)]}
-        last_id = None
         while True:
-            if last_id:
-                args.update({'filter': {config.ID_FIELD: {'$gt': last_id}}})
-            cursor = db.find(**args)
-            if not cursor.count():
+            lookup = {}
+            if last_id is not None:
+                lookup['$gt'] = last_id
+            elif start is not None:
+                lookup['$gte'] = start
+            if end is not None:
+                lookup['$lt'] = end
+            args['filter'] = {config.ID_FIELD: lookup} if lookup else {}
+            items = list(db.find(**args))
+            if not items:
                 break
-            items = list(cursor)
             last_id = items[-1][config.ID_FIELD]
-            yield items
+            yield from items
 
 
 superdesk.command('app:index_from_mongo', IndexFromMongo())
@@ -15,6 +15,7 @@ Environment variables names match config name, with some expections documented b
 """
 import json
 import os
+import tempfile
 import pytz
 import tzlocal
 
@@ -132,6 +133,9 @@ LEGAL_ARCHIVE_DBNAME = env('LEGAL_ARCHIVE_DBNAME', 'legal_archive')
 #: legal archive mongodb uri
 LEGAL_ARCHIVE_URI = env('LEGAL_ARCHIVE_URI', 'mongodb://localhost/%s' % LEGAL_ARCHIVE_DBNAME)
 
+#: number of threads used for importing items by ``legal_archive:import`` command
+LEGAL_ARCHIVE_IMPORT_WORKERS = int(env('LEGAL_ARCHIVE_IMPORT_WORKERS', 4))
+
 #: archived mongodb db name
 ARCHIVED_DBNAME = env('ARCHIVED_DBNAME', 'archived')
 
@@ -184,6 +188,25 @@ if env('REDIS_PORT'):
 #: cache url - superdesk will try to figure out if it's redis or memcached
 CACHE_URL = env('SUPERDESK_CACHE_URL', REDIS_URL)
 
+#: resources which items are cached when fetched by ``_id`` via ``find_one``,
+#: changes are published via broker to invalidate the cache in other processes.
+#: Use it only for small resources which are not changing often, not for ``users``
+#: as cached items are stored in ``CACHE_URL`` cache including sensitive fields.
+FIND_ONE_CACHE_RESOURCES = ['desks', 'stages', 'vocabularies', 'products', 'subscribers']
+
+#: seconds after which cached ``find_one`` item expires
+FIND_ONE_CACHE_TTL = int(env('FIND_ONE_CACHE_TTL', 300))
+
+#: max number of items in per process cache in front of ``CACHE_URL`` cache
+FIND_ONE_CACHE_LOCAL_SIZE = int(env('FIND_ONE_CACHE_LOCAL_SIZE', 1000))
+
+#: seconds after which item in per process cache expires
+FIND_ONE_CACHE_LOCAL_TTL = int(env('FIND_ONE_CACHE_LOCAL_TTL', 60))
+
+#: part of ``find_one`` reads which check that item from mongo is also in elastic,
+#: when it's less than 1 the checks run in background, use 1 to check every read inline
+FIND_ONE_SEARCH_CHECK_RATE = float(env('FIND_ONE_SEARCH_CHECK_RATE', 0.01))
+
 #: celery broker
 BROKER_URL = env('CELERY_BROKER_URL', REDIS_URL)
 CELERY_BROKER_URL = BROKER_URL
@@ -492,6 +515,9 @@ RENDITIONS = {
     }
 }
 
+#: max number of renditions encoded and stored in parallel for single picture
+MAX_RENDITION_THREADS = int(env('MAX_RENDITION_THREADS', 4))
+
 
 #: BCRYPT work factor
 BCRYPT_GENSALT_WORK_FACTOR = 12
@@ -539,12 +565,44 @@ CONTENT_EXPIRY_MINUTES = int(env('CONTENT_EXPIRY_MINUTES', 0))
 #: The number of minutes before ingest items are purged
 INGEST_EXPIRY_MINUTES = int(env('INGEST_EXPIRY_MINUTES', 2 * 24 * 60))
 
+#: Save ingested items using bulk writes, items are indexed in elastic without reading them back from mongo
+INGEST_BULK_WRITE = strtobool(env('INGEST_BULK_WRITE', 'false'))
+
+#: max number of providers waiting for update in ``ingest:watch``
+INGEST_WATCH_QUEUE_SIZE = int(env('INGEST_WATCH_QUEUE_SIZE', 100))
+
+#: max number of new files ingested by single update in ``ingest:watch``, more files trigger full update
+INGEST_WATCH_MAX_FILES = int(env('INGEST_WATCH_MAX_FILES', 1000))
+
+#: seconds ``ingest:watch`` waits after first new file for more files
+INGEST_WATCH_DELAY = float(env('INGEST_WATCH_DELAY', 1))
+
+#: seconds after which ``ingest:watch`` reloads providers
+INGEST_WATCH_REFRESH = int(env('INGEST_WATCH_REFRESH', 60))
+
 #: The number of minutes before published content items are purged
 PUBLISHED_CONTENT_EXPIRY_MINUTES = int(env('PUBLISHED_CONTENT_EXPIRY_MINUTES', 0))
 
 #: The number of minutes before audit content is purged
 AUDIT_EXPIRY_MINUTES = int(env('AUDIT_EXPIRY_MINUTES', 0))
 
+#: max number of audit records buffered in memory and written in background,
+#: it's 0 by default so audit is written synchronously
+AUDIT_BUFFER_SIZE = int(env('AUDIT_BUFFER_SIZE', 0))
+
+#: max number of audit records written using single insert
+AUDIT_BATCH_SIZE = int(env('AUDIT_BATCH_SIZE', 100))
+
+#: seconds after which buffered audit records are written
+AUDIT_FLUSH_INTERVAL = float(env('AUDIT_FLUSH_INTERVAL', 1))
+
+#: folder where buffered audit records are spooled, so records of processes which were killed
+#: are written by other processes, set it to empty string to keep buffered records only in memory
+AUDIT_SPOOL_DIR = env('AUDIT_SPOOL_DIR', os.path.join(tempfile.gettempdir(), 'superdesk-audit'))
+
+#: store only changed fields for updates in audit
+AUDIT_STORE_DIFF = strtobool(env('AUDIT_STORE_DIFF', 'false'))
+
 #: The number records to be fetched for expiry.
 MAX_EXPIRY_QUERY_LIMIT = int(env('MAX_EXPIRY_QUERY_LIMIT', 100))
 
@@ -570,9 +628,32 @@ WS_PORT = env('WSPORT', '5100')
 # Used by the  Kombu Connection. Only valid for the AMQP protocol
 WS_HEART_BEAT = int(env('WS_HEARTBEAT', '0'))
 
+#: max number of messages queued for websocket client, oldest messages are dropped when it's full
+WS_CLIENT_QUEUE_SIZE = int(env('WS_CLIENT_QUEUE_SIZE', 100))
+
+#: seconds between websocket server metrics logs
+WS_METRICS_INTERVAL = int(env('WS_METRICS_INTERVAL', 60))
+
+#: max number of notifications merged and sent as single message at the end of request or celery task,
+#: buffering is disabled if set to 0
+NOTIFICATION_BUFFER_SIZE = int(env('NOTIFICATION_BUFFER_SIZE', 0))
+
+#: max number of seconds notifications are buffered
+NOTIFICATION_BUFFER_TIME = int(env('NOTIFICATION_BUFFER_TIME', 1))
+
+#: max number of seconds compiled spellcheck model is used without checking dictionaries for changes
+SPELLCHECK_MODEL_CHECK_INTERVAL = int(env('SPELLCHECK_MODEL_CHECK_INTERVAL', 60))
+
 #: Defines the maximum value of Publish Sequence Number after which the value will start from 1
 MAX_VALUE_OF_PUBLISH_SEQUENCE = int(env('MAX_VALUE_OF_PUBLISH_SEQUENCE', 9999))
 
+#: number of sequence numbers reserved by a process at once, reserved numbers not used
+#: before the process ends are lost so there might be gaps in sequences, 1 disables it
+SEQUENCE_BLOCK_SIZE = int(env('SEQUENCE_BLOCK_SIZE', 1))
+
+#: sequence keys which are always reserved one by one, eg. ``ARCHIVE_SEQ``
+SEQUENCE_GAPLESS_KEYS = []
+
 #: Defines default value for Source to be set for manually created articles
 DEFAULT_SOURCE_VALUE_FOR_MANUAL_ARTICLES = env('DEFAULT_SOURCE_VALUE_FOR_MANUAL_ARTICLES', 'Superdesk')
 
@@ -619,15 +700,51 @@ TRANSMIT_RETRY_ATTEMPT_DELAY_MINUTES = int(env('TRANSMIT_RETRY_ATTEMPT_DELAY_MIN
 #: max transmit items to be fetched from mongo at once
 MAX_TRANSMIT_QUERY_LIMIT = int(env('MAX_TRANSMIT_QUERY_LIMIT', 500))
 
+#: max number of subscriber destinations transmitted in parallel,
+#: items for single destination are always transmitted in order
+MAX_TRANSMIT_THREADS = int(env('MAX_TRANSMIT_THREADS', 4))
+
 #: Code profiling for performance analysis
 ENABLE_PROFILING = False
 
+#: profiling mode - ``cprofile`` profiles all code in process using :mod:`cProfile`,
+#: ``sampling`` samples stacks of code running in profiled blocks with low overhead
+PROFILING_MODE = env('PROFILING_MODE', 'cprofile')
+
+#: seconds between stack samples in sampling mode
+PROFILING_SAMPLE_INTERVAL = float(env('PROFILING_SAMPLE_INTERVAL', 0.01))
+
+#: seconds between storing sampled stacks
+PROFILING_FLUSH_INTERVAL = int(env('PROFILING_FLUSH_INTERVAL', 60))
+
+#: max number of most common stacks returned per profiled block
+PROFILING_MAX_STACKS = int(env('PROFILING_MAX_STACKS', 5000))
+
 #: default timeout for ftp connections
 FTP_TIMEOUT = 300
 
+#: max number of idle ftp connections kept for reuse by transmitters and ingest
+FTP_POOL_MAX_CONNECTIONS = int(env('FTP_POOL_MAX_CONNECTIONS', 10))
+
+#: seconds after which idle pooled ftp connection is closed
+FTP_POOL_IDLE_TIMEOUT = int(env('FTP_POOL_IDLE_TIMEOUT', 60))
+
+#: max number of http push sessions kept for reuse, one per destination
+HTTP_PUSH_MAX_SESSIONS = int(env('HTTP_PUSH_MAX_SESSIONS', 20))
+
+#: max number of keep-alive connections per host in http push session
+HTTP_PUSH_POOL_SIZE = int(env('HTTP_PUSH_POOL_SIZE', 10))
+
+#: seconds after which idle http push session is closed
+HTTP_PUSH_SESSION_IDLE_TIMEOUT = int(env('HTTP_PUSH_SESSION_IDLE_TIMEOUT', 300))
+
 #: default amount of files which can processed during one iteration of ftp ingest
 FTP_INGEST_FILES_LIST_LIMIT = 100
 
+#: number of files retrieved and parsed in parallel by ftp ingest, each using own ftp connection,
+#: xml files are parsed from memory and not stored in ``dest_path`` then
+FTP_INGEST_WORKERS = int(env('FTP_INGEST_WORKERS', 1))
+
 #: default timeout for email connections
 EMAIL_TIMEOUT = 10
 
@@ -694,6 +811,14 @@ GEONAMES_TOKEN = env('GEONAMES_TOKEN')
 GEONAMES_URL = env('GEONAMES_URL', 'http://api.geonames.org/')
 GEONAMES_FEATURE_CLASSES = ['A', 'P']
 
+#: seconds for which fields enabled in content profiles are cached for output,
+#: changes made in other processes are used after that, set to 0 to disable the cache
+CONTENT_PROFILE_CACHE_TTL = int(env('CONTENT_PROFILE_CACHE_TTL', 60))
+
+#: seconds for which compiled validators are cached, changes of vocabularies and validators
+#: made in other processes are used after that, set to 0 to disable the cache
+VALIDATOR_CACHE_TTL = int(env('VALIDATOR_CACHE_TTL', 60))
+
 # media required fields
 VALIDATOR_MEDIA_METADATA = {
     "headline": {
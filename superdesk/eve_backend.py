@@ -9,8 +9,12 @@
 # at https://www.sourcefabric.org/superdesk/license
 
 
+import random
+import threading
 import eve.io.base
 
+from copy import deepcopy
+from concurrent.futures import ThreadPoolExecutor
 from flask import current_app as app, json
 from eve.utils import document_etag, config, ParsedRequest
 from eve.io.mongo import MongoJSONEncoder
@@ -19,6 +23,11 @@ from superdesk.logging import logger, item_msg
 from eve.methods.common import resolve_document_etag
 from elasticsearch.exceptions import RequestError, NotFoundError
 from superdesk.errors import SuperdeskApiError
+from superdesk.cache import resource_cache
+
+#: background search checks, sampled checks are skipped when there are too many waiting
+search_check_executor = ThreadPoolExecutor(max_workers=1)
+search_check_slots = threading.BoundedSemaphore(100)
 
 
 class EveBackend():
@@ -27,29 +36,121 @@ class EveBackend():
     def find_one(self, endpoint_name, req, **lookup):
         """Find single item.
 
+        Items of resources listed in ``FIND_ONE_CACHE_RESOURCES`` are cached when looked up by ``_id``.
+
         :param endpoint_name: resource name
         :param req: parsed request
         :param lookup: additional filter
         """
+        cached = self._is_cached_lookup(endpoint_name, req, lookup)
+        if cached:
+            item = resource_cache.load(endpoint_name, lookup[config.ID_FIELD])
+            if item is not None and lookup.get(config.ETAG, item.get(config.ETAG)) == item.get(config.ETAG):
+                return item
+
         backend = self._backend(endpoint_name)
         item = backend.find_one(endpoint_name, req=req, **lookup)
-        search_backend = self._lookup_backend(endpoint_name, fallback=True)
-        if search_backend:
+        search_backend = self._lookup_backend(endpoint_name)
+        if search_backend and item is None:
             # set the parent for the parent child in elastic search
             self._set_parent(endpoint_name, item, lookup)
             item_search = search_backend.find_one(endpoint_name, req=req, **lookup)
-            if item is None and item_search:
+            if item_search:
                 item = item_search
                 logger.warn(item_msg('item is only in elastic', item))
-            elif item_search is None and item:
-                logger.warn(item_msg('item is only in mongo', item))
-                try:
-                    logger.info(item_msg('trying to add item to elastic', item))
-                    search_backend.insert(endpoint_name, [item])
-                except RequestError as e:
-                    logger.error(item_msg('failed to add item into elastic error={}'.format(str(e)), item))
+        elif search_backend:
+            self._sample_search_check(endpoint_name, req, lookup, item)
+
+        if cached and item is not None:
+            self._cache_item(endpoint_name, lookup[config.ID_FIELD], item)
         return item
 
+    def _cache_item(self, endpoint_name, id, item):
+        """Store item fetched from mongo in find_one cache.
+
+        Item is saved first and then its etag and updated time are compared with mongo,
+        updated time is checked too as ``system_update`` keeps etag. Writers invalidate cache
+        after writing to mongo, so item which was modified before it was saved is removed here
+        and item modified after it was saved is removed by the writer.
+
+        :param endpoint_name: resource name
+        :param id: item id
+        :param item: item from mongo
+        """
+        if not item.get(config.ETAG):
+            return
+        resource_cache.save(endpoint_name, id, item)
+        req = ParsedRequest()
+        req.projection = json.dumps({config.ETAG: 1, config.LAST_UPDATED: 1})
+        current = self._backend(endpoint_name).find_one(endpoint_name, req=req, _id=id)
+        if not current or current.get(config.ETAG) != item[config.ETAG] or \
+                current.get(config.LAST_UPDATED) != item.get(config.LAST_UPDATED):
+            resource_cache.invalidate(endpoint_name, [id])
+
+    def _is_cached_lookup(self, endpoint_name, req, lookup):
+        """Test if find_one lookup should use cache.
+
+        :param endpoint_name: resource name
+        :param req: parsed request
+        :param lookup: additional filter
+        """
+        return req is None and bool(lookup.get(config.ID_FIELD)) \
+            and not set(lookup) - {config.ID_FIELD, config.ETAG} and resource_cache.is_cached(endpoint_name)
+
+    def _invalidate_cache(self, endpoint_name, ids):
+        """Remove items from find_one cache.
+
+        :param endpoint_name: resource name
+        :param ids: list of item ids
+        """
+        if ids and resource_cache.is_cached(endpoint_name):
+            resource_cache.invalidate(endpoint_name, ids)
+
+    def _sample_search_check(self, endpoint_name, req, lookup, item):
+        """Check that item found in mongo is also in elastic.
+
+        It runs for ``FIND_ONE_SEARCH_CHECK_RATE`` part of reads, when it's less than 1
+        the check runs in background.
+
+        :param endpoint_name: resource name
+        :param req: parsed request
+        :param lookup: additional filter
+        :param item: item from mongo
+        """
+        rate = app.config.get('FIND_ONE_SEARCH_CHECK_RATE', 0.01)
+        if rate >= 1:
+            return self._search_check(endpoint_name, req, lookup, item)
+        if random.random() >= rate or not search_check_slots.acquire(blocking=False):
+            return
+
+        flask_app = app._get_current_object()
+        # item is returned to caller so check its copy
+        item = deepcopy(item)
+
+        def check():
+            try:
+                with flask_app.app_context():
+                    self._search_check(endpoint_name, req, lookup, item)
+            except Exception:
+                logger.exception(item_msg('search check failed', item))
+            finally:
+                search_check_slots.release()
+
+        search_check_executor.submit(check)
+
+    def _search_check(self, endpoint_name, req, lookup, item):
+        search_backend = self._lookup_backend(endpoint_name)
+        # set the parent for the parent child in elastic search
+        self._set_parent(endpoint_name, item, lookup)
+        item_search = search_backend.find_one(endpoint_name, req=req, **lookup)
+        if item_search is None:
+            logger.warn(item_msg('item is only in mongo', item))
+            try:
+                logger.info(item_msg('trying to add item to elastic', item))
+                search_backend.insert(endpoint_name, [item])
+            except RequestError as e:
+                logger.error(item_msg('failed to add item into elastic error={}'.format(str(e)), item))
+
     def find(self, endpoint_name, where, max_results=0):
         """Find items for given endpoint using mongo query in python dict object.
 
@@ -117,7 +218,10 @@ class EveBackend():
         if kwargs.get('query'):
             kwargs['query'] = backend._mongotize(kwargs['query'], endpoint_name)
 
-        return backend.driver.db[endpoint_name].find_and_modify(**kwargs)
+        doc = backend.driver.db[endpoint_name].find_and_modify(**kwargs)
+        if doc:
+            self._invalidate_cache(endpoint_name, [doc[config.ID_FIELD]])
+        return doc
 
     def create(self, endpoint_name, docs, **kwargs):
         """Insert documents into given collection.
@@ -144,6 +248,7 @@ class EveBackend():
 
         backend = self._backend(endpoint_name)
         ids = backend.insert(endpoint_name, docs)
+        self._invalidate_cache(endpoint_name, ids)
         return ids
 
     def create_in_search(self, endpoint_name, docs, **kwargs):
@@ -195,6 +300,7 @@ class EveBackend():
         try:
             backend.update(endpoint_name, id, updates, original)
         except eve.io.base.DataLayer.OriginalChangedError:
+            self._invalidate_cache(endpoint_name, [id])
             if not backend.find_one(endpoint_name, req=None, _id=id) and search_backend:
                 # item is in elastic, not in mongo - not good
                 logger.warn("Item is missing in mongo resource={} id={}".format(endpoint_name, id))
@@ -208,6 +314,7 @@ class EveBackend():
                              'Updates are : {}'.format(id, endpoint_name, updates))
                 return updates
 
+        self._invalidate_cache(endpoint_name, [id])
         if search_backend:
 
             doc = backend.find_one(endpoint_name, req=None, _id=id)
@@ -251,6 +358,7 @@ class EveBackend():
             updates[config.ETAG] = updated[config.ETAG]
         backend = self._backend(endpoint_name)
         res = backend.update(endpoint_name, id, updates, original)
+        self._invalidate_cache(endpoint_name, [id])
         return res if res is not None else updates
 
     def replace_in_mongo(self, endpoint_name, id, document, original):
@@ -263,6 +371,7 @@ class EveBackend():
         """
         backend = self._backend(endpoint_name)
         res = backend.replace(endpoint_name, id, document, original)
+        self._invalidate_cache(endpoint_name, [id])
         return res
 
     def replace_in_search(self, endpoint_name, id, document, original):
@@ -303,6 +412,7 @@ class EveBackend():
                 except Exception:
                     logger.exception('item can not be removed from elastic _id=%s' % (doc[config.ID_FIELD], ))
         backend.remove(endpoint_name, {config.ID_FIELD: {'$in': removed_ids}})
+        self._invalidate_cache(endpoint_name, removed_ids)
         logger.info("Removed {} documents from {}.".format(len(ids), endpoint_name))
         if not ids:
             logger.warn("No documents for {} resource were deleted using lookup {}".format(endpoint_name, lookup))
@@ -318,6 +428,7 @@ class EveBackend():
         if search_backend:
             raise SuperdeskApiError.forbiddenError(message='Can not remove from endpoint with a defined search')
         backend.remove(endpoint_name, {config.ID_FIELD: {'$in': ids}})
+        self._invalidate_cache(endpoint_name, ids)
         return len(ids)
 
     def remove_from_search(self, endpoint_name, doc):
@@ -1,21 +1,19 @@
 
+import time
 import socket
 import ftplib
+import logging
+import threading
 
 from contextlib import contextmanager
 from flask import current_app as app
 
 from superdesk.errors import IngestFtpError
 
+logger = logging.getLogger(__name__)
 
-@contextmanager
-def ftp_connect(config):
-    """Get ftp connection for given config.
 
-    use with `with`
-
-    :param config: dict with `host`, `username`, `password`, `path` and `passive`
-    """
+def _connect(config):
     try:
         ftp = ftplib.FTP(config.get('host'), timeout=app.config.get('FTP_TIMEOUT', 300))
     except socket.gaierror as e:
@@ -29,5 +27,113 @@ def ftp_connect(config):
         ftp.cwd(config.get('path', '').lstrip('/'))
     if config.get('passive') is False:  # only set this when not active, it's passive by default
         ftp.set_pasv(False)
-    yield ftp
-    ftp.close()
+    return ftp
+
+
+def _close(ftp):
+    try:
+        ftp.quit()
+    except (ftplib.all_errors, AttributeError):
+        ftp.close()
+
+
+class FTPConnectionPool:
+    """Pool of idle ftp connections for reuse.
+
+    Connections are stored per host, credentials, path and passive mode.
+    Connections idle for more than ``FTP_POOL_IDLE_TIMEOUT`` seconds are closed
+    and at most ``FTP_POOL_MAX_CONNECTIONS`` idle connections are kept.
+    """
+
+    def __init__(self):
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def _key(self, config):
+        return (config.get('host'), config.get('username'), config.get('password'),
+                config.get('path'), config.get('passive'))
+
+    def _evict(self, now):
+        idle_timeout = app.config.get('FTP_POOL_IDLE_TIMEOUT', 60)
+        expired = []
+        for key, connections in self._idle.items():
+            while connections and now - connections[0][1] > idle_timeout:
+                expired.append(connections.pop(0)[0])
+        return expired
+
+    def get(self, config):
+        """Get ftp connection for given config, reusing idle one if possible.
+
+        Idle connections are checked by changing to initial directory
+        and discarded if that fails.
+
+        :param config: dict with `host`, `username`, `password`, `path` and `passive`
+        """
+        key = self._key(config)
+        while True:
+            with self._lock:
+                expired = self._evict(time.time())
+                connections = self._idle.get(key)
+                ftp = connections.pop()[0] if connections else None
+            for connection in expired:
+                _close(connection)
+            if ftp is None:
+                ftp = _connect(config)
+                ftp.superdesk_path = ftp.pwd()
+                return ftp
+            try:
+                ftp.cwd(ftp.superdesk_path)
+                return ftp
+            except (ftplib.all_errors, AttributeError):
+                logger.info('discarding broken ftp connection to %s', config.get('host'))
+                ftp.close()
+
+    def put(self, config, ftp):
+        """Return ftp connection to the pool.
+
+        :param config: config used to get the connection
+        :param ftp: ftp connection
+        """
+        max_connections = app.config.get('FTP_POOL_MAX_CONNECTIONS', 10)
+        with self._lock:
+            if sum(len(connections) for connections in self._idle.values()) < max_connections:
+                self._idle.setdefault(self._key(config), []).append((ftp, time.time()))
+                ftp = None
+        if ftp is not None:
+            _close(ftp)
+
+    def clear(self):
+        """Close all idle connections."""
+        with self._lock:
+            connections = [ftp for idle in self._idle.values() for ftp, _ in idle]
+            self._idle.clear()
+        for ftp in connections:
+            _close(ftp)
+
+
+ftp_pool = FTPConnectionPool()
+
+
+@contextmanager
+def ftp_connect(config, pooled=False):
+    """Get ftp connection for given config.
+
+    use with `with`
+
+    :param config: dict with `host`, `username`, `password`, `path` and `passive`
+    :param pooled: reuse connection from :data:`ftp_pool` and return it there when done
+    """
+    if not pooled:
+        ftp = _connect(config)
+        yield ftp
+        ftp.close()
+        return
+
+    ftp = ftp_pool.get(config)
+    try:
+        yield ftp
+    except BaseException:
+        ftp.close()
+        raise
+    else:
+        ftp_pool.put(config, ftp)
@@ -9,9 +9,11 @@
 # at https://www.sourcefabric.org/superdesk/license
 
 
+import json
 import logging
 from datetime import timedelta, timezone, datetime
 
+from eve.utils import ParsedRequest
 from flask import current_app as app
 from werkzeug.exceptions import HTTPException
 
@@ -33,6 +35,7 @@ from superdesk.utc import utcnow, get_expiry_date
 from superdesk.workflow import set_default_state
 from superdesk.errors import IngestFileError
 from copy import deepcopy
+from collections import OrderedDict
 
 UPDATE_SCHEDULE_DEFAULT = {'minutes': 5}
 LAST_UPDATED = 'last_updated'
@@ -239,13 +242,15 @@ class UpdateIngest(superdesk.Command):
 
 
 @celery.task(soft_time_limit=UPDATE_TTL)
-def update_provider(provider, rule_set=None, routing_scheme=None, sync=False):
+def update_provider(provider, rule_set=None, routing_scheme=None, sync=False, files=None):
     """Fetch items from ingest provider, ingest them into Superdesk and update the provider.
 
     :param provider: Ingest Provider data
     :param rule_set: Translation Rule Set if one is associated with Ingest Provider.
     :param routing_scheme: Routing Scheme if one is associated with Ingest Provider.
     :param sync: Running in sync mode from cli.
+    :param files: Only ingest given files from provider watch path, provider last update is kept
+        so scheduled updates still get files which were missed.
     """
     lock_name = get_lock_id('ingest', provider['name'], provider[superdesk.config.ID_FIELD])
 
@@ -256,13 +261,19 @@ def update_provider(provider, rule_set=None, routing_scheme=None, sync=False):
 
     try:
         feeding_service = get_feeding_service(provider['feeding_service'])
-        update = {LAST_UPDATED: utcnow()}
+        update = {LAST_UPDATED: utcnow()} if files is None else {}
 
         if sync:
             provider[LAST_UPDATED] = utcnow() - timedelta(days=9999) # import everything again
 
-        for items in feeding_service.update(provider, update):
-            ingest_items(items, provider, feeding_service, rule_set, routing_scheme)
+        vocabularies = IngestVocabularies()
+        if files is None:
+            feed = feeding_service.update(provider, update)
+        else:
+            feed = feeding_service.update_files(provider, update, files)
+
+        for items in feed:
+            ingest_items(items, provider, feeding_service, rule_set, routing_scheme, vocabularies.refresh())
             if items:
                 last_item_update = max(
                     [item['versioncreated'] for item in items if item.get('versioncreated')],
@@ -275,9 +286,10 @@ def update_provider(provider, rule_set=None, routing_scheme=None, sync=False):
         # So it's necessary to fetch it once again. Otherwise, OriginalChangedError is raised.
         ingest_provider_service = superdesk.get_resource_service('ingest_providers')
         provider = ingest_provider_service.find_one(req=None, _id=provider[superdesk.config.ID_FIELD])
-        ingest_provider_service.system_update(provider[superdesk.config.ID_FIELD], update, provider)
+        if update:
+            ingest_provider_service.system_update(provider[superdesk.config.ID_FIELD], update, provider)
 
-        if LAST_ITEM_UPDATE not in update and get_is_idle(provider):
+        if LAST_ITEM_UPDATE not in update and files is None and get_is_idle(provider):
             admins = superdesk.get_resource_service('users').get_users_by_user_type('administrator')
             notify_and_add_activity(
                 ACTIVITY_EVENT,
@@ -296,42 +308,106 @@ def update_provider(provider, rule_set=None, routing_scheme=None, sync=False):
         unlock(lock_name)
 
 
-def process_anpa_category(item, provider):
+class IngestVocabularies:
+    """Snapshot of vocabularies used when ingesting items.
+
+    Vocabularies are loaded once and indexed by qcode, so processing an item
+    doesn't query the database. Call :meth:`refresh` to reload them when modified.
+    """
+
+    VOCABULARIES = ('categories', 'iptc_category_map')
+
+    def __init__(self):
+        self.versions = None
+        self.categories = None
+        self.categories_by_lower_qcode = None
+        self.subject_categories = None
+
+    def refresh(self):
+        """Reload vocabularies if any of them was modified since the last load."""
+        req = ParsedRequest()
+        req.projection = json.dumps({'_etag': 1, '_updated': 1})
+        lookup = {superdesk.config.ID_FIELD: {'$in': list(self.VOCABULARIES)}}
+        versions = {
+            doc[superdesk.config.ID_FIELD]: (doc.get('_etag'), doc.get('_updated'))
+            for doc in superdesk.get_resource_service('vocabularies').get_from_mongo(req=req, lookup=lookup)
+        }
+        if versions != self.versions:
+            self.load()
+            self.versions = versions
+        return self
+
+    def load(self):
+        vocabularies_service = superdesk.get_resource_service('vocabularies')
+        categories = vocabularies_service.find_one(req=None, _id='categories')
+        subject_map = vocabularies_service.find_one(req=None, _id='iptc_category_map')
+
+        self.categories = None
+        self.categories_by_lower_qcode = None
+        if categories:
+            self.categories = {}
+            self.categories_by_lower_qcode = {}
+            for category in (c for c in categories['items'] if c['is_active']):
+                self.categories.setdefault(category['qcode'], category)
+                if category['is_active'] is True:
+                    self.categories_by_lower_qcode.setdefault(category['qcode'].lower(), category)
+
+        self.subject_categories = None
+        if subject_map:
+            self.subject_categories = {}
+            for index, entry in enumerate(e for e in subject_map['items'] if e['is_active']):
+                self.subject_categories.setdefault(entry['qcode'], []).append((index, entry['category']))
+
+
+def get_ingest_vocabularies(vocabularies=None):
+    """Get vocabularies snapshot, loading new one if not provided.
+
+    :param vocabularies: :class:`IngestVocabularies` instance or None
+    """
+    return vocabularies if vocabularies is not None else IngestVocabularies().refresh()
+
+
+def process_anpa_category(item, provider, vocabularies=None):
     try:
-        anpa_categories = superdesk.get_resource_service('vocabularies').find_one(req=None, _id='categories')
-        if anpa_categories:
+        anpa_categories = get_ingest_vocabularies(vocabularies).categories_by_lower_qcode
+        if anpa_categories is not None:
+            item_categories = []
             for item_category in item['anpa_category']:
-                mapped_category = [c for c in anpa_categories['items'] if
-                                   c['is_active'] is True and item_category['qcode'].lower() == c['qcode'].lower()]
+                mapped_category = anpa_categories.get(item_category['qcode'].lower())
                 # if the category is not known to the system remove it from the item
-                if len(mapped_category) == 0:
-                    item['anpa_category'].remove(item_category)
-                else:
-                    item_category['name'] = mapped_category[0]['name']
+                if mapped_category:
+                    item_category['name'] = mapped_category['name']
                     # make the case of the qcode match what we hold in our dictionary
-                    item_category['qcode'] = mapped_category[0]['qcode']
+                    item_category['qcode'] = mapped_category['qcode']
+                    item_categories.append(item_category)
+            item['anpa_category'][:] = item_categories
     except Exception as ex:
         raise ProviderError.anpaError(ex, provider)
 
 
-def derive_category(item, provider):
+def derive_category(item, provider, vocabularies=None):
     """Assuming that the item has at least one itpc subject use the vocabulary map to derive an anpa category.
 
     :param item:
+    :param vocabularies: :class:`IngestVocabularies` instance
     :return: An item with a category if possible
     """
     try:
-        categories = []
-        subject_map = superdesk.get_resource_service('vocabularies').find_one(req=None, _id='iptc_category_map')
-        if subject_map:
-            for entry in (map_entry for map_entry in subject_map['items'] if map_entry['is_active']):
-                for subject in item.get('subject', []):
-                    if subject['qcode'] == entry['qcode']:
-                        if not any(c['qcode'] == entry['category'] for c in categories):
-                            categories.append({'qcode': entry['category']})
+        vocabularies = get_ingest_vocabularies(vocabularies)
+        subject_categories = vocabularies.subject_categories
+        if subject_categories is not None:
+            mapped = sorted(
+                mapping
+                for qcode in set(subject['qcode'] for subject in item.get('subject', []))
+                for mapping in subject_categories.get(qcode, [])
+            )
+            categories = []
+            for _, category in mapped:
+                if not any(c['qcode'] == category for c in categories):
+                    categories.append({'qcode': category})
             if len(categories):
                 item['anpa_category'] = categories
-                process_anpa_category(item, provider)
+                process_anpa_category(item, provider, vocabularies)
     except Exception as ex:
         logger.exception(ex)
 
@@ -346,38 +422,33 @@ def process_iptc_codes(item, provider):
     :return: A story item with possible expanded subjects
     """
     try:
-        def iptc_already_exists(code):
-            for entry in item['subject']:
-                if 'qcode' in entry and code == entry['qcode']:
-                    return True
-            return False
+        existing_qcodes = set(entry['qcode'] for entry in item['subject'] if 'qcode' in entry)
 
-        for subject in item['subject']:
-            if 'qcode' in subject and len(subject['qcode']) == 8 and subject['qcode'].isdigit():
-                top_qcode = subject['qcode'][:2] + '000000'
-                if not iptc_already_exists(top_qcode):
-                    item['subject'].append({'qcode': top_qcode, 'name': subject_codes[top_qcode]})
+        def add_iptc_code(code):
+            if code not in existing_qcodes:
+                item['subject'].append({'qcode': code, 'name': subject_codes[code]})
+                existing_qcodes.add(code)
 
-                mid_qcode = subject['qcode'][:5] + '000'
-                if not iptc_already_exists(mid_qcode):
-                    item['subject'].append({'qcode': mid_qcode, 'name': subject_codes[mid_qcode]})
+        for subject in list(item['subject']):
+            if 'qcode' in subject and len(subject['qcode']) == 8 and subject['qcode'].isdigit():
+                add_iptc_code(subject['qcode'][:2] + '000000')
+                add_iptc_code(subject['qcode'][:5] + '000')
     except Exception as ex:
         raise ProviderError.iptcError(ex, provider)
 
 
-def derive_subject(item):
+def derive_subject(item, vocabularies=None):
     """Try to derive a subject using the anpa category vocabulary.
 
     :param item:
+    :param vocabularies: :class:`IngestVocabularies` instance
     :return:
     """
     try:
-        category_map = superdesk.get_resource_service('vocabularies').find_one(req=None, _id='categories')
-        if category_map:
+        category_map = get_ingest_vocabularies(vocabularies).categories
+        if category_map is not None:
             for cat in item['anpa_category']:
-                map_entry = next(
-                    (code for code in category_map['items'] if code['qcode'] == cat['qcode'] and code['is_active']),
-                    None)
+                map_entry = category_map.get(cat['qcode'])
                 if map_entry and 'subject' in map_entry:
                     item['subject'] = [
                         {'qcode': map_entry.get('subject'), 'name': subject_codes[map_entry.get('subject')]}]
@@ -429,23 +500,144 @@ def ingest_cancel(item, feeding_service):
         ingest_service.patch(relative['_id'], update)
 
 
-def ingest_items(items, provider, feeding_service, rule_set=None, routing_scheme=None):
+class IngestBatch:
+    """Items of single ingest batch saved using bulk writes.
+
+    Existing items are fetched for all guids of the batch including associations using single query,
+    new and modified items are kept in memory until :meth:`save`, which writes them to mongo
+    using single bulk write and indexes them in elastic without reading them back.
+
+    :param ingest_collection: ingest resource name
+    :param items: items in the batch
+    """
+
+    def __init__(self, ingest_collection, items):
+        self.ingest_collection = ingest_collection
+        self.ingest_service = superdesk.get_resource_service(ingest_collection)
+        self.existing = {}
+        self.inserts = OrderedDict()
+        self.updates = OrderedDict()
+        self.routing = []
+
+        guids = list(set(self._get_guids(items)))
+        if guids:
+            lookup = {GUID_FIELD: {'$in': guids}}
+            for doc in self.ingest_service.get_from_mongo(req=None, lookup=lookup):
+                self.existing.setdefault(doc[GUID_FIELD], doc)
+
+    def _get_guids(self, items):
+        for item in items:
+            if item.get(GUID_FIELD):
+                yield item[GUID_FIELD]
+            yield from self._get_guids(assoc for assoc in (item.get('associations') or {}).values() if assoc)
+
+    def find_one(self, guid):
+        """Get existing or pending item with given guid.
+
+        :param guid: item guid
+        """
+        return self.existing.get(guid)
+
+    def insert(self, item):
+        """Add new item to the batch.
+
+        :param item: new item
+        """
+        self.inserts[item[superdesk.config.ID_FIELD]] = item
+        self.existing[item[GUID_FIELD]] = item
+        return [item[superdesk.config.ID_FIELD]]
+
+    def update(self, item_id, updates, original, item):
+        """Add update of existing item to the batch.
+
+        :param item_id: item id
+        :param updates: updates to the item
+        :param original: original item
+        :param item: item with updates applied
+        """
+        if item_id in self.inserts:
+            self.inserts[item_id] = item
+        elif item_id in self.updates:
+            pending_updates, pending_original, _ = self.updates[item_id]
+            pending_updates.update(updates)
+            self.updates[item_id] = (pending_updates, pending_original, item)
+        else:
+            self.updates[item_id] = (updates, original, item)
+        self.existing[item[GUID_FIELD]] = item
+
+    def route(self, item, provider, routing_scheme):
+        """Apply routing scheme to item once it is saved.
+
+        :param item: ingested item
+        :param provider: ingest provider
+        :param routing_scheme: routing scheme
+        """
+        self.routing.append((item, provider, routing_scheme))
+
+    def save(self):
+        """Save pending items, index them in elastic and apply routing.
+
+        :return: set of guids of items which failed to be saved
+        """
+        docs = list(self.inserts.values())
+        updates = [(item_id, changes, original) for item_id, (changes, original, _) in self.updates.items()]
+        failed = self.ingest_service.bulk_write_in_mongo(docs, updates)
+
+        saved = [doc for doc in docs if doc[superdesk.config.ID_FIELD] not in failed]
+        for item_id, (changes, _, item) in self.updates.items():
+            if item_id not in failed:
+                item.update(changes)
+                saved.append(item)
+        if saved:
+            app.data._search_backend(self.ingest_collection).bulk_insert(self.ingest_collection, saved)
+
+        failed_guids = set()
+        for item_id in failed:
+            item = self.inserts.get(item_id) or self.updates[item_id][2]
+            failed_guids.add(item[GUID_FIELD])
+            self.existing.pop(item[GUID_FIELD], None)
+
+        routing = self.routing
+        self.inserts = OrderedDict()
+        self.updates = OrderedDict()
+        self.routing = []
+
+        for item, provider, routing_scheme in routing:
+            if item[superdesk.config.ID_FIELD] in failed:
+                continue
+            try:
+                routed = self.ingest_service.find_one(_id=item[superdesk.config.ID_FIELD], req=None)
+                superdesk.get_resource_service('routing_schemes').apply_routing_scheme(routed, provider, routing_scheme)
+            except Exception as ex:
+                logger.exception(ex)
+
+        return failed_guids
+
+
+def ingest_items(items, provider, feeding_service, rule_set=None, routing_scheme=None, vocabularies=None):
+    vocabularies = get_ingest_vocabularies(vocabularies)
     all_items = filter_expired_items(provider, items)
     items_dict = {doc[GUID_FIELD]: doc for doc in all_items}
     items_in_package = []
     failed_items = set()
     created_ids = []
+    ingest_collection = feeding_service.service if hasattr(feeding_service, 'service') else 'ingest'
+    batch = IngestBatch(ingest_collection, all_items) if app.config.get('INGEST_BULK_WRITE') else None
     for item in [doc for doc in all_items if doc.get(ITEM_TYPE) == CONTENT_TYPE.COMPOSITE]:
         items_in_package = [ref['residRef'] for group in item.get('groups', [])
                             for ref in group.get('refs', []) if 'residRef' in ref]
 
     for item in [doc for doc in all_items if doc.get(ITEM_TYPE) != CONTENT_TYPE.COMPOSITE]:
         ingested, ids = ingest_item(item, provider, feeding_service, rule_set,
-                                    routing_scheme=routing_scheme if not item[GUID_FIELD] in items_in_package else None)
+                                    routing_scheme=routing_scheme if not item[GUID_FIELD] in items_in_package else None,
+                                    vocabularies=vocabularies, batch=batch)
         if ingested:
             created_ids = created_ids + ids
         else:
             failed_items.add(item[GUID_FIELD])
+    if batch:
+        # packages are saved separately so these referencing failed items are skipped
+        failed_items.update(batch.save())
     for item in [doc for doc in all_items if doc.get(ITEM_TYPE) == CONTENT_TYPE.COMPOSITE]:
         for ref in [ref for group in item.get('groups', [])
                     for ref in group.get('refs', []) if 'residRef' in ref]:
@@ -462,29 +654,46 @@ def ingest_items(items, provider, feeding_service, rule_set=None, routing_scheme
                 ref['residRef'] = items_dict.get(ref['residRef'], {}).get(superdesk.config.ID_FIELD)
         if item[GUID_FIELD] in failed_items:
             continue
-        ingested, ids = ingest_item(item, provider, feeding_service, rule_set, routing_scheme)
+        ingested, ids = ingest_item(item, provider, feeding_service, rule_set, routing_scheme, vocabularies, batch)
         if ingested:
             created_ids = created_ids + ids
         else:
             failed_items.add(item[GUID_FIELD])
-    # sync mongo with ingest after all changes
-    ingest_collection = feeding_service.service if hasattr(feeding_service, 'service') else 'ingest'
-    ingest_service = superdesk.get_resource_service(ingest_collection)
-    updated_items = ingest_service.find({'_id': {'$in': created_ids}}, max_results=len(created_ids))
-    app.data._search_backend(ingest_collection).bulk_insert(ingest_collection, list(updated_items))
+    if batch:
+        failed_items.update(batch.save())
+    else:
+        # sync mongo with ingest after all changes
+        ingest_service = superdesk.get_resource_service(ingest_collection)
+        updated_items = ingest_service.find({'_id': {'$in': created_ids}}, max_results=len(created_ids))
+        app.data._search_backend(ingest_collection).bulk_insert(ingest_collection, list(updated_items))
     if failed_items:
         logger.error('Failed to ingest the following items: %s', failed_items)
     return failed_items
 
 
-def ingest_item(item, provider, feeding_service, rule_set=None, routing_scheme=None):
+def ingest_item(item, provider, feeding_service, rule_set=None, routing_scheme=None, vocabularies=None, batch=None):
+    """Ingest single item.
+
+    :param item: item to ingest
+    :param provider: ingest provider
+    :param feeding_service: feeding service of the provider
+    :param rule_set: rule set to apply
+    :param routing_scheme: routing scheme to apply
+    :param vocabularies: :class:`IngestVocabularies` instance
+    :param batch: :class:`IngestBatch` instance, if set item is saved when batch is saved
+    :return: tuple of success flag and list of ingested ids
+    """
     items_ids = []
     try:
+        vocabularies = get_ingest_vocabularies(vocabularies)
         ingest_collection = feeding_service.service if hasattr(feeding_service, 'service') else 'ingest'
         ingest_service = superdesk.get_resource_service(ingest_collection)
 
         # determine if we already have this item
-        old_item = ingest_service.find_one(guid=item[GUID_FIELD], req=None)
+        if batch is not None:
+            old_item = batch.find_one(item[GUID_FIELD])
+        else:
+            old_item = ingest_service.find_one(guid=item[GUID_FIELD], req=None)
 
         if not old_item:
             item.setdefault(superdesk.config.ID_FIELD, generate_guid(type=GUID_NEWSML))
@@ -497,16 +706,16 @@ def ingest_item(item, provider, feeding_service, rule_set=None, routing_scheme=N
                                          item.get('versioncreated'))
 
         if 'anpa_category' in item:
-            process_anpa_category(item, provider)
+            process_anpa_category(item, provider, vocabularies)
 
         if 'subject' in item:
             if not app.config.get('INGEST_SKIP_IPTC_CODES', False):
                 # FIXME: temporary fix for SDNTB-344, need to be removed once SDESK-439 is implemented
                 process_iptc_codes(item, provider)
             if 'anpa_category' not in item:
-                derive_category(item, provider)
+                derive_category(item, provider, vocabularies)
         elif 'anpa_category' in item:
-            derive_subject(item)
+            derive_subject(item, vocabularies)
 
         apply_rule_set(item, provider, rule_set)
 
@@ -528,16 +737,21 @@ def ingest_item(item, provider, feeding_service, rule_set=None, routing_scheme=N
             # wire up the id of the associated feature media to the ingested one
             guid = assoc.get('guid')
             if guid:
-                lookup = {'guid': guid}
-                ingested = ingest_service.get_from_mongo(req=None, lookup=lookup)
-                if ingested.count() >= 1:
-                    assoc['_id'] = ingested[0]['_id']
-                    for rendition in ingested[0].get('renditions', {}):  # add missing renditions
+                if batch is not None:
+                    ingested = batch.find_one(guid)
+                else:
+                    lookup = {'guid': guid}
+                    found = ingest_service.get_from_mongo(req=None, lookup=lookup)
+                    ingested = found[0] if found.count() >= 1 else None
+                if ingested:
+                    assoc['_id'] = ingested['_id']
+                    for rendition in ingested.get('renditions', {}):  # add missing renditions
                         assoc['renditions'].setdefault(
                             rendition,
-                            ingested[0]['renditions'][rendition])
+                            ingested['renditions'][rendition])
                 else:  # there is no such item in the system - ingest it
-                    status, ids = ingest_item(assoc, provider, feeding_service, rule_set)
+                    status, ids = ingest_item(assoc, provider, feeding_service, rule_set,
+                                              vocabularies=vocabularies, batch=batch)
                     if status:
                         assoc['_id'] = ids[0]
                         items_ids.extend(ids)
@@ -545,9 +759,12 @@ def ingest_item(item, provider, feeding_service, rule_set=None, routing_scheme=N
         new_version = True
         if old_item:
             updates = deepcopy(item)
-            ingest_service.patch_in_mongo(old_item[superdesk.config.ID_FIELD], updates, old_item)
+            if batch is None:
+                ingest_service.patch_in_mongo(old_item[superdesk.config.ID_FIELD], updates, old_item)
             item.update(old_item)
             item.update(updates)
+            if batch is not None:
+                batch.update(old_item[superdesk.config.ID_FIELD], updates, old_item, item)
             items_ids.append(item['_id'])
             # if the feed is versioned and this is not a new version
             if 'version' in item and 'version' in old_item and item.get('version') == old_item.get('version'):
@@ -555,12 +772,17 @@ def ingest_item(item, provider, feeding_service, rule_set=None, routing_scheme=N
         else:
             if item.get('ingest_provider_sequence') is None:
                 ingest_service.set_ingest_provider_sequence(item, provider)
-            try:
-                items_ids.extend(ingest_service.post_in_mongo([item]))
-            except HTTPException as e:
-                logger.error('Exception while persisting item in %s collection: %s', ingest_collection, e)
-
-        if routing_scheme and new_version:
+            if batch is not None:
+                items_ids.extend(batch.insert(item))
+            else:
+                try:
+                    items_ids.extend(ingest_service.post_in_mongo([item]))
+                except HTTPException as e:
+                    logger.error('Exception while persisting item in %s collection: %s', ingest_collection, e)
+
+        if routing_scheme and new_version and batch is not None:
+            batch.route(item, provider, routing_scheme)
+        elif routing_scheme and new_version:
             routed = ingest_service.find_one(_id=item[superdesk.config.ID_FIELD], req=None)
             superdesk.get_resource_service('routing_schemes').apply_routing_scheme(routed, provider, routing_scheme)
 
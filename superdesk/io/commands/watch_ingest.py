@@ -0,0 +1,203 @@
+# -*- coding: utf-8; -*-
+#
+# This file is part of Superdesk.
+#
+# Copyright 2013 - 2018 Sourcefabric z.u. and contributors.
+#
+# For the full copyright and license information, please see the
+# AUTHORS and LICENSE files distributed with this source code, or
+# at https://www.sourcefabric.org/superdesk/license
+
+import time
+import queue
+import logging
+import threading
+import superdesk
+
+from flask import current_app as app
+from superdesk.io import inotify
+from superdesk.io.registry import get_feeding_service
+from superdesk.io.commands.update_ingest import (
+    update_provider, is_closed, is_service_and_parser_registered,
+    get_provider_rule_set, get_provider_routing_scheme
+)
+
+logger = logging.getLogger(__name__)
+
+
+class IngestWatchQueue:
+    """Queue of providers with new files.
+
+    Events for provider which is already queued are merged, so a burst of files
+    is ingested by a single update. If there are more than ``max_files`` files
+    or the events were lost provider is updated like by ``ingest:update``.
+
+    :param maxsize: max number of queued providers
+    :param max_files: max number of files per provider
+    """
+
+    def __init__(self, maxsize, max_files):
+        self.max_files = max_files
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def put(self, provider_id, filename=None):
+        """Add file to provider queue.
+
+        :param provider_id: provider id
+        :param filename: new file name, ``None`` means all files
+        """
+        with self._lock:
+            if provider_id in self._pending:
+                files = self._pending[provider_id]
+                if files is not None and (filename is None or len(files) >= self.max_files):
+                    self._pending[provider_id] = None
+                elif files is not None:
+                    files.add(filename)
+                return
+
+            try:
+                self._queue.put_nowait(provider_id)
+            except queue.Full:
+                logger.warning('ingest watch queue is full, provider %s will be updated on schedule', provider_id)
+                return
+            self._pending[provider_id] = {filename} if filename is not None else None
+
+    def get(self, delay=0):
+        """Wait for next provider and get its files.
+
+        :param delay: seconds to wait for more files once there is a provider
+        :return: tuple of provider id and list of files or ``None`` for all files
+        """
+        provider_id = self._queue.get()
+        if delay:
+            time.sleep(delay)
+        with self._lock:
+            files = self._pending.pop(provider_id)
+        return provider_id, sorted(files) if files is not None else None
+
+
+class WatchIngest(superdesk.Command):
+    """Watch local folders of ingest providers and ingest new files as soon as they are written.
+
+    It uses Linux inotify to get completed files in folders of file providers
+    and FTP providers with watched path configured. Providers are still updated
+    on schedule by ``ingest:update`` in case some files are missed.
+
+    Example:
+    ::
+
+        $ python manage.py ingest:watch
+        $ python manage.py ingest:watch --provider=aap-demo
+    """
+
+    option_list = (
+        superdesk.Option('--provider', '-p', dest='provider_name'),
+    )
+
+    def run(self, provider_name=None):
+        if not inotify.is_available():
+            raise SystemExit('inotify is not available, ingest:update will keep polling the providers')
+
+        self.provider_name = provider_name
+        self.watches = {}
+        self.queue = IngestWatchQueue(app.config.get('INGEST_WATCH_QUEUE_SIZE', 100),
+                                      app.config.get('INGEST_WATCH_MAX_FILES', 1000))
+
+        flask_app = app._get_current_object()
+        worker = threading.Thread(target=self.worker, args=(flask_app, ), daemon=True)
+        worker.start()
+
+        with inotify.Inotify() as watcher:
+            self.watch(watcher)
+
+    def watch(self, watcher):
+        """Add watches for providers and put events into queue.
+
+        Providers are reloaded every ``INGEST_WATCH_REFRESH`` seconds.
+
+        :param watcher: inotify instance
+        """
+        refresh = app.config.get('INGEST_WATCH_REFRESH', 60)
+        while True:
+            self.refresh_watches(watcher)
+            until = time.time() + refresh
+            while time.time() < until:
+                for wd, mask, name in watcher.read(timeout=max(until - time.time(), 0)):
+                    if mask & inotify.IN_Q_OVERFLOW:
+                        logger.warning('inotify queue overflow, updating all watched providers')
+                        for provider_id, _ in self.watches.values():
+                            self.queue.put(provider_id)
+                    elif wd in self.watches and not mask & (inotify.IN_ISDIR | inotify.IN_IGNORED):
+                        self.queue.put(self.watches[wd][0], name)
+
+    def refresh_watches(self, watcher):
+        """Watch paths of all active providers and stop watching the rest.
+
+        :param watcher: inotify instance
+        """
+        paths = {}
+        lookup = {} if not self.provider_name else {'name': self.provider_name}
+        for provider in superdesk.get_resource_service('ingest_providers').get(req=None, lookup=lookup):
+            if is_closed(provider) or not is_service_and_parser_registered(provider):
+                continue
+            path = get_feeding_service(provider['feeding_service']).get_watch_path(provider)
+            if path:
+                paths[path] = provider[superdesk.config.ID_FIELD]
+
+        for wd, (provider_id, path) in list(self.watches.items()):
+            if paths.get(path) != provider_id:
+                logger.info('stop watching %s', path)
+                self.watches.pop(wd)
+                try:
+                    watcher.rm_watch(wd)
+                except OSError:
+                    pass  # folder was removed
+
+        watched = set(path for _, path in self.watches.values())
+        for path, provider_id in paths.items():
+            if path not in watched:
+                try:
+                    wd = watcher.add_watch(path)
+                except OSError as error:
+                    logger.error('can not watch %s: %s', path, error)
+                    continue
+                logger.info('watching %s', path)
+                self.watches[wd] = (provider_id, path)
+                self.queue.put(provider_id)  # files written while not watching
+
+    def worker(self, flask_app):
+        """Update queued providers.
+
+        It waits ``INGEST_WATCH_DELAY`` seconds after first event so files written
+        together are ingested together.
+
+        :param flask_app: app instance
+        """
+        with flask_app.app_context():
+            while True:
+                provider_id, files = self.queue.get(app.config.get('INGEST_WATCH_DELAY', 1))
+                try:
+                    self.update(provider_id, files)
+                except Exception:
+                    logger.exception('failed to ingest files for provider %s', provider_id)
+
+    def update(self, provider_id, files):
+        """Run provider update for given files.
+
+        :param provider_id: provider id
+        :param files: list of file names or ``None`` for all files
+        """
+        provider = superdesk.get_resource_service('ingest_providers').find_one(req=None, _id=provider_id)
+        if not provider or is_closed(provider):
+            return
+        update_provider.apply(kwargs={
+            'provider': provider,
+            'rule_set': get_provider_rule_set(provider),
+            'routing_scheme': get_provider_routing_scheme(provider),
+            'files': files,
+        })
+
+
+superdesk.command('ingest:watch', WatchIngest())
@@ -153,6 +153,51 @@ class FeedingService(metaclass=ABCMeta):
                 self.close_provider(provider, error)
                 raise error
 
+    def update_files(self, provider, update, files):
+        """Get items from given files added to provider watch path.
+
+        Used by ``ingest:watch`` command instead of :meth:`update`.
+
+        :param provider: Ingest Provider Details.
+        :type provider: dict :py:class: `superdesk.io.ingest_provider_model.IngestProviderResource`
+        :param update: Any update that is required on provider.
+        :type update: dict
+        :param files: list of file names
+        :return: a list of articles which can be saved in Ingest Collection.
+        :raises SuperdeskApiError.internalError if Provider is closed
+        :raises SuperdeskIngestError if failed to get items from provider
+        """
+        if self._is_closed(provider):
+            raise SuperdeskApiError.internalError('Ingest Provider is closed')
+        else:
+            try:
+                return self._update_files(provider, update, files) or []
+            except SuperdeskIngestError as error:
+                self.close_provider(provider, error)
+                raise error
+
+    def _update_files(self, provider, update, files):
+        """
+        Subclasses which can watch local folder should override this method and get items only from given files.
+
+        By default it gets all items like :meth:`_update`.
+
+        :param provider: Ingest Provider Details.
+        :param update: Any update that is required on provider.
+        :param files: list of file names
+        """
+        return self._update(provider, update)
+
+    def get_watch_path(self, provider):
+        """Get local folder which can be watched for new files.
+
+        Subclasses should override this method if they read files from local folder.
+
+        :param provider: Ingest Provider Details.
+        :return: folder path or ``None`` if it can't be watched
+        """
+        return None
+
     def close_provider(self, provider, error, force=False):
         """Closes the provider and uses error as reason for closing.
 
@@ -66,8 +66,29 @@ class FileFeedingService(FeedingService):
                         .format(provider['name']))
             return []
 
+        yield from self._ingest_files(provider, get_sorted_files(self.path, sort_by=FileSortAttributes.created))
+        push_notification('ingest:update')
+
+    def _update_files(self, provider, update, files):
+        self.provider = provider
+        self.path = self.get_watch_path(provider)
+
+        if not self.path:
+            return []
+
+        files = [filename for filename in set(files) if os.path.isfile(os.path.join(self.path, filename))]
+        files.sort(key=lambda filename: (os.path.getctime(os.path.join(self.path, filename)), filename))
+        yield from self._ingest_files(provider, files)
+        push_notification('ingest:update')
+
+    def _ingest_files(self, provider, files):
+        """Parse given files from provider folder and move them to _PROCESSED or _ERROR folder.
+
+        :param provider: dict - Ingest provider details
+        :param files: list of file names
+        """
         registered_parser = self.get_feed_parser(provider)
-        for filename in get_sorted_files(self.path, sort_by=FileSortAttributes.created):
+        for filename in files:
             try:
                 last_updated = None
                 file_path = os.path.join(self.path, filename)
@@ -99,7 +120,8 @@ class FileFeedingService(FeedingService):
                     self.move_file(self.path, filename, provider=provider, success=False)
                 raise ParserError.parseFileError('{}-{}'.format(provider['name'], self.NAME), filename, ex, provider)
 
-        push_notification('ingest:update')
+    def get_watch_path(self, provider):
+        return provider.get('config', {}).get('path', None)
 
     def after_extracting(self, article, provider):
         """Sub-classes should override this method if something needs to be done to the given article.
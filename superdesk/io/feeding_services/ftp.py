@@ -9,12 +9,14 @@
 # at https://www.sourcefabric.org/superdesk/license
 
 
+import io
 import os
 import ftplib
 import logging
 import tempfile
 
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
 from flask import current_app as app
 from superdesk.io.registry import register_feeding_service
@@ -66,6 +68,10 @@ class FTPFeedingService(FeedingService):
             'id': 'path', 'type': 'text', 'label': 'Path',
             'placeholder': 'FTP Server Path', 'required': False
         },
+        {
+            'id': 'watch_path', 'type': 'text', 'label': 'Watched Path',
+            'placeholder': 'Local folder of FTP Server Path, used by ingest:watch', 'required': False
+        },
         {
             'id': 'dest_path', 'type': 'text', 'label': 'Local Path',
             'placeholder': 'Local Path', 'required': True
@@ -234,6 +240,84 @@ class FTPFeedingService(FeedingService):
         items.append(parsed)
         return items
 
+    def _retrieve_and_parse_in_memory(self, config, filename, provider, registered_parser):
+        """Retrieve file using pooled connection and parse it.
+
+        XML files are parsed from memory, other files are stored in ``dest_path`` first
+        because parsers need file path.
+
+        :param config: provider config
+        :param filename: file name
+        :param provider: provider
+        :param registered_parser: provider feed parser
+        """
+        data = io.BytesIO()
+        with ftp_connect(config, pooled=True) as ftp:
+            try:
+                ftp.retrbinary('RETR %s' % filename, data.write)
+            except ftplib.all_errors:
+                raise Exception('Exception retrieving file from FTP server ({filename})'.format(
+                                filename=filename))
+
+        if not isinstance(registered_parser, XMLFeedParser):
+            if 'dest_path' not in config:
+                config['dest_path'] = tempfile.mkdtemp(prefix='superdesk_ingest_')
+            local_file_path = os.path.join(config['dest_path'], filename)
+            with open(local_file_path, 'wb') as f:
+                f.write(data.getvalue())
+            parser = self.get_feed_parser(provider, local_file_path)
+            parsed = parser.parse(local_file_path, provider)
+        else:
+            data.seek(0)
+            xml = etree.parse(data).getroot()
+            parser = self.get_feed_parser(provider, xml)
+            parsed = parser.parse(xml, provider)
+
+        if isinstance(parsed, dict):
+            parsed = [parsed]
+
+        return [parsed]
+
+    def _retrieve_files(self, ftp, config, files, provider, registered_parser):
+        """Retrieve and parse files.
+
+        With ``FTP_INGEST_WORKERS`` bigger than 1 files are retrieved using multiple connections
+        and parsed in parallel, results are still generated in the order of files.
+
+        :param ftp: FTP connection
+        :param config: provider config
+        :param files: list of ``(filename, file_modify)`` tuples
+        :param provider: provider
+        :param registered_parser: provider feed parser
+        :return: generator of ``(filename, file_modify, items, error)`` tuples
+        """
+        workers = app.config.get('FTP_INGEST_WORKERS', 1)
+        if workers <= 1 or len(files) <= 1:
+            for filename, file_modify in files:
+                try:
+                    yield filename, file_modify, self._retrieve_and_parse(
+                        ftp, config, filename, provider, registered_parser), None
+                except Exception as e:
+                    yield filename, file_modify, None, e
+            return
+
+        flask_app = app._get_current_object()
+
+        def retrieve_and_parse(filename):
+            with flask_app.app_context():
+                return self._retrieve_and_parse_in_memory(config, filename, provider, registered_parser)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(retrieve_and_parse, filename) for filename, _ in files]
+            for (filename, file_modify), future in zip(files, futures):
+                try:
+                    yield filename, file_modify, future.result(), None
+                except Exception as e:
+                    yield filename, file_modify, None, e
+
+    def get_watch_path(self, provider):
+        return provider.get('config', {}).get('watch_path') or None
+
     def _update(self, provider, update):
         config = provider.get('config', {})
         do_move = config.get('move', False)
@@ -243,7 +327,7 @@ class FTPFeedingService(FeedingService):
         allowed_ext = getattr(registered_parser, 'ALLOWED_EXT', self.ALLOWED_EXT_DEFAULT)
 
         try:
-            with ftp_connect(config) as ftp:
+            with ftp_connect(config, pooled=True) as ftp:
                 items = []
                 files_to_process = []
                 files = self._sort_files(self._list_files(ftp, provider))
@@ -278,16 +362,17 @@ class FTPFeedingService(FeedingService):
                         files_to_process.append((filename, file_modify))
 
                 # process files
-                for filename, file_modify in files_to_process:
-                    try:
-                        items += self._retrieve_and_parse(ftp, config, filename, provider, registered_parser)
+                for filename, file_modify, file_items, error in self._retrieve_files(
+                        ftp, config, files_to_process, provider, registered_parser):
+                    if error is None:
+                        items += file_items
                         update['private'] = {'last_processed_file_modify': file_modify}
 
                         if do_move:
                             move_dest_file_path = os.path.join(move_path, filename)
                             self._move(ftp, filename, move_dest_file_path)
-                    except Exception as e:
-                        logger.error("Error while parsing {filename}: {msg}".format(filename=filename, msg=e))
+                    else:
+                        logger.error("Error while parsing {filename}: {msg}".format(filename=filename, msg=error))
 
                         if do_move:
                             move_dest_file_path_error = os.path.join(move_path_error, filename)
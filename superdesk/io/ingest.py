@@ -8,6 +8,10 @@
 # AUTHORS and LICENSE files distributed with this source code, or
 # at https://www.sourcefabric.org/superdesk/license
 
+import logging
+
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
 from superdesk.resource import Resource
 from superdesk.services import BaseService
 from superdesk.metadata.item import metadata_schema
@@ -19,10 +23,13 @@ from eve.utils import config
 from flask import current_app as app
 from apps.auth import get_user
 from superdesk.notification import push_notification
+from superdesk.utc import utcnow
 import superdesk
 
 SOURCE = 'ingest'
 
+logger = logging.getLogger(__name__)
+
 
 class IngestResource(Resource):
     schema = {
@@ -56,6 +63,53 @@ class IngestService(BaseService):
         res = self.backend.update_in_mongo(self.datasource, id, document, original)
         return res
 
+    def bulk_write_in_mongo(self, docs, updates):
+        """Insert new items and update existing items using single mongo bulk write.
+
+        Items are prepared like in :meth:`post_in_mongo` and :meth:`patch_in_mongo`,
+        ``updates`` are modified with new ``_updated`` and ``_etag`` values.
+        Write is not ordered so single failing item doesn't prevent others from being saved.
+
+        :param docs: list of new items
+        :param updates: list of ``(id, updates, original)`` tuples
+        :return: set of ids of items which failed to be saved
+        """
+        for doc in docs:
+            resolve_default_values(doc, app.config['DOMAIN'][self.datasource]['defaults'])
+        if docs:
+            self.on_create(docs)
+            resolve_document_etag(docs, self.datasource)
+
+        ids = []
+        requests = []
+        for doc in docs:
+            self.backend.set_default_dates(doc)
+            ids.append(doc[config.ID_FIELD])
+            requests.append(InsertOne(doc))
+        for id, changes, original in updates:
+            changes.setdefault(config.LAST_UPDATED, utcnow())
+            if config.ETAG not in changes:
+                updated = original.copy()
+                updated.update(changes)
+                resolve_document_etag(updated, self.datasource)
+                changes[config.ETAG] = updated[config.ETAG]
+            ids.append(id)
+            requests.append(UpdateOne({config.ID_FIELD: id}, {'$set': changes}))
+
+        failed = set()
+        if requests:
+            try:
+                app.data.get_mongo_collection(self.datasource).bulk_write(requests, ordered=False)
+            except BulkWriteError as error:
+                for write_error in error.details.get('writeErrors', []):
+                    failed.add(ids[write_error['index']])
+                    logger.error('Failed to save item %s: %s', ids[write_error['index']], write_error.get('errmsg'))
+
+        created = [doc for doc in docs if doc[config.ID_FIELD] not in failed]
+        if created:
+            self.on_created(created)
+        return failed
+
     def set_ingest_provider_sequence(self, item, provider):
         """Sets the value of ingest_provider_sequence in item.
 
@@ -0,0 +1,117 @@
+# -*- coding: utf-8; -*-
+#
+# This file is part of Superdesk.
+#
+# Copyright 2013 - 2018 Sourcefabric z.u. and contributors.
+#
+# For the full copyright and license information, please see the
+# AUTHORS and LICENSE files distributed with this source code, or
+# at https://www.sourcefabric.org/superdesk/license
+
+"""Minimal Linux inotify binding using ctypes."""
+
+import os
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+
+#: events of files which are completely written to watched folder
+IN_FILE_COMPLETED = IN_CLOSE_WRITE | IN_MOVED_TO
+
+_EVENT = struct.Struct('iIII')  # wd, mask, cookie, len
+_BUFFER_SIZE = 64 * 1024
+
+
+def _load_libc():
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+        libc.inotify_rm_watch
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+_libc = _load_libc()
+
+
+def is_available():
+    """Test if inotify can be used on this system."""
+    return _libc is not None
+
+
+def _error(*args):
+    code = ctypes.get_errno()
+    return OSError(code, os.strerror(code), *args)
+
+
+class Inotify:
+    """Inotify instance.
+
+    Use with ``with`` to close it when done.
+    """
+
+    def __init__(self):
+        if _libc is None:
+            raise OSError(errno.ENOSYS, 'inotify is not available')
+        self.fd = _libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise _error()
+
+    def add_watch(self, path, mask=IN_FILE_COMPLETED):
+        """Watch given path.
+
+        :param path: folder path
+        :param mask: events to watch
+        :return: watch descriptor
+        """
+        wd = _libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            raise _error(path)
+        return wd
+
+    def rm_watch(self, wd):
+        """Stop watching given watch descriptor.
+
+        :param wd: watch descriptor
+        """
+        if _libc.inotify_rm_watch(self.fd, wd) < 0:
+            raise _error()
+
+    def read(self, timeout=None):
+        """Read events, waits at most ``timeout`` seconds for some.
+
+        :param timeout: seconds to wait, ``None`` means no limit
+        :return: list of ``(wd, mask, name)`` tuples
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        data = os.read(self.fd, _BUFFER_SIZE)
+        events = []
+        offset = 0
+        while offset + _EVENT.size <= len(data):
+            wd, mask, cookie, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            events.append((wd, mask, os.fsdecode(name)))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
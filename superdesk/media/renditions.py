@@ -13,9 +13,9 @@ from PIL import Image
 from io import BytesIO
 import logging
 from copy import deepcopy
+from concurrent.futures import ThreadPoolExecutor
 from flask import current_app as app
 from .media_operations import process_file_from_stream
-from .media_operations import crop_image
 from .media_operations import download_file_from_url
 from .media_operations import process_file
 from .image import fix_orientation
@@ -79,33 +79,123 @@ def generate_renditions(original, media_id, inserted, file_type, content_type,
     specs = list(rendition_config.items())
     if base_image:
         specs.insert(0, ('baseImage', base_image))
-    for rendition, rsize in specs:
-        cropping_data = {}
-        # reset
-        original.seek(0)
-        # create the rendition (can be based on ratio or pixels)
-        if rsize.get('width') or rsize.get('height'):
-            resized, width, height = _resize_image(original, (rsize.get('width'), rsize.get('height')), ext)
-        elif rsize.get('ratio'):
-            resized, width, height, cropping_data = _crop_image(original, ext, rsize.get('ratio'))
-        rend_content_type = 'image/%s' % ext
-        file_name, rend_content_type, metadata = process_file_from_stream(resized, content_type=rend_content_type)
-        resized.seek(0)
-        folder = 'temp' if temporary else None
-        _id = app.media.put(resized, filename=file_name,
-                            content_type=rend_content_type,
-                            folder=folder,
-                            metadata=metadata if insert_metadata else None)
-        inserted.append(_id)
-        renditions[rendition] = {'href': url_for_media(_id, rend_content_type), 'media': _id,
-                                 'mimetype': 'image/%s' % ext, 'width': width, 'height': height}
-        # add the cropping data if exist
-        renditions[rendition].update(cropping_data)
-        if rendition == 'baseImage':  # use baseImage for other renditions once we have it
-            original = resized
+
+    # decode original only once, other renditions are generated from baseImage once we have it
+    _decode_image(img, [rsize for rendition, rsize in specs if rendition == 'baseImage' or not base_image])
+
+    flask_app = app._get_current_object()
+    folder = 'temp' if temporary else None
+
+    def store_rendition(rendition_image):
+        with flask_app.app_context():
+            resized = _save_image(rendition_image.image, ext, **rendition_image.save_options)
+            rend_content_type = 'image/%s' % ext
+            file_name, rend_content_type, metadata = process_file_from_stream(resized, content_type=rend_content_type)
+            resized.seek(0)
+            _id = app.media.put(resized, filename=file_name,
+                                content_type=rend_content_type,
+                                folder=folder,
+                                metadata=metadata if insert_metadata else None)
+            rendition = {'href': url_for_media(_id, rend_content_type), 'media': _id,
+                         'mimetype': 'image/%s' % ext, 'width': rendition_image.width,
+                         'height': rendition_image.height}
+            # add the cropping data if exist
+            rendition.update(rendition_image.cropping_data)
+            return _id, rendition
+
+    def generate_rendition(source, rsize):
+        return store_rendition(_get_rendition_image(source, rsize))
+
+    futures = []
+    with ThreadPoolExecutor(max_workers=app.config.get('MAX_RENDITION_THREADS', 4)) as executor:
+        source = img
+        for rendition, rsize in specs:
+            if not _is_rendition_spec(rsize):
+                logger.warning('invalid spec for rendition "{rendition}"'.format(rendition=rendition))
+                continue
+            if rendition == 'baseImage':  # use baseImage for other renditions once we have it
+                rendition_image = _get_rendition_image(source, rsize)
+                futures.append((rendition, executor.submit(store_rendition, rendition_image)))
+                source = rendition_image.image
+            else:
+                futures.append((rendition, executor.submit(generate_rendition, source, rsize)))
+
+    error = None
+    for rendition, future in futures:
+        try:
+            _id, renditions[rendition] = future.result()
+            inserted.append(_id)
+        except Exception as ex:
+            error = error or ex
+    if error is not None:
+        raise error
     return renditions
 
 
+class RenditionImage:
+    """Rendition image in memory with its size, cropping data and options for saving."""
+
+    def __init__(self, image, width, height, cropping_data=None, save_options=None):
+        self.image = image
+        self.width = width
+        self.height = height
+        self.cropping_data = cropping_data or {}
+        self.save_options = save_options or {}
+
+
+def _is_rendition_spec(rsize):
+    return rsize.get('width') or rsize.get('height') or rsize.get('ratio')
+
+
+def _get_rendition_image(img, rsize):
+    """Create rendition (can be based on ratio or pixels) from decoded image.
+
+    :param img: decoded image
+    :param dict rsize: rendition spec
+    :return: RenditionImage
+    """
+    if rsize.get('width') or rsize.get('height'):
+        width, height = _get_resized_size(img.size, (rsize.get('width'), rsize.get('height')))
+        return RenditionImage(img.resize((width, height), Image.ANTIALIAS), width, height,
+                              save_options={'quality': 85})
+    width, height, cropping_data = _get_crop(img.size, rsize.get('ratio'))
+    cropped = img.crop((cropping_data['CropLeft'], cropping_data['CropTop'],
+                        cropping_data['CropRight'], cropping_data['CropBottom']))
+    return RenditionImage(cropped, width, height, cropping_data)
+
+
+def _decode_image(img, specs):
+    """Decode image, reducing it while decoding if possible.
+
+    JPEG images are decoded in draft mode using the smallest scale which is still
+    bigger than all renditions, unless there is a crop which needs full resolution.
+
+    :param img: opened image
+    :param list specs: specs of renditions generated from the image
+    """
+    sizes = []
+    for rsize in specs:
+        if not (rsize.get('width') or rsize.get('height')):
+            sizes = []
+            break
+        sizes.append(_get_resized_size(img.size, (rsize.get('width'), rsize.get('height'))))
+    if sizes and img.format == 'JPEG':
+        img.draft(img.mode, (max(size[0] for size in sizes), max(size[1] for size in sizes)))
+    img.load()
+    return img
+
+
+def _save_image(img, format, **options):
+    out = BytesIO()
+    try:
+        img.save(out, format, **options)
+    except IOError:
+        out = BytesIO()
+        img.convert('RGB').save(out, format, **options)
+    out.seek(0)
+    return out
+
+
 def can_generate_custom_crop_from_original(width, height, crop):
     """Checks whether custom crop can be generated or not
 
@@ -158,8 +248,19 @@ def _crop_image(content, format, ratio):
     @return: stream
         Returns the resized image as a binary stream.
     """
-    img = Image.open(content)
-    width, height = img.size
+    rendition = _get_rendition_image(Image.open(content), {'ratio': ratio})
+    out = _save_image(rendition.image, format)
+    return out, rendition.width, rendition.height, rendition.cropping_data
+
+
+def _get_crop(size, ratio):
+    """Get the biggest centered crop with given ratio.
+
+    :param tuple size: image width and height
+    :param ratio: ratio as string like '16:9', int or float
+    :return: tuple of crop width, height and cropping data
+    """
+    width, height = size
     if type(ratio) not in [float, int]:
         ratio = ratio.split(':')
         ratio = int(ratio[0]) / int(ratio[1])
@@ -181,8 +282,7 @@ def _crop_image(content, format, ratio):
             'CropTop': 0,
             'CropBottom': new_height,
         }
-    crop, out = crop_image(content, file_name='crop.for.rendition', cropping_data=cropping_data, image_format=format)
-    return out, new_width, new_height, cropping_data
+    return new_width, new_height, cropping_data
 
 
 def to_int(x):
@@ -193,24 +293,15 @@ def to_int(x):
         return x
 
 
-def _resize_image(content, size, format='png', keepProportions=True):
-    """Resize the image given as a binary stream
+def _get_resized_size(image_size, size, keepProportions=True):
+    """Get size of resized image.
 
-    @param content: stream
-        The binary stream containing the image
-    @param format: str
-        The format of the resized image (e.g. png, jpg etc.)
-    @param size: tuple
-        A tuple of width, height
-    @param keepProportions: boolean
-        If true keep image proportions; it will adjust the resized
-        image size.
-    @return: stream
-        Returns the resized image as a binary stream.
+    :param tuple image_size: image width and height
+    :param tuple size: requested width and height, one of them can be None
+    :param keepProportions: If true keep image proportions
+    :return: tuple of width and height
     """
-    assert isinstance(size, tuple)
-    img = Image.open(content)
-    width, height = img.size
+    width, height = image_size
     new_width, new_height = [to_int(x) for x in size]
     if keepProportions:
         if new_width is None and new_height is None:
@@ -231,15 +322,29 @@ def _resize_image(content, size, format='png', keepProportions=True):
                 new_height = int(int(new_width) / original_ratio)
             else:
                 new_width = int(new_height * original_ratio)
+    return new_width, new_height
+
+
+def _resize_image(content, size, format='png', keepProportions=True):
+    """Resize the image given as a binary stream
+
+    @param content: stream
+        The binary stream containing the image
+    @param format: str
+        The format of the resized image (e.g. png, jpg etc.)
+    @param size: tuple
+        A tuple of width, height
+    @param keepProportions: boolean
+        If true keep image proportions; it will adjust the resized
+        image size.
+    @return: stream
+        Returns the resized image as a binary stream.
+    """
+    assert isinstance(size, tuple)
+    img = Image.open(content)
+    new_width, new_height = _get_resized_size(img.size, size, keepProportions)
     resized = img.resize((new_width, new_height), Image.ANTIALIAS)
-    out = BytesIO()
-    try:
-        resized.save(out, format, quality=85)
-    except IOError:
-        out = BytesIO()
-        resized = resized.convert('RGB')
-        resized.save(out, format, quality=85)
-    out.seek(0)
+    out = _save_image(resized, format, quality=85)
     return out, new_width, new_height
 
 
@@ -11,18 +11,25 @@
 """Superdesk push notifications"""
 
 import logging
+import time
 import os
 import json
+import threading
 
+from collections import OrderedDict
 from datetime import datetime
-from flask import current_app as app
+from functools import partial
+from flask import current_app as app, g, has_app_context
 from superdesk.utils import json_serialize_datetime_objectId
-from superdesk.websockets_comms import SocketMessageProducer
+from superdesk.websockets_comms import SocketMessageProducer, get_topics
 
 
 logger = logging.getLogger(__name__)
 exchange_name = 'socket_notification'
 
+#: event name of message containing multiple messages
+BATCH_EVENT = 'batch'
+
 
 class ClosedSocket():
     """Mimic closed socket to simplify logic when connection can't be established at first place."""
@@ -34,7 +41,16 @@ class ClosedSocket():
         pass
 
 
+#: lock for sending via shared notification client, buffers might be flushed from timer threads
+_send_lock = threading.Lock()
+
+
 def init_app(app):
+    app.teardown_appcontext(flush_notifications)
+    connect(app)
+
+
+def connect(app):
     try:
         app.notification_client = SocketMessageProducer(app.config['CELERY_BROKER_URL'],
                                                         app.config.get('WEBSOCKET_EXCHANGE'))
@@ -50,25 +66,219 @@ def _create_socket_message(**kwargs):
     return json.dumps(kwargs, default=json_serialize_datetime_objectId)
 
 
+def _create_batch_message(messages):
+    """Create single message for list of messages.
+
+    Messages are included as json strings together with event name, created time and topics,
+    so websocket server can send them to subscribed clients without parsing them.
+
+    :param list messages: list of message dicts
+    """
+    return json.dumps({
+        'event': BATCH_EVENT,
+        '_created': datetime.utcnow().isoformat(),
+        '_process': os.getpid(),
+        'messages': [{
+            'event': message['event'],
+            '_created': message['_created'],
+            'message': _create_socket_message(**message),
+            'topics': get_topics(message['event'], message['extra']),
+        } for message in messages],
+    })
+
+
+#: notification fields with ids which are collected into list when notifications are merged
+ID_FIELDS = ('item', 'items', 'desk', 'desks')
+
+
+def _is_scalar(value):
+    return not isinstance(value, (dict, list, tuple, set))
+
+
+def _is_merged(field, value):
+    return isinstance(value, dict) or (field in ID_FIELDS and (_is_scalar(value) or isinstance(value, list)))
+
+
+def _get_ids(value):
+    return [value] if _is_scalar(value) else value
+
+
+class NotificationBuffer:
+    """Notifications pushed within app context, merged by event name.
+
+    Notifications with the same name and same values are merged, except for dict values
+    (like ``items`` or ``desks`` used with ``content:update``) which are merged together
+    and values of :data:`ID_FIELDS` which are collected into lists of ids, so for example
+    ``item:updated`` notifications for multiple items are sent as single one with list of ``item`` ids.
+    If there is single id it's kept as it was pushed.
+
+    If ``on_timeout`` is set, it's called from timer thread once first buffered message
+    is ``max_age`` seconds old, so messages are sent also from long running app contexts
+    like commands, where context teardown might come much later.
+
+    :param max_size: max number of messages kept in buffer
+    :param max_age: max number of seconds messages are kept in buffer
+    :param on_timeout: function called when messages are buffered for ``max_age`` seconds
+    """
+
+    def __init__(self, max_size, max_age, on_timeout=None):
+        self.max_size = max_size
+        self.max_age = max_age
+        self.on_timeout = on_timeout
+        self.messages = OrderedDict()
+        self.created = None
+        self._scalar_ids = {}
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def __len__(self):
+        return len(self.messages)
+
+    def add(self, name, **kwargs):
+        key = self._get_key(name, kwargs)
+        with self._lock:
+            if key in self.messages:
+                extra = self.messages[key]['extra']
+                for field, value in kwargs.items():
+                    if isinstance(value, dict):
+                        extra[field].update(value)
+                    elif _is_merged(field, value):
+                        extra[field].extend(_id for _id in _get_ids(value) if _id not in extra[field])
+            else:
+                extra = {}
+                for field, value in kwargs.items():
+                    if isinstance(value, dict):
+                        extra[field] = value.copy()
+                    elif _is_merged(field, value):
+                        extra[field] = list(OrderedDict.fromkeys(_get_ids(value)))
+                    else:
+                        extra[field] = value
+                self.messages[key] = {
+                    'event': name,
+                    'extra': extra,
+                    '_created': datetime.utcnow().isoformat(),
+                    '_process': os.getpid(),
+                }
+                self._scalar_ids[key] = [field for field in extra
+                                         if field in ID_FIELDS and _is_scalar(kwargs[field])]
+                if self.created is None:
+                    self.created = time.time()
+                    self._start_timer()
+
+    def _start_timer(self):
+        if self.on_timeout is not None:
+            self._timer = threading.Timer(self.max_age, self.on_timeout)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _get_key(self, name, kwargs):
+        values = {field: value for field, value in kwargs.items() if not _is_merged(field, value)}
+        merged = sorted((field, type(value).__name__) for field, value in kwargs.items() if _is_merged(field, value))
+        return name, json.dumps(values, default=json_serialize_datetime_objectId, sort_keys=True), tuple(merged)
+
+    def is_full(self):
+        created = self.created
+        return len(self.messages) >= self.max_size or (created is not None and time.time() - created >= self.max_age)
+
+    def pop_messages(self):
+        with self._lock:
+            messages = list(self.messages.values())
+            for key, message in self.messages.items():
+                # keep single id as it was pushed
+                for field in self._scalar_ids[key]:
+                    if len(message['extra'][field]) == 1:
+                        message['extra'][field] = message['extra'][field][0]
+            self.messages = OrderedDict()
+            self._scalar_ids = {}
+            self.created = None
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        return messages
+
+
+def _get_notification_buffer():
+    if not has_app_context() or not app.config.get('NOTIFICATION_BUFFER_SIZE'):
+        return None
+    if getattr(g, 'notification_buffer', None) is None:
+        notification_buffer = NotificationBuffer(app.config['NOTIFICATION_BUFFER_SIZE'],
+                                                 app.config.get('NOTIFICATION_BUFFER_TIME', 1))
+        notification_buffer.on_timeout = partial(_flush_buffer_on_timeout, app._get_current_object(),
+                                                  notification_buffer)
+        g.notification_buffer = notification_buffer
+    return g.notification_buffer
+
+
+def _flush_buffer_on_timeout(flask_app, notification_buffer):
+    with flask_app.app_context():
+        _flush_buffer(notification_buffer)
+
+
+def _send(message, name):
+    with _send_lock:
+        if not app.notification_client.open:
+            app.notification_client.close()
+            connect(app)
+
+        if not app.notification_client.open:
+            logger.warning('No connection to broker. Dropping event %s' % name)
+            return
+
+        try:
+            logger.debug('Sending the message: {} to the broker.'.format(message))
+            app.notification_client.send(message)
+        except Exception as err:
+            logger.exception(err)
+
+
 def push_notification(name, **kwargs):
     """Push notification to broker.
 
     In case connection is closed it will try to reconnect.
 
+    If ``NOTIFICATION_BUFFER_SIZE`` is set notifications are buffered and merged
+    till the end of app context (request or celery task) or for ``NOTIFICATION_BUFFER_TIME`` seconds,
+    see :class:`NotificationBuffer`.
+
     :param name: event name
     """
     logger.debug('pushing event {0} ({1})'.format(name, json.dumps(kwargs, default=json_serialize_datetime_objectId)))
-    if not app.notification_client.open:
-        app.notification_client.close()
-        init_app(app)
-
-    if not app.notification_client.open:
-        logger.warning('No connection to broker. Dropping event %s' % name)
+    notification_buffer = _get_notification_buffer()
+    if notification_buffer is not None:
+        notification_buffer.add(name, **kwargs)
+        if notification_buffer.is_full():
+            flush_notifications()
         return
 
     try:
         message = _create_socket_message(event=name, extra=kwargs)
-        logger.debug('Sending the message: {} to the broker.'.format(message))
-        app.notification_client.send(message)
     except Exception as err:
         logger.exception(err)
+        return
+    _send(message, name)
+
+
+def flush_notifications(exc=None):
+    """Send buffered notifications, as single message if there are more.
+
+    It's called automatically when app context is torn down
+    and when messages are buffered for ``NOTIFICATION_BUFFER_TIME``.
+    """
+    notification_buffer = getattr(g, 'notification_buffer', None) if has_app_context() else None
+    if notification_buffer:
+        _flush_buffer(notification_buffer)
+
+
+def _flush_buffer(notification_buffer):
+    messages = notification_buffer.pop_messages()
+    if not messages:
+        return
+    try:
+        if len(messages) == 1:
+            message = _create_socket_message(**messages[0])
+        else:
+            message = _create_batch_message(messages)
+    except Exception as err:
+        logger.exception(err)
+        return
+    _send(message, ', '.join(OrderedDict.fromkeys(item['event'] for item in messages)))
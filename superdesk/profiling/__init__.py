@@ -9,22 +9,29 @@
 # at https://www.sourcefabric.org/superdesk/license
 
 import io
-import logging
-import pstats
 import re
+import pstats
+import hashlib
+import logging
+from pymongo import UpdateOne
 from superdesk import get_resource_service
 import superdesk
 
 from flask import current_app as app
 
 from superdesk.profiling.resource import ProfilingResource
-from superdesk.profiling.service import ProfilingService, profile
+from superdesk.profiling.service import ProfilingService, profile, get_samples_collection
+from superdesk.profiling.sampler import Sampler
 
 
 logger = logging.getLogger(__name__)
 
+#: sampling profiler, used if ``PROFILING_MODE`` is ``sampling``
+sampler = None
+
 
 def init_app(app):
+    global sampler
     if app.config.get('ENABLE_PROFILING'):
         endpoint_name = 'profiling'
         service = ProfilingService(endpoint_name, backend=superdesk.get_backend())
@@ -33,7 +40,17 @@ def init_app(app):
         superdesk.privilege(name='profiling', label='Profiling Service',
                             description='User can read profiling data.')
 
-        profile.enable()
+        if app.config.get('PROFILING_MODE') == 'sampling':
+            def flush(stacks):
+                with app.app_context():
+                    for name, name_stacks in stacks.items():
+                        dump_samples(name_stacks, name)
+
+            sampler = Sampler(app.config.get('PROFILING_SAMPLE_INTERVAL', 0.01),
+                              app.config.get('PROFILING_FLUSH_INTERVAL', 60),
+                              flush)
+        else:
+            profile.enable()
 
 
 class ProfileManager():
@@ -42,12 +59,51 @@ class ProfileManager():
 
     def __enter__(self):
         if app.config.get('ENABLE_PROFILING'):
-            profile.enable()
+            if sampler is not None:
+                sampler.start_block(self.name)
+            else:
+                profile.enable()
 
     def __exit__(self, exc_type, exc_value, traceback):
         if app.config.get('ENABLE_PROFILING'):
-            profile.disable()
-            dump_stats(profile, self.name)
+            if sampler is not None:
+                sampler.end_block()
+            else:
+                profile.disable()
+                dump_stats(profile, self.name)
+
+
+def dump_samples(stacks, name):
+    """Add sampled stacks to stored profile.
+
+    There is a document per stack and its samples are incremented in place,
+    so the profile size is not limited by mongo document size and processes
+    can add samples concurrently.
+
+    :param Counter stacks: counter of folded stacks
+    :param string name: the name that identifies the profile
+    """
+    if not stacks:
+        return
+    collection = get_samples_collection()
+    collection.create_index([('name', 1), ('samples', -1)])
+    collection.bulk_write([
+        UpdateOne({'_id': _get_sample_id(name, stack)},
+                  {'$setOnInsert': {'name': name, 'stack': stack}, '$inc': {'samples': count}},
+                  upsert=True)
+        for stack, count in stacks.items()
+    ], ordered=False)
+    if not get_resource_service('profiling').find_one(req=None, _id=name):
+        get_resource_service('profiling').post([{'name': name, 'profiling_data': []}])
+
+
+def _get_sample_id(name, stack):
+    """Get id for sampled stack, stacks can be too long to be indexed.
+
+    :param string name: the name that identifies the profile
+    :param string stack: folded stack
+    """
+    return hashlib.sha1('{}:{}'.format(name, stack).encode('utf-8')).hexdigest()
 
 
 def dump_stats(profile, name):
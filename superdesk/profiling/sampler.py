@@ -0,0 +1,111 @@
+# -*- coding: utf-8; -*-
+#
+# This file is part of Superdesk.
+#
+# Copyright 2013 - 2018 Sourcefabric z.u. and contributors.
+#
+# For the full copyright and license information, please see the
+# AUTHORS and LICENSE files distributed with this source code, or
+# at https://www.sourcefabric.org/superdesk/license
+
+import os
+import sys
+import time
+import logging
+import threading
+
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+
+def fold_stack(frame):
+    """Get stack of given frame in folded format, like ``module:func;module:func``, outermost first.
+
+    :param frame: innermost frame
+    """
+    stack = []
+    while frame is not None:
+        stack.append('{}:{}'.format(frame.f_globals.get('__name__', '?'), frame.f_code.co_name))
+        frame = frame.f_back
+    return ';'.join(reversed(stack))
+
+
+class Sampler:
+    """Statistical profiler.
+
+    Background thread takes stacks of threads running profiled blocks every ``interval`` seconds
+    and counts them per block name, so the overhead doesn't depend on how much code runs in blocks.
+    Collected stacks are passed to ``flush`` every ``flush_interval`` seconds.
+
+    :param interval: seconds between samples
+    :param flush_interval: seconds between flushes
+    :param flush: function called with dict of block name and counter of folded stacks
+    """
+
+    def __init__(self, interval, flush_interval, flush):
+        self.interval = interval
+        self.flush_interval = flush_interval
+        self.flush = flush
+        self.blocks = {}
+        self.stacks = {}
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def start_block(self, name):
+        """Start sampling current thread for block with given name.
+
+        :param name: block name
+        """
+        if self._pid != os.getpid():
+            self._start()
+        ident = threading.get_ident()
+        self.blocks[ident] = self.blocks.get(ident, ()) + (name, )
+
+    def end_block(self):
+        """Stop sampling current thread for innermost block."""
+        ident = threading.get_ident()
+        names = self.blocks.get(ident, ())[:-1]
+        if names:
+            self.blocks[ident] = names
+        else:
+            self.blocks.pop(ident, None)
+
+    def sample(self):
+        """Count current stacks of threads running blocks."""
+        frames = sys._current_frames()
+        with self._lock:
+            for ident, names in list(self.blocks.items()):
+                frame = frames.get(ident)
+                if frame is not None:
+                    self.stacks.setdefault(names[-1], Counter())[fold_stack(frame)] += 1
+
+    def pop_stacks(self):
+        """Get stacks collected since last call."""
+        with self._lock:
+            stacks, self.stacks = self.stacks, {}
+        return stacks
+
+    def _start(self):
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self.blocks = {}
+            self.stacks = {}
+        thread = threading.Thread(target=self._run, daemon=True)
+        thread.start()
+
+    def _run(self):
+        next_flush = time.time() + self.flush_interval
+        while True:
+            time.sleep(self.interval)
+            self.sample()
+            if time.time() >= next_flush:
+                next_flush = time.time() + self.flush_interval
+                stacks = self.pop_stacks()
+                if stacks:
+                    try:
+                        self.flush(stacks)
+                    except Exception:
+                        logger.exception('failed to store profiling samples')
@@ -10,6 +10,7 @@
 
 import cProfile
 import logging
+from flask import current_app as app
 from superdesk.errors import SuperdeskApiError
 from superdesk.services import BaseService
 
@@ -20,6 +21,14 @@ logger = logging.getLogger(__name__)
 
 profile = cProfile.Profile()
 
+#: collection for sampled stacks, there is a document per profiled block and stack
+PROFILING_SAMPLES = 'profiling_samples'
+
+
+def get_samples_collection():
+    """Get mongo collection with sampled stacks."""
+    return app.data.mongo.pymongo().db[PROFILING_SAMPLES]
+
 
 class Cursor:
     """
@@ -51,10 +60,30 @@ class ProfilingService(BaseService):
         for doc in docs:
             doc[config.ID_FIELD] = doc['name']
 
+    def on_fetched(self, doc):
+        for item in doc[config.ITEMS]:
+            self.on_fetched_item(item)
+
+    def on_fetched_item(self, doc):
+        """Add ``PROFILING_MAX_STACKS`` most common sampled stacks in folded format used by flame graph tools."""
+        samples = list(get_samples_collection().find({'name': doc[config.ID_FIELD]})
+                       .sort('samples', -1)
+                       .limit(app.config.get('PROFILING_MAX_STACKS', 5000)))
+        if samples:
+            doc['folded'] = '\n'.join('{} {}'.format(line['stack'], line['samples']) for line in samples)
+
     def delete(self, lookup):
         """
         Resets the profiling data.
+
+        Sampling profiler data is removed.
         """
+        from superdesk.profiling import sampler
+        if sampler is not None:
+            sampler.pop_stacks()
+            names = [doc[config.ID_FIELD] for doc in self.get_from_mongo(req=None, lookup=lookup)]
+            get_samples_collection().delete_many({'name': {'$in': names}})
+            return super().delete(lookup)
         try:
             profile.disable()
             from superdesk.profiling import dump_stats
@@ -8,6 +8,7 @@
 # AUTHORS and LICENSE files distributed with this source code, or
 # at https://www.sourcefabric.org/superdesk/license
 
+import copy
 import logging
 from lxml import etree
 from superdesk.metadata.item import ITEM_TYPE, CONTENT_TYPE, FORMATS, FORMAT
@@ -18,6 +19,12 @@ from superdesk.publish import registered_transmitters
 formatters = []
 logger = logging.getLogger(__name__)
 
+#: formatter instances per class, used as prototypes for :func:`get_formatter`
+_instances = {}
+
+#: formatter instances which can format given format type, in registration order
+_candidates = {}
+
 
 class FormatterRegistry(type):
     """Registry metaclass for formatters."""
@@ -27,11 +34,23 @@ class FormatterRegistry(type):
         super(FormatterRegistry, cls).__init__(name, bases, attrs)
         if name != 'Formatter':
             formatters.append(cls)
+            _candidates.clear()
 
 
 class Formatter(metaclass=FormatterRegistry):
     """Base Formatter class for all types of Formatters like News ML 1.2, News ML G2, NITF, etc."""
 
+    #: formatted item can be reused for all subscribers with same destination config and codes,
+    #: only publish sequence number is updated via :meth:`set_sequence_number`.
+    #: Formatters using subscriber specific data should keep it ``False``.
+    #: Only value set on the class itself is used, see :func:`is_reusable`.
+    reusable = False
+
+    #: format type handled by formatter, it's used to skip formatters for other types.
+    #: Only value set on the class itself is used, so subclasses overriding :meth:`can_format`
+    #: are checked for every format type unless they set it too.
+    format_type = None
+
     def __init__(self):
         self.can_preview = False
         self.can_export = False
@@ -50,6 +69,18 @@ class Formatter(metaclass=FormatterRegistry):
         """Test if formatter can format for given article."""
         raise NotImplementedError()
 
+    def set_sequence_number(self, formatted_item, pub_seq_num, previous_seq_num):
+        """Set publish sequence number in formatted item created for other subscriber.
+
+        Used only for :attr:`reusable` formatters.
+
+        :param formatted_item: formatted item
+        :param int pub_seq_num: publish sequence number for the subscriber
+        :param int previous_seq_num: publish sequence number used in formatted item
+        :return: formatted item with updated publish sequence number
+        """
+        return formatted_item
+
     def append_body_footer(self, article):
         """
         Checks if the article has any Public Service Announcements and if available appends each of them to the body.
@@ -142,20 +173,65 @@ class Formatter(metaclass=FormatterRegistry):
                 return transmitter.transmit_media(media, self.subscriber, self.destination)
 
 
+def _get_instance(formatter_cls):
+    """Get prototype instance of given formatter class.
+
+    :param formatter_cls: formatter class
+    """
+    instance = _instances.get(formatter_cls)
+    if instance is None:
+        instance = _instances[formatter_cls] = formatter_cls()
+    return instance
+
+
+def _get_candidates(format_type):
+    """Get formatter instances which might format given format type.
+
+    Those are formatters with same format type and formatters without format type,
+    which have to be checked via :meth:`Formatter.can_format`.
+
+    :param str format_type: format type
+    """
+    key = (format_type or '').lower()
+    candidates = _candidates.get(key)
+    if candidates is None:
+        candidates = []
+        for formatter_cls in list(formatters):
+            instance = _get_instance(formatter_cls)
+            if 'format_type' not in formatter_cls.__dict__ or (instance.format_type or '').lower() == key:
+                candidates.append(instance)
+        candidates = _candidates[key] = tuple(candidates)
+    return candidates
+
+
 def get_formatter(format_type, article):
-    """Get parser for given xml.
+    """Get formatter for given format type and article.
+
+    Formatter instances are created once and only copied for every call,
+    so formatter state like destination is not shared.
+
+    :param str format_type: destination format
+    :param dict article: article to format
+    """
+    for instance in _get_candidates(format_type):
+        if instance.can_format(format_type, article):
+            return copy.copy(instance)
+
+
+def is_reusable(formatter):
+    """Test if formatted item can be reused for other subscribers.
+
+    Only :attr:`Formatter.reusable` set on the formatter class itself is used,
+    so subclasses which might add subscriber specific data must set it too.
 
-    :param etree: parsed xml
+    :param formatter: formatter instance
     """
-    for formatter_cls in formatters:
-        formatter_instance = formatter_cls()
-        if formatter_instance.can_format(format_type, article):
-            return formatter_instance
+    return type(formatter).__dict__.get('reusable', False)
 
 
 def get_all_formatters():
     """Return all formatters registered."""
-    return [formatter_cls() for formatter_cls in formatters]
+    return [copy.copy(_get_instance(formatter_cls)) for formatter_cls in list(formatters)]
 
 
 from .nitf_formatter import NITFFormatter  # NOQA
@@ -42,6 +42,8 @@ class EmailFormatter(Formatter):
 
     """
 
+    format_type = 'email'
+
     def _inject_dateline(self, formatted_article):
         """Inject dateline in article's body_html"""
         body_html_elem = sd_etree.parse_html(formatted_article.get('body_html', '<p> </p>'))
@@ -13,12 +13,13 @@ class IDMLFormatter(Formatter):
     Format items to `IDML <https://fileinfo.com/extension/idml>`
     """
 
+    format_type = 'idml'
+
     def __init__(self):
         # works with python 3.6
         # https://code.i-harness.com/en/q/c84c47
         # super().__init__()
         super(self.__class__, self).__init__()
-        self.format_type = 'idml'
 
     def format(self, article, subscriber, codes=None):
         try:
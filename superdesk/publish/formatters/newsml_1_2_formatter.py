@@ -34,6 +34,8 @@ class NewsML12Formatter(Formatter):
     """
 
     XML_ROOT = '<?xml version="1.0"?><!DOCTYPE NewsML SYSTEM "http://www.provider.com/dtd/NewsML_1.2.dtd">'
+    reusable = True
+    format_type = 'newsml12'
     newml_content_type = {
         CONTENT_TYPE.PICTURE: 'Photo',
         CONTENT_TYPE.AUDIO: 'Audio',
@@ -74,6 +76,10 @@ class NewsML12Formatter(Formatter):
         except Exception as ex:
             raise FormatterError.newml12FormatterError(ex, subscriber)
 
+    def set_sequence_number(self, formatted_item, pub_seq_num, previous_seq_num):
+        return formatted_item.replace('<TransmissionId>{}</TransmissionId>'.format(previous_seq_num),
+                                      '<TransmissionId>{}</TransmissionId>'.format(pub_seq_num), 1)
+
     def _format_news_envelope(self, article, news_envelope, pub_seq_num):
         """
         Create a NewsEnvelope element
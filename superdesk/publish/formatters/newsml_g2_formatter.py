@@ -53,6 +53,8 @@ class NewsMLG2Formatter(Formatter):
     """NewsML G2 Formatter"""
 
     XML_ROOT = '<?xml version="1.0" encoding="UTF-8"?>'
+    reusable = True
+    format_type = 'newsmlg2'
     now = utcnow()
     string_now = now.strftime('%Y-%m-%dT%H:%M:%S.0000Z')
 
@@ -96,6 +98,10 @@ class NewsMLG2Formatter(Formatter):
         except Exception as ex:
             raise FormatterError.newmsmlG2FormatterError(ex, subscriber)
 
+    def set_sequence_number(self, formatted_item, pub_seq_num, previous_seq_num):
+        return formatted_item.replace('<transmitId>{}</transmitId>'.format(previous_seq_num),
+                                      '<transmitId>{}</transmitId>'.format(pub_seq_num), 1)
+
     def _is_package(self, article):
         """Given an article returns if it is a none takes package or not
 
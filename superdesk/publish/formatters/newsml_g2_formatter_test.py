@@ -1050,3 +1050,9 @@ class NewsMLG2FormatterTest(TestCase):
         self.assertEqual('iso3166-1a2:CZ', country.get('qcode'))
         broader = country.findall(ns('broader'))
         self.assertEqual(0, len(broader))
+
+    def test_set_sequence_number(self):
+        seq, doc = self.formatter.format(self.article, {'name': 'Test Subscriber'})[0]
+        doc = self.formatter.set_sequence_number(doc, 5, seq)
+        xml = etree.fromstring(doc.encode('utf-8'))
+        self.assertEqual('5', xml.find(ns('header/transmitId')).text)
@@ -99,6 +99,9 @@ class NINJSFormatter(Formatter):
                               'body_text', 'body_html', 'slugline', 'keywords',
                               'firstcreated', 'firstpublished', 'source', 'extra', 'annotations')
 
+    reusable = True
+    format_type = 'ninjs'
+
     rendition_properties = ('href', 'width', 'height', 'mimetype', 'poi', 'media')
     vidible_fields = {field: field for field in rendition_properties}
     vidible_fields.update({
@@ -109,7 +112,6 @@ class NINJSFormatter(Formatter):
     })
 
     def __init__(self):
-        self.format_type = 'ninjs'
         self.can_preview = True
         self.can_export = True
 
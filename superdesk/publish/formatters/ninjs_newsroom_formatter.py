@@ -14,8 +14,9 @@ import superdesk
 
 
 class NewsroomNinjsFormatter(NINJSFormatter):
+    format_type = 'newsroom ninjs'
+
     def __init__(self):
-        self.format_type = 'newsroom ninjs'
         self.can_preview = False
         self.can_export = False
 
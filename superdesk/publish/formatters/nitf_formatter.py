@@ -30,6 +30,8 @@ class NITFFormatter(Formatter):
     """
 
     XML_ROOT = '<?xml version="1.0"?>'
+    reusable = True
+    format_type = 'nitf'
 
     _message_attrib = {'version': "-//IPTC//DTD NITF 3.6//EN"}
 
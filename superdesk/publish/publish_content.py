@@ -8,10 +8,15 @@
 # AUTHORS and LICENSE files distributed with this source code, or
 # at https://www.sourcefabric.org/superdesk/license
 
+import json
+import time
 import logging
+import threading
 import superdesk
 import superdesk.publish
 
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
 from eve.utils import config, ParsedRequest
 from flask import current_app as app
@@ -31,6 +36,10 @@ UPDATE_SCHEDULE_DEFAULT = {'seconds': 10}
 PUBLISH_QUEUE = 'publish_queue'
 STATE_PENDING = 'pending'
 
+#: transmit metrics per destination name, since worker start
+transmit_metrics = {}
+_metrics_lock = threading.Lock()
+
 
 class PublishContent(superdesk.Command):
     """Deliver items from ``publish_queue to destinations.``
@@ -105,17 +114,86 @@ def transmit_subscriber_items(subscriber, retries=False):
 
     try:
         queue_items = get_queue_items(retries, subscriber)
-        for queue_item in queue_items:
-            args = [queue_item[config.ID_FIELD]]
-            kwargs = {'is_async': is_async}
-            if is_async:
-                transmit_item.apply_async(args=args, kwargs=kwargs)
-            else:
-                transmit_item.apply(args=args, kwargs=kwargs, throw=True)
+        if is_async:
+            for queue_item in queue_items:
+                transmit_item.apply_async(args=[queue_item[config.ID_FIELD]], kwargs={'is_async': is_async})
+        else:
+            transmit_destinations_items(queue_items)
     finally:
         unlock(lock_name)
 
 
+def transmit_destinations_items(queue_items):
+    """Transmit queue items of a subscriber, different destinations in parallel.
+
+    Items for every destination are transmitted one by one in the order they are queued,
+    using up to ``MAX_TRANSMIT_THREADS`` threads for different destinations.
+
+    :param queue_items: queue items sorted by ``published_seq_num``
+    """
+    destinations = OrderedDict()
+    for queue_item in queue_items:
+        key = json.dumps(queue_item.get('destination') or {}, sort_keys=True, default=str)
+        destinations.setdefault(key, []).append(queue_item)
+
+    max_workers = min(app.config.get('MAX_TRANSMIT_THREADS', 1), len(destinations))
+    if max_workers <= 1:
+        for items in destinations.values():
+            _transmit_destination_items(items)
+        return
+
+    stop = threading.Event()
+    flask_app = app._get_current_object()
+
+    def worker(items):
+        with flask_app.app_context():
+            _transmit_destination_items(items, stop)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(worker, items) for items in destinations.values()]
+        try:
+            for future in futures:
+                future.result()
+        except BaseException:
+            # stop transmitting other destinations once current items are done
+            stop.set()
+            raise
+
+
+def _transmit_destination_items(queue_items, stop=None):
+    """Transmit queue items for single destination in order and record metrics.
+
+    :param queue_items: queue items for the destination
+    :param stop: event set when transmission should stop
+    """
+    destination = queue_items[0].get('destination') or {}
+    name = destination.get('name') or destination.get('delivery_type')
+    start = time.time()
+    latencies = []
+    try:
+        for queue_item in queue_items:
+            if stop is not None and stop.is_set():
+                break
+            item_start = time.time()
+            transmit_item.apply(args=[queue_item[config.ID_FIELD]], kwargs={'is_async': False}, throw=True)
+            latencies.append(time.time() - item_start)
+    finally:
+        _update_transmit_metrics(name, latencies, time.time() - start)
+
+
+def _update_transmit_metrics(name, latencies, elapsed):
+    if not latencies:
+        return
+    with _metrics_lock:
+        metrics = transmit_metrics.setdefault(name, {'items': 0, 'seconds': 0.0, 'max_latency': 0.0})
+        metrics['items'] += len(latencies)
+        metrics['seconds'] += sum(latencies)
+        metrics['max_latency'] = max(metrics['max_latency'], max(latencies))
+    logger.info('Transmitted {} items to destination {} in {:.3f}s: {:.2f} items/s, avg latency {:.3f}s'.format(
+        len(latencies), name, elapsed, len(latencies) / elapsed if elapsed else len(latencies),
+        sum(latencies) / len(latencies)))
+
+
 @celery.task(soft_time_limit=300)
 def transmit_item(queue_item_id, is_async=False):
     publish_queue_service = get_resource_service(PUBLISH_QUEUE)
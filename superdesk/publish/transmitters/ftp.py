@@ -50,7 +50,7 @@ class FTPPublishService(PublishService):
         config = queue_item.get('destination', {}).get('config', {})
 
         try:
-            with ftp_connect(config) as ftp:
+            with ftp_connect(config, pooled=True) as ftp:
                 filename = get_publish_service().get_filename(queue_item)
                 b = BytesIO(queue_item['encoded_item'])
                 ftp.storbinary("STOR " + filename, b)
@@ -10,9 +10,13 @@
 
 import json
 import hmac
+import time
 import logging
 import requests
+import threading
 
+from collections import OrderedDict
+from flask import current_app, has_app_context
 from superdesk import app
 from superdesk.publish import register_transmitter
 
@@ -24,6 +28,64 @@ errors = [PublishHTTPPushError.httpPushError().get_error_description()]
 logger = logging.getLogger(__name__)
 
 
+def _get_config(key, default):
+    return current_app.config.get(key, default) if has_app_context() else default
+
+
+class HTTPSessionPool:
+    """Keep-alive sessions for http push destinations.
+
+    There is one :class:`requests.Session` per destination config, so that connections
+    to the resource and assets services are reused between items.
+    At most ``HTTP_PUSH_MAX_SESSIONS`` sessions are kept, least recently used are dropped first,
+    and sessions idle for more than ``HTTP_PUSH_SESSION_IDLE_TIMEOUT`` seconds are dropped.
+    Dropped sessions are not closed as those might be still used by other transmit threads,
+    their connections are closed once sessions are garbage collected.
+    """
+
+    def __init__(self):
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, destination):
+        """Get session for given destination.
+
+        :param destination: publish destination
+        """
+        key = json.dumps(destination.get('config', {}), sort_keys=True, default=str)
+        now = time.time()
+        idle_timeout = _get_config('HTTP_PUSH_SESSION_IDLE_TIMEOUT', 300)
+        max_sessions = _get_config('HTTP_PUSH_MAX_SESSIONS', 20)
+        with self._lock:
+            session, _ = self._sessions.pop(key, (None, None))
+            for other_key, (other, used) in list(self._sessions.items()):
+                if now - used > idle_timeout or len(self._sessions) >= max_sessions:
+                    del self._sessions[other_key]
+            if session is None:
+                session = self._create_session()
+            self._sessions[key] = (session, now)
+        return session
+
+    def _create_session(self):
+        pool_size = _get_config('HTTP_PUSH_POOL_SIZE', 10)
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def clear(self):
+        """Close all sessions, it should be used only when there are no transmits running."""
+        with self._lock:
+            sessions = [session for session, _ in self._sessions.values()]
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+
+session_pool = HTTPSessionPool()
+
+
 class HTTPPushService(PublishService):
     """HTTP Publish Service.
 
@@ -90,7 +152,7 @@ class HTTPPushService(PublishService):
     def _push_item(self, destination, data):
         resource_url = self._get_resource_url(destination)
         headers = self._get_headers(data, destination, self.headers)
-        response = requests.post(resource_url, data=data, headers=headers)
+        response = session_pool.get(destination).post(resource_url, data=data, headers=headers)
 
         # need to rethrow exception as a superdesk exception for now for notifiers.
         try:
@@ -153,14 +215,13 @@ class HTTPPushService(PublishService):
         mimetype = getattr(media, 'content_type', 'image/jpeg')
         data = {'media_id': str(media._id)}
         files = {'media': (str(media._id), media, mimetype)}
-        s = requests.Session()
         assets_url = self._get_assets_url(destination)
         request = requests.Request('POST', assets_url)
         prepped = request.prepare()
         prepped.prepare_body(data, files)
         headers = self._get_headers(prepped.body, destination, prepped.headers)
         prepped.prepare_headers(headers)
-        response = s.send(prepped)
+        response = session_pool.get(destination).send(prepped)
         if response.status_code not in (200, 201):
             self._raise_publish_error(
                 response.status_code,
@@ -182,7 +243,7 @@ class HTTPPushService(PublishService):
         @return: bool
         """
         assets_url = self._get_assets_url(destination, media_id)
-        response = requests.get(assets_url)
+        response = session_pool.get(destination).get(assets_url)
         if response.status_code not in (requests.codes.ok, requests.codes.not_found):  # @UndefinedVariable
             self._raise_publish_error(
                 response.status_code,
@@ -1,5 +1,8 @@
+import os
 import superdesk
+import threading
 import traceback
+from flask import current_app as app
 from superdesk import get_resource_service
 from .resource import Resource
 from .services import BaseService
@@ -33,41 +36,116 @@ class SequencesResource(Resource):
     internal_resource = True
 
 
+class SequenceBlock:
+    """Block of sequence numbers reserved by this process.
+
+    :param key_name: sequence key
+    :param first: first available number
+    :param last: last reserved number
+    """
+
+    def __init__(self, key_name, first, last):
+        self.key_name = key_name
+        self.next = first
+        self.last = last
+        self.pid = os.getpid()
+
+    def take(self, max_seq_number=None):
+        """Get next number from the block or ``None`` when there is none left.
+
+        Block is not used in forked process, it would give same numbers as its parent.
+
+        :param max_seq_number: maximal possible value
+        """
+        if self.pid != os.getpid() or self.next > self.last:
+            return None
+        if max_seq_number and self.next > max_seq_number:
+            return None
+        sequence_number = self.next
+        self.next += 1
+        return sequence_number
+
+
 class SequencesService(BaseService):
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._blocks = {}
+        self._lock = threading.Lock()
+
     def get_next_sequence_number(
         self,
         key_name,
         max_seq_number=None,
-        min_seq_number=1
+        min_seq_number=1,
+        gapless=False
     ):
         """
         Generates Sequence Number
 
+        If ``SEQUENCE_BLOCK_SIZE`` is bigger than 1 numbers are reserved in blocks
+        and handed out locally, so numbers are unique but there might be gaps
+        and they are not ordered between processes.
+
         :param key: key to identify the sequence
         :param max_seq_num: default None, maximal possible value, None means no upper limit
         :param min_seq_num: default 1, init value, sequence will start from the NEXT one
+        :param gapless: default False, reserve numbers one by one even if block size is set,
+            also keys listed in ``SEQUENCE_GAPLESS_KEYS`` are always gapless
         :returns: sequence number
         """
         if not key_name:
             logger.error('Empty sequence key is used: {}'.format('\n'.join(traceback.format_stack())))
             raise KeyError('Sequence key cannot be empty')
 
+        block_size = app.config.get('SEQUENCE_BLOCK_SIZE', 1)
+        if gapless or block_size <= 1 or key_name in app.config.get('SEQUENCE_GAPLESS_KEYS', []):
+            return self._reserve(key_name, 1, max_seq_number, min_seq_number).take()
+
+        with self._lock:
+            block = self._blocks.get(key_name)
+            sequence_number = block.take(max_seq_number) if block else None
+            if sequence_number is None:
+                block = self._reserve(key_name, block_size, max_seq_number, min_seq_number)
+                self._blocks[key_name] = block
+                sequence_number = block.take()
+            return sequence_number
+
+    def release_blocks(self):
+        """Forget all reserved blocks, numbers not used yet are lost."""
+        with self._lock:
+            self._blocks.clear()
+
+    def _reserve(self, key_name, size, max_seq_number, min_seq_number):
+        """Reserve block of sequence numbers.
+
+        When the block would go over max number the sequence is restarted
+        from min number, only if it was not modified meanwhile.
+
+        :param key_name: key to identify the sequence
+        :param size: number of reserved numbers
+        :param max_seq_number: maximal possible value
+        :param min_seq_number: init value
+        """
         target_resource = get_resource_service('sequences')
-        sequence_number = target_resource.find_and_modify(
-            query={'key': key_name},
-            update={'$inc': {'sequence_number': 1}},
-            upsert=True,
-            new=True
-        ).get('sequence_number')
-
-        if max_seq_number:
-            if sequence_number > max_seq_number:
-                target_resource.find_and_modify(
-                    query={'key': key_name},
-                    update={'sequence_number': min_seq_number},
-                    upsert=True)
-
-                sequence_number = min_seq_number
+        while True:
+            reserved = target_resource.find_and_modify(
+                query={'key': key_name},
+                update={'$inc': {'sequence_number': size}},
+                upsert=True,
+                new=True
+            ).get('sequence_number')
+            first = reserved - size + 1
 
-        return sequence_number
+            if not max_seq_number or reserved <= max_seq_number:
+                return SequenceBlock(key_name, first, reserved)
+
+            if first <= max_seq_number:
+                return SequenceBlock(key_name, first, max_seq_number)
+
+            last = min(min_seq_number + size - 1, max_seq_number)
+            if target_resource.find_and_modify(
+                query={'key': key_name, 'sequence_number': reserved},
+                update={'$set': {'sequence_number': last}},
+            ):
+                return SequenceBlock(key_name, min_seq_number, last)
@@ -97,8 +97,15 @@ def update_config(conf):
     conf['LEGAL_ARCHIVE_MAX_POOL_SIZE'] = 1
     conf['PUBLISH_ASSOCIATED_ITEMS'] = True
 
+    # dbs are dropped between tests
+    conf['FIND_ONE_CACHE_RESOURCES'] = []
+    conf['VALIDATOR_CACHE_TTL'] = 0
+    conf['CONTENT_PROFILE_CACHE_TTL'] = 0
+    conf['AUDIT_BUFFER_SIZE'] = 0
+
     # misc
     conf['GEONAMES_USERNAME'] = 'superdesk_dev'
+    conf['FIND_ONE_SEARCH_CHECK_RATE'] = 1
     return conf
 
 
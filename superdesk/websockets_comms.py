@@ -10,11 +10,13 @@
 # at https://www.sourcefabric.org/superdesk/license
 
 
+import time
 import arrow
 import logging
 import asyncio
 import websockets
 import signal
+import urllib.parse
 
 from datetime import timedelta
 from threading import Thread
@@ -29,6 +31,63 @@ from flask import json
 
 logger = logging.getLogger(__name__)
 
+#: topics clients can subscribe to
+TOPICS = ('events', 'resources', 'desks', 'users')
+
+#: notification fields containing desk ids
+DESK_FIELDS = ('desks', 'desk', 'desk_id', 'from_desk', 'to_desk')
+
+
+def _topic_values(value):
+    if isinstance(value, dict):
+        value = value.keys()
+    elif not isinstance(value, (list, tuple, set)):
+        value = [value]
+    return {str(v) for v in value if v not in (None, '', 'None')}
+
+
+def get_topics(event, extra=None):
+    """Get topics of notification, used to find clients subscribed to it.
+
+    :param event: event name
+    :param extra: notification data
+    """
+    extra = extra or {}
+    topics = {
+        'events': [event],
+        'resources': [extra.get('resource') or event.split(':')[0]],
+    }
+    desks = set()
+    for field in DESK_FIELDS:
+        desks.update(_topic_values(extra.get(field)))
+    users = _topic_values(extra.get('user_id'))
+    for recipient in extra.get('_dest') or []:
+        if isinstance(recipient, dict):
+            users.update(_topic_values(recipient.get('user_id')))
+            desks.update(_topic_values(recipient.get('desk_id')))
+    if desks:
+        topics['desks'] = sorted(desks)
+    if users:
+        topics['users'] = sorted(users)
+    return topics
+
+
+def get_subscription(path):
+    """Get topics client subscribed to from connection url, like ``/?desks=a,b&events=item:lock``.
+
+    Client gets message if it's subscribed to any of message values of every topic it's
+    subscribed to, topics missing in message are ignored.
+
+    :param path: connection path with query
+    """
+    query = urllib.parse.parse_qs(urllib.parse.urlsplit(path).query)
+    subscription = {}
+    for topic in TOPICS:
+        values = {value for param in query.get(topic, []) for value in param.split(',') if value}
+        if values:
+            subscription[topic] = values
+    return subscription
+
 
 class SocketBrokerClient:
     """
@@ -152,15 +211,28 @@ class SocketMessageConsumer(SocketBrokerClient, ConsumerMixin):
 class SocketCommunication:
     """
     Responsible for websocket comms.
-    """
 
-    clients = set()
+    Every client gets a queue of messages with its own sender, so slow client
+    doesn't delay others. When client queue is full oldest message is dropped.
 
-    def __init__(self, host, port, broker_url, exchange_name=None):
+    :param host: host to listen on
+    :param port: port to listen on
+    :param broker_url: broker url
+    :param exchange_name: broker exchange name
+    :param queue_size: max number of messages queued per client
+    :param metrics_interval: seconds between metrics logs
+    """
+
+    def __init__(self, host, port, broker_url, exchange_name=None, queue_size=100, metrics_interval=60):
         self.host = host
         self.port = port
         self.broker_url = broker_url
         self.exchange_name = exchange_name
+        self.queue_size = queue_size
+        self.metrics_interval = metrics_interval
+        self.clients = {}
+        self.topic_clients = {topic: {} for topic in TOPICS}
+        self.topic_wildcards = {topic: set() for topic in TOPICS}
         self.messages = {}
         self.event_interval = {
             'ingest:update': 5,
@@ -168,6 +240,127 @@ class SocketCommunication:
             'content:expired': 5,
             'publish_queue:update': 5,
         }
+        self.metrics = {
+            'sent': 0,
+            'failed': 0,
+            'dropped': 0,
+            'send_seconds': 0.0,
+            'max_send_latency': 0.0,
+        }
+
+    def add_client(self, websocket, subscription=None):
+        """Register client and start sending it messages.
+
+        :param websocket: websocket protocol instance
+        :param subscription: dict of topic values client is interested in, see :func:`get_subscription`
+        """
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        sender = asyncio.ensure_future(self._client_sender(websocket, queue))
+        self.clients[websocket] = (queue, sender)
+        self._index_client(websocket, subscription or {}, add=True)
+
+    def remove_client(self, websocket, subscription=None):
+        """Stop sending messages to client.
+
+        :param websocket: websocket protocol instance
+        :param subscription: client subscription used with :meth:`add_client`
+        """
+        _, sender = self.clients.pop(websocket)
+        sender.cancel()
+        self._index_client(websocket, subscription or {}, add=False)
+
+    def _index_client(self, websocket, subscription, add):
+        for topic in TOPICS:
+            if subscription.get(topic):
+                clients = [self.topic_clients[topic].setdefault(value, set()) for value in subscription[topic]]
+            else:
+                clients = [self.topic_wildcards[topic]]
+            for topic_clients in clients:
+                if add:
+                    topic_clients.add(websocket)
+                else:
+                    topic_clients.discard(websocket)
+            if not add:
+                for value in subscription.get(topic, ()):
+                    if not self.topic_clients[topic].get(value):
+                        self.topic_clients[topic].pop(value, None)
+
+    def get_recipients(self, topics=None):
+        """Get clients subscribed to given message topics.
+
+        :param topics: message topics, see :func:`get_topics`, all clients if not set
+        """
+        if not topics:
+            return self.clients.keys()
+        recipients = None
+        for topic in TOPICS:
+            if not topics.get(topic):
+                continue
+            clients = set(self.topic_wildcards[topic])
+            for value in topics[topic]:
+                clients.update(self.topic_clients[topic].get(value, ()))
+            recipients = clients if recipients is None else recipients & clients
+            if not recipients:
+                break
+        return self.clients.keys() if recipients is None else recipients
+
+    def _enqueue(self, queue, message):
+        if queue.full():
+            queue.get_nowait()
+            queue.task_done()
+            self.metrics['dropped'] += 1
+        queue.put_nowait((time.time(), message))
+
+    @asyncio.coroutine
+    def _client_sender(self, websocket, queue):
+        """Send queued messages to client.
+
+        :param websocket: websocket protocol instance
+        :param queue: client queue
+        """
+        while True:
+            queued, message = yield from queue.get()
+            try:
+                if websocket.open:
+                    yield from websocket.send(message)
+                    self._record_send(time.time() - queued)
+            except asyncio.CancelledError:
+                raise
+            except Exception as error:
+                self.metrics['failed'] += 1
+                logger.info('failed to send message to client: %s', error)
+            finally:
+                queue.task_done()
+
+    def _record_send(self, latency):
+        self.metrics['sent'] += 1
+        self.metrics['send_seconds'] += latency
+        self.metrics['max_send_latency'] = max(self.metrics['max_send_latency'], latency)
+
+    def get_metrics(self):
+        """Get delivery metrics since server start.
+
+        ``send_seconds`` and ``max_send_latency`` are measured from message being queued.
+        """
+        depths = [queue.qsize() for queue, _ in self.clients.values()]
+        return dict(self.metrics, clients=len(depths), queued=sum(depths), max_queue_depth=max(depths, default=0))
+
+    @asyncio.coroutine
+    def _metrics_loop(self):
+        """Log metrics every `metrics_interval` seconds, as warning if messages were dropped."""
+        dropped = 0
+        while True:
+            yield from asyncio.sleep(self.metrics_interval)
+            metrics = self.get_metrics()
+            log = logger.warning if metrics['dropped'] > dropped else logger.info
+            log('websocket metrics %s', ' '.join('{}={}'.format(key, metrics[key]) for key in sorted(metrics)))
+            dropped = metrics['dropped']
+
+    @asyncio.coroutine
+    def drain(self):
+        """Wait until all queued messages are sent."""
+        for queue, _ in list(self.clients.values()):
+            yield from queue.join()
 
     @asyncio.coroutine
     def _client_loop(self, websocket):
@@ -181,24 +374,47 @@ class SocketCommunication:
         :param websocket: websocket protocol instance
         """
         pings = 0
+        queue, _ = self.clients[websocket]
         while True:
             yield from asyncio.sleep(5)
             if not websocket.open:
                 break
             pings += 1
-            yield from websocket.send(json.dumps({'ping': pings, 'clients': len(websocket.ws_server.websockets)}))
+            self._enqueue(queue, json.dumps({'ping': pings, 'clients': len(websocket.ws_server.websockets)}))
 
     @asyncio.coroutine
     def broadcast(self, message):
         """Broadcast message to all clients.
 
+        :param message: message as it was received - no encoding/decoding.
+        """
+        self.broadcast_nowait(message)
+
+    def broadcast_nowait(self, message):
+        """Queue message for all clients.
+
         If event is in `event_interval` it will only send such event every x seconds.
 
+        Only the envelope is decoded, once per message. Batch messages are split
+        and every message in batch is sent as it was received, without decoding it.
+
+        Messages are only sent to clients subscribed to its topics.
+
         :param message: message as it was received - no encoding/decoding.
         """
         message_data = json.loads(message)
-        message_id = message_data.get('event', '')
-        message_created = arrow.get(message_data.get('_created', utcnow()))
+        if message_data.get('event') == 'batch':
+            for batch_message in message_data.get('messages', []):
+                self._broadcast(batch_message.get('message'),
+                                batch_message.get('event', ''),
+                                batch_message.get('_created'),
+                                batch_message.get('topics'))
+        else:
+            self._broadcast(message, message_data.get('event', ''), message_data.get('_created'),
+                            get_topics(message_data.get('event', ''), message_data.get('extra')))
+
+    def _broadcast(self, message, message_id, created, topics=None):
+        message_created = arrow.get(created or utcnow())
         last_created = self.messages.get(message_id)
         ttl = self.event_interval.get(message_id, 0)
 
@@ -210,12 +426,8 @@ class SocketCommunication:
             self.messages[message_id] = message_created
 
         logger.debug('broadcast %s' % message)
-        for websocket in self.clients.copy():
-            try:
-                if websocket.open:
-                    yield from websocket.send(message)
-            except Exception:
-                yield
+        for websocket in self.get_recipients(topics):
+            self._enqueue(self.clients[websocket][0], message)
 
     @asyncio.coroutine
     def _server_loop(self, websocket):
@@ -252,9 +464,12 @@ class SocketCommunication:
             self._log('server done', websocket)
         else:
             self._log('client open', websocket)
-            self.clients.add(websocket)
-            yield from self._client_loop(websocket)
-            self.clients.remove(websocket)
+            subscription = get_subscription(path)
+            self.add_client(websocket, subscription)
+            try:
+                yield from self._client_loop(websocket)
+            finally:
+                self.remove_client(websocket, subscription)
             self._log('client done', websocket)
 
     def run_server(self):
@@ -268,9 +483,16 @@ class SocketCommunication:
                                                               self.host, self.port))
             loop.add_signal_handler(signal.SIGTERM, loop.stop)
             logger.info('listening on %s:%s' % (self.host, self.port))
+            asyncio.ensure_future(self._metrics_loop())
+
+            @asyncio.coroutine
+            def broadcast(message):
+                # consumer runs in other thread, queues must be used from server loop
+                loop.call_soon_threadsafe(self.broadcast_nowait, message)
+
             consumer = None
             # create socket message consumer
-            consumer = SocketMessageConsumer(self.broker_url, self.broadcast, self.exchange_name)
+            consumer = SocketMessageConsumer(self.broker_url, broadcast, self.exchange_name)
             consumer_thread = Thread(target=consumer.run)
             consumer_thread.start()
             loop.run_forever()
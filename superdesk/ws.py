@@ -27,7 +27,9 @@ def create_server(config):
         port = int(config['WS_PORT'])
         broker_url = config['BROKER_URL']
         exchange_name = config.get('WEBSOCKET_EXCHANGE')
-        comms = SocketCommunication(host, port, broker_url, exchange_name)
+        comms = SocketCommunication(host, port, broker_url, exchange_name,
+                                    queue_size=int(config.get('WS_CLIENT_QUEUE_SIZE', 100)),
+                                    metrics_interval=int(config.get('WS_METRICS_INTERVAL', 60)))
         comms.run_server()
     except Exception:
         logger.exception('Failed to start the WebSocket server.')
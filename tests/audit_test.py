@@ -0,0 +1,114 @@
+import os
+import flask
+import shutil
+import tempfile
+import unittest
+
+from bson import ObjectId
+from unittest import mock
+from superdesk import get_resource_service
+from superdesk.tests import TestCase
+from superdesk.audit.buffer import AuditBuffer, audit_buffer
+
+
+class AuditBufferTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.spool_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.spool_dir)
+
+    def get_buffer(self, write, size=10, batch_size=10, spool_dir=None):
+        buffer = AuditBuffer()
+        buffer.configure(write, size, batch_size, 60, spool_dir)
+        buffer._pid = os.getpid()  # no background thread
+        return buffer
+
+    def test_flush_in_batches(self):
+        batches = []
+        buffer = self.get_buffer(batches.append, batch_size=3)
+        for i in range(7):
+            self.assertTrue(buffer.put({'_id': i}))
+        buffer.flush()
+        self.assertEqual([3, 3, 1], [len(batch) for batch in batches])
+        self.assertEqual(0, len(buffer))
+
+    def test_put_when_full(self):
+        buffer = self.get_buffer(mock.Mock(), size=2)
+        self.assertTrue(buffer.put({'_id': 1}))
+        self.assertTrue(buffer.put({'_id': 2}))
+        self.assertFalse(buffer.put({'_id': 3}))
+
+    def test_failed_records_are_logged(self):
+        buffer = self.get_buffer(mock.Mock(side_effect=ValueError))
+        buffer.put({'_id': 1})
+        with mock.patch('superdesk.audit.buffer.logger') as logger:
+            buffer.flush()
+        self.assertEqual(1, logger.error.call_count)
+        self.assertIn('"_id": 1', logger.error.call_args[0][1])
+
+    def test_spool_is_removed_when_written(self):
+        batches = []
+        buffer = self.get_buffer(batches.append, spool_dir=self.spool_dir)
+        buffer.put({'_id': ObjectId()})
+        self.assertEqual(1, len(os.listdir(self.spool_dir)))
+        buffer.flush()
+        self.assertEqual(1, len(batches))
+        self.assertEqual([], os.listdir(self.spool_dir))
+
+    def test_replay_spool_of_crashed_process(self):
+        _id = ObjectId()
+        crashed = self.get_buffer(mock.Mock(), spool_dir=self.spool_dir)
+        crashed.put({'_id': _id})
+        crashed.put({'_id': ObjectId()})
+
+        batches = []
+        buffer = self.get_buffer(batches.append, spool_dir=self.spool_dir)
+        buffer.replay()
+        self.assertEqual([], batches, 'spool is locked by running process')
+
+        crashed._spool.close()  # lock is released when process dies
+        buffer.replay()
+        self.assertEqual(1, len(batches))
+        self.assertEqual(_id, batches[0][0]['_id'])
+        self.assertEqual([], os.listdir(self.spool_dir))
+
+    def test_spool_is_kept_when_write_fails(self):
+        buffer = self.get_buffer(mock.Mock(side_effect=ValueError), spool_dir=self.spool_dir)
+        buffer.put({'_id': ObjectId()})
+        buffer.flush()
+        self.assertEqual(1, len(os.listdir(self.spool_dir)))
+
+        batches = []
+        self.get_buffer(batches.append, spool_dir=self.spool_dir).replay()
+        self.assertEqual(1, len(batches))
+        self.assertEqual([], os.listdir(self.spool_dir))
+
+
+class AuditServiceTestCase(TestCase):
+
+    def test_buffered_audit(self):
+        service = get_resource_service('audit')
+        spool_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, spool_dir)
+        config = {'AUDIT_BUFFER_SIZE': 10, 'AUDIT_FLUSH_INTERVAL': 60, 'AUDIT_STORE_DIFF': True,
+                  'AUDIT_SPOOL_DIR': spool_dir}
+        with mock.patch.dict(self.app.config, config):
+            with self.app.app_context():
+                flask.g.user = {'_id': 'foo'}
+                doc = {'_id': 'bar', 'headline': 'foo'}
+                service.on_generic_updated('archive', doc, {'_id': 'bar', 'headline': 'bar', 'slugline': 'x'})
+                doc['headline'] = 'changed'
+                self.assertEqual(0, service.find({}).count())
+                audit_buffer.flush()
+        audit = list(service.find({}))
+        self.assertEqual(1, len(audit))
+        self.assertEqual({'_id': 'bar', 'headline': 'foo'}, audit[0]['extra'])
+        self.assertIsNotNone(audit[0]['_created'])
+        self.assertEqual([], os.listdir(spool_dir))
+
+    def test_write_records_skips_saved(self):
+        service = get_resource_service('audit')
+        records = [{'_id': ObjectId(), 'resource': 'archive'}, {'_id': ObjectId(), 'resource': 'archive'}]
+        service.post([dict(records[0])])
+        service._write_records(self.app, records)
+        self.assertEqual(2, service.find({}).count())
@@ -8,8 +8,10 @@
 # AUTHORS and LICENSE files distributed with this source code, or
 # at https://www.sourcefabric.org/superdesk/license
 
+from unittest.mock import patch
 from superdesk.tests import TestCase
 from superdesk import get_backend
+from superdesk.cache import resource_cache
 from superdesk.utc import utcnow
 from datetime import timedelta
 
@@ -55,3 +57,87 @@ class BackendTestCase(TestCase):
             date1 = doc_old[self.app.config['DATE_CREATED']]
             date2 = doc_new[self.app.config['DATE_CREATED']]
             self.assertEqual(date1, date2)
+
+    def test_find_one_cache(self):
+        backend = get_backend()
+        with patch.dict(self.app.config, {'FIND_ONE_CACHE_RESOURCES': ['ingest']}):
+            with self.app.app_context():
+                ids = backend.create('ingest', [{'name': 'foo'}])
+                doc = backend.find_one('ingest', None, _id=ids[0])
+                with patch.object(backend, '_backend') as mongo:
+                    cached = backend.find_one('ingest', None, _id=ids[0])
+                    self.assertEqual('foo', cached['name'])
+                    self.assertFalse(mongo.called)
+
+                    cached = backend.find_one('ingest', None, _id=ids[0], _etag=doc['_etag'])
+                    self.assertEqual('foo', cached['name'])
+                    self.assertFalse(mongo.called)
+
+                    mongo.return_value.find_one.return_value = None
+                    self.assertIsNone(backend.find_one('ingest', None, _id=ids[0], _etag='other'))
+                    self.assertTrue(mongo.called)
+
+                backend.update('ingest', ids[0], {'name': 'bar'}, doc)
+                self.assertEqual('bar', backend.find_one('ingest', None, _id=ids[0])['name'])
+
+                backend.delete('ingest', {'_id': ids[0]})
+                self.assertIsNone(backend.find_one('ingest', None, _id=ids[0]))
+
+    def test_find_one_cache_stale_item(self):
+        backend = get_backend()
+        with patch.dict(self.app.config, {'FIND_ONE_CACHE_RESOURCES': ['ingest']}):
+            with self.app.app_context():
+                ids = backend.create('ingest', [{'name': 'foo'}])
+                stale = backend.find_one('ingest', None, _id=ids[0])
+                backend.update('ingest', ids[0], {'name': 'bar'}, stale)
+                backend._cache_item('ingest', ids[0], stale)  # read before update, saved after it
+                self.assertIsNone(resource_cache.load('ingest', ids[0]))
+                self.assertEqual('bar', backend.find_one('ingest', None, _id=ids[0])['name'])
+
+    def test_find_one_cache_stale_item_after_system_update(self):
+        backend = get_backend()
+        with patch.dict(self.app.config, {'FIND_ONE_CACHE_RESOURCES': ['ingest']}):
+            with self.app.app_context():
+                ids = backend.create('ingest', [{'name': 'foo'}])
+                stale = backend.find_one('ingest', None, _id=ids[0])
+                backend.system_update('ingest', ids[0], {'name': 'bar'}, stale)
+                backend._cache_item('ingest', ids[0], stale)
+                self.assertIsNone(resource_cache.load('ingest', ids[0]))
+                self.assertEqual('bar', backend.find_one('ingest', None, _id=ids[0])['name'])
+
+    def test_find_and_modify_invalidates_cache(self):
+        backend = get_backend()
+        with patch.dict(self.app.config, {'FIND_ONE_CACHE_RESOURCES': ['ingest']}):
+            with self.app.app_context():
+                ids = backend.create('ingest', [{'name': 'foo'}])
+                backend.find_one('ingest', None, _id=ids[0])
+                backend.find_and_modify('ingest', query={'_id': ids[0]}, update={'$set': {'name': 'bar'}})
+                self.assertIsNone(resource_cache.load('ingest', ids[0]))
+                self.assertEqual('bar', backend.find_one('ingest', None, _id=ids[0])['name'])
+
+    def test_find_one_search_check_sampling(self):
+        backend = get_backend()
+        with self.app.app_context():
+            ids = backend.create('ingest', [{'name': 'foo'}])
+            with patch.object(backend, '_search_check') as search_check:
+                with patch.dict(self.app.config, {'FIND_ONE_SEARCH_CHECK_RATE': 0}):
+                    backend.find_one('ingest', None, _id=ids[0])
+                    self.assertFalse(search_check.called)
+                with patch.dict(self.app.config, {'FIND_ONE_SEARCH_CHECK_RATE': 1}):
+                    backend.find_one('ingest', None, _id=ids[0])
+                    self.assertTrue(search_check.called)
+
+    def test_find_one_search_check_in_background(self):
+        backend = get_backend()
+        with self.app.app_context():
+            ids = backend.create('ingest', [{'name': 'foo'}])
+            with patch.object(backend, '_search_check') as search_check, \
+                    patch('superdesk.eve_backend.search_check_executor') as executor, \
+                    patch('superdesk.eve_backend.random.random', return_value=0), \
+                    patch.dict(self.app.config, {'FIND_ONE_SEARCH_CHECK_RATE': 0.5}):
+                item = backend.find_one('ingest', None, _id=ids[0])
+                self.assertFalse(search_check.called)
+                executor.submit.call_args[0][0]()
+            checked = search_check.call_args[0][3]
+            self.assertEqual(item, checked)
+            self.assertIsNot(item, checked)
@@ -1,9 +1,12 @@
 
+import json
 import random
 from time import sleep
+from unittest.mock import patch
 
-from superdesk.cache import cache
+from superdesk.cache import cache, resource_cache, LocalCache
 from superdesk.tests import TestCase
+from superdesk.utc import utcnow
 from bson import ObjectId
 
 
@@ -60,3 +63,62 @@ class CacheTestCase(TestCase):
 
         users = get_users()
         self.assertEqual(users, get_users())
+
+
+class LocalCacheTestCase(TestCase):
+
+    def test_lru(self):
+        local = LocalCache(2, 60)
+        local.set('a', 1)
+        local.set('b', 2)
+        self.assertEqual(1, local.get('a'))
+        local.set('c', 3)
+        self.assertIsNone(local.get('b'))
+        self.assertEqual(1, local.get('a'))
+        self.assertEqual(3, local.get('c'))
+
+    def test_ttl(self):
+        local = LocalCache(2, 0)
+        local.set('a', 1)
+        sleep(0.01)
+        self.assertIsNone(local.get('a'))
+        self.assertEqual(0, len(local))
+        local.set('b', 2, ttl=60)
+        sleep(0.01)
+        self.assertEqual(2, local.get('b'))
+
+
+class ResourceCacheTestCase(TestCase):
+
+    def test_invalidate(self):
+        _id = ObjectId()
+        with patch.dict(self.app.config, {'FIND_ONE_CACHE_RESOURCES': ['desks']}):
+            self.assertTrue(resource_cache.is_cached('desks'))
+            self.assertFalse(resource_cache.is_cached('archive'))
+            resource_cache.save('desks', _id, {'_id': _id, 'name': 'sports'})
+            self.assertEqual('sports', resource_cache.load('desks', _id)['name'])
+
+            with patch.object(resource_cache, '_get_producer') as get_producer:
+                resource_cache.invalidate('desks', [_id])
+                self.assertIsNone(resource_cache.load('desks', _id))
+                message = json.loads(get_producer.return_value.send.call_args[0][0])
+                self.assertEqual({'resource': 'desks', 'ids': [str(_id)]},
+                                 {'resource': message['resource'], 'ids': message['ids']})
+
+    def test_types_are_kept(self):
+        _id = ObjectId()
+        profile = str(ObjectId())
+        now = utcnow().replace(microsecond=0)
+        resource_cache.save('desks', _id, {'_id': _id, 'default_content_profile': profile, 'created': now})
+        resource_cache.local.clear()
+        item = resource_cache.load('desks', _id)
+        self.assertEqual(_id, item['_id'])
+        self.assertEqual(profile, item['default_content_profile'])
+        self.assertIsInstance(item['default_content_profile'], str)
+        self.assertEqual(now, item['created'])
+
+    def test_loaded_item_is_copy(self):
+        _id = ObjectId()
+        resource_cache.save('desks', _id, {'_id': _id, 'name': 'sports'})
+        resource_cache.load('desks', _id)['name'] = 'news'
+        self.assertEqual('sports', resource_cache.load('desks', _id)['name'])
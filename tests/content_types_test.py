@@ -43,6 +43,22 @@ class ContentTypesTestCase(TestCase):
         item = {'headline': 'foo', 'slugline': 'bar', 'guid': '1', 'profile': 'test'}
         self.assertEqual({'headline': 'foo', 'guid': '1', 'profile': 'test'}, apply_schema(item))
 
+    def test_apply_schema_profile_cache(self):
+        service = MockService()
+        content_types.clear_schema_cache()
+        item = {'headline': 'foo', 'slugline': 'bar', 'guid': '1', 'profile': 'test'}
+        with mock.patch.dict(self.app.config, {'CONTENT_PROFILE_CACHE_TTL': 60}), \
+                mock.patch.object(content_types, 'get_resource_service', return_value=service), \
+                mock.patch.object(service, 'find_one', wraps=service.find_one) as find_one:
+            for i in range(5):
+                self.assertEqual({'headline': 'foo', 'guid': '1', 'profile': 'test'}, apply_schema(item))
+            self.assertEqual(1, find_one.call_count)
+
+            self.app.on_updated_content_types({}, {})
+            apply_schema(item)
+            self.assertEqual(2, find_one.call_count)
+        content_types.clear_schema_cache()
+
     @mock.patch.object(content_types, 'get_fields_map_and_names', lambda: ({}, {}))
     def test_minlength(self):
         """Check that minlength is not modified when it is set
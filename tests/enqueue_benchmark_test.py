@@ -0,0 +1,97 @@
+
+import time
+import logging
+
+from unittest.mock import patch
+from superdesk import get_resource_service
+from superdesk.tests import TestCase
+from apps.publish.enqueue import get_enqueue_service
+
+logger = logging.getLogger(__name__)
+
+SUBSCRIBERS = 500
+PRODUCTS = 2000
+FILTERS = 20
+PRODUCTS_PER_SUBSCRIBER = 20
+
+
+class FilterSubscribersBenchmarkTestCase(TestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.app.data.insert('filter_conditions', [
+            {'_id': i, 'name': 'fc-%d' % i, 'field': 'urgency', 'operator': 'in', 'value': str(i % 5 + 1)}
+            for i in range(FILTERS)
+        ])
+
+        self.app.data.insert('content_filters', [
+            {'_id': i, 'name': 'cf-%d' % i, 'is_global': False, 'content_filter': [{'expression': {'fc': [i]}}]}
+            for i in range(FILTERS)
+        ])
+
+        product_ids = self.app.data.insert('products', [
+            {
+                'name': 'product-%d' % i,
+                'codes': 'p%d' % i,
+                'content_filter': {'filter_id': i % FILTERS, 'filter_type': 'permitting'},
+                'geo_restrictions': 'QLD' if i % 2 else None,
+            }
+            for i in range(PRODUCTS)
+        ])
+
+        self.app.data.insert('subscribers', [
+            {
+                'name': 'subscriber-%d' % i,
+                'subscriber_type': 'wire',
+                'is_active': True,
+                'products': [product_ids[(i * PRODUCTS_PER_SUBSCRIBER + j) % PRODUCTS]
+                             for j in range(PRODUCTS_PER_SUBSCRIBER)],
+            }
+            for i in range(SUBSCRIBERS)
+        ])
+
+    def filter_subscribers_per_product(self, service, doc, subscribers):
+        """Test every product of every subscriber, like it was done before products were indexed."""
+        existing_products = {p['_id']: p for p in get_resource_service('products').get(req=None, lookup=None)}
+        matcher = service._get_filter_matcher(doc)
+        subscriber_codes = {}
+        for subscriber in subscribers:
+            codes = []
+            for product_id in subscriber.get('products') or []:
+                product = existing_products.get(product_id)
+                if product and service.conforms_product_targets(product, doc) and \
+                        service.conforms_content_filter(product, doc, matcher):
+                    codes.extend(service._get_codes(product))
+            if codes:
+                subscriber_codes[subscriber['_id']] = list(set(codes))
+        return subscriber_codes
+
+    def test_filter_subscribers(self):
+        service = get_enqueue_service('publish')
+        subscribers = list(self.app.data.find_all('subscribers'))
+        doc = {'_id': 'foo', 'type': 'text', 'urgency': 3, 'headline': 'foo'}
+
+        with patch.object(service, 'conforms_content_filter', wraps=service.conforms_content_filter) as conforms:
+            start = time.time()
+            filtered, codes = service.filter_subscribers(doc, subscribers, 'wire')
+            elapsed = time.time() - start
+
+        # every distinct filter and geo restriction is tested once
+        self.assertLessEqual(conforms.call_count, FILTERS)
+        self.assertEqual(SUBSCRIBERS, len(filtered))
+        self.assertEqual(SUBSCRIBERS, len(codes))
+        self.assertTrue(all(codes.values()))
+        logger.info('filter_subscribers for %d subscribers and %d products took %.3fs',
+                    SUBSCRIBERS, PRODUCTS, elapsed)
+
+        with patch.object(service, 'conforms_content_filter', wraps=service.conforms_content_filter) as conforms:
+            start = time.time()
+            expected_codes = self.filter_subscribers_per_product(service, doc, subscribers)
+            elapsed_per_product = time.time() - start
+
+        self.assertEqual(SUBSCRIBERS * PRODUCTS_PER_SUBSCRIBER, conforms.call_count)
+        self.assertEqual({key: sorted(value) for key, value in expected_codes.items()},
+                         {key: sorted(value) for key, value in codes.items()})
+        logger.info('testing every product of every subscriber took %.3fs, indexed products are %.1fx faster',
+                    elapsed_per_product, elapsed_per_product / max(elapsed, 1e-6))
@@ -0,0 +1,64 @@
+# -*- coding: utf-8; -*-
+#
+# This file is part of Superdesk.
+#
+# Copyright 2013 - 2018 Sourcefabric z.u. and contributors.
+#
+# For the full copyright and license information, please see the
+# AUTHORS and LICENSE files distributed with this source code, or
+# at https://www.sourcefabric.org/superdesk/license
+
+from unittest.mock import patch
+from superdesk.tests import TestCase
+from superdesk.commands.index_from_mongo import IndexFromMongo
+
+
+class IndexFromMongoTestCase(TestCase):
+
+    def setUp(self):
+        self.items = [{'_id': 'item-%02d' % i, 'headline': 'test %d' % i, 'type': 'text'} for i in range(20)]
+        self.app.data.insert('ingest', self.items)
+        self.checkpoints = self.app.data.get_mongo_collection('ingest').database[IndexFromMongo.checkpoints_collection]
+
+    def test_get_shards(self):
+        shards = IndexFromMongo.get_shards('ingest', 4)
+        self.assertEqual(4, len(shards))
+        self.assertIsNone(shards[0]['start'])
+        self.assertEqual(['item-05', 'item-10', 'item-15'], [shard['start'] for shard in shards[1:]])
+        self.assertEqual([shard['start'] for shard in shards[1:]], [shard['end'] for shard in shards[:-1]])
+        self.assertIsNone(shards[-1]['end'])
+
+    def test_get_bulks(self):
+        bulks = list(IndexFromMongo.get_bulks(self.items, bulk_bytes=200))
+        self.assertEqual(self.items, [item for bulk in bulks for item in bulk])
+        self.assertGreater(len(bulks), 1)
+
+    def test_copy_resource_in_shards(self):
+        with patch.object(IndexFromMongo, 'bulk_insert', side_effect=lambda resource, items: len(items)) as insert:
+            IndexFromMongo.copy_resource('ingest', 3, workers=4)
+        indexed = sorted(item['_id'] for call in insert.call_args_list for item in call[0][1])
+        self.assertEqual([item['_id'] for item in self.items], indexed)
+
+        checkpoint = self.checkpoints.find_one({'_id': 'ingest'})
+        self.assertTrue(all(shard['done'] for shard in checkpoint['shards']))
+        self.assertEqual(20, sum(shard['count'] for shard in checkpoint['shards']))
+
+    def test_resume(self):
+        def fail_on_second_bulk(resource, items):
+            if insert.call_count == 2:
+                raise ValueError('elastic is down')
+            return len(items)
+
+        with patch.object(IndexFromMongo, 'bulk_insert', side_effect=fail_on_second_bulk) as insert:
+            with patch.object(IndexFromMongo, 'pending_bulks', 1):
+                with self.assertRaises(ValueError):
+                    IndexFromMongo.copy_resource('ingest', 5, bulk_bytes=1)
+
+        checkpoint = self.checkpoints.find_one({'_id': 'ingest'})
+        self.assertEqual('item-00', checkpoint['shards'][0]['last_id'])
+        self.assertFalse(checkpoint['shards'][0]['done'])
+
+        with patch.object(IndexFromMongo, 'bulk_insert', side_effect=lambda resource, items: len(items)) as insert:
+            IndexFromMongo.copy_resource('ingest', 5, resume=True)
+        indexed = [item['_id'] for call in insert.call_args_list for item in call[0][1]]
+        self.assertEqual([item['_id'] for item in self.items[1:]], indexed)
@@ -403,3 +403,48 @@ class FTPTestCase(TestCase):
         )
 
         self.assertEqual(mock_ftp.rename.call_count, 16)
+
+    @mock.patch.object(ftp, 'ftp_connect', new_callable=FakeFTP)
+    @mock.patch.object(ftp.FTPFeedingService, 'get_feed_parser', FakeFeedParser())
+    @mock.patch.object(ftp.FTPFeedingService, '_retrieve_and_parse_in_memory')
+    def test_retrieve_in_parallel(self, retrieve_and_parse, ftp_connect):
+        """Test that files retrieved in parallel are processed in modify order"""
+        def retrieve(config, filename, provider, registered_parser):
+            if filename == 'filename_2.xml':
+                raise Exception('Test exception')
+            return [[{'guid': filename}]]
+
+        retrieve_and_parse.side_effect = retrieve
+        self.app.config['FTP_INGEST_WORKERS'] = 4
+        update = {}
+        provider = copy.deepcopy(PROVIDER)
+        service = ftp.FTPFeedingService()
+        items = service._update(provider, update)
+        mock_ftp = ftp_connect.return_value.__enter__.return_value
+
+        self.assertEqual(len(FakeFTP.files), retrieve_and_parse.call_count)
+        self.assertEqual([[{'guid': f[0]}] for f in FakeFTP.files if f[0] != 'filename_2.xml'], items)
+        self.assertEqual(
+            update['private']['last_processed_file_modify'],
+            datetime.datetime.strptime('20170517164756', '%Y%m%d%H%M%S').replace(tzinfo=utc)
+        )
+        self.assertEqual(
+            [call[0][1] for call in mock_ftp.rename.call_args_list],
+            ['error/{}'.format(f[0]) if f[0] == 'filename_2.xml' else 'dest_move/{}'.format(f[0])
+             for f in FakeFTP.files]
+        )
+
+    @mock.patch.object(ftp, 'ftp_connect', new_callable=FakeFTP)
+    def test_retrieve_and_parse_in_memory(self, ftp_connect):
+        mock_ftp = ftp_connect.return_value.__enter__.return_value
+        mock_ftp.retrbinary.side_effect = lambda cmd, callback: callback(b'<nitf><head/></nitf>')
+        parser = mock.Mock(spec=ftp.XMLFeedParser)
+        parser.parse.return_value = {'guid': 'foo'}
+        service = ftp.FTPFeedingService()
+
+        with mock.patch.object(service, 'get_feed_parser', return_value=parser):
+            items = service._retrieve_and_parse_in_memory(PROVIDER['config'], 'foo.xml', PROVIDER, parser)
+
+        self.assertEqual([[{'guid': 'foo'}]], items)
+        ftp_connect.assert_called_once_with(PROVIDER['config'], pooled=True)
+        self.assertEqual('nitf', parser.parse.call_args[0][0].tag)
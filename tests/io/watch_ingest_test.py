@@ -0,0 +1,87 @@
+# -*- coding: utf-8; -*-
+#
+# This file is part of Superdesk.
+#
+# Copyright 2013 - 2018 Sourcefabric z.u. and contributors.
+#
+# For the full copyright and license information, please see the
+# AUTHORS and LICENSE files distributed with this source code, or
+# at https://www.sourcefabric.org/superdesk/license
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from unittest import mock
+from superdesk.io import inotify
+from superdesk.io.commands.watch_ingest import IngestWatchQueue
+from superdesk.io.feeding_services.file_service import FileFeedingService
+
+
+class IngestWatchQueueTestCase(unittest.TestCase):
+
+    def test_files_are_merged(self):
+        watch_queue = IngestWatchQueue(10, 10)
+        watch_queue.put('foo', 'b.xml')
+        watch_queue.put('bar', 'c.xml')
+        watch_queue.put('foo', 'a.xml')
+        watch_queue.put('foo', 'a.xml')
+        self.assertEqual(('foo', ['a.xml', 'b.xml']), watch_queue.get())
+        self.assertEqual(('bar', ['c.xml']), watch_queue.get())
+
+    def test_full_update(self):
+        watch_queue = IngestWatchQueue(10, 2)
+        for filename in ('a.xml', 'b.xml', 'c.xml'):
+            watch_queue.put('foo', filename)
+        watch_queue.put('bar', 'a.xml')
+        watch_queue.put('bar')
+        watch_queue.put('bar', 'b.xml')
+        self.assertEqual(('foo', None), watch_queue.get())
+        self.assertEqual(('bar', None), watch_queue.get())
+
+    def test_queue_is_bounded(self):
+        watch_queue = IngestWatchQueue(1, 10)
+        watch_queue.put('foo', 'a.xml')
+        watch_queue.put('bar', 'a.xml')
+        self.assertEqual(('foo', ['a.xml']), watch_queue.get())
+        watch_queue.put('bar', 'b.xml')
+        self.assertEqual(('bar', ['b.xml']), watch_queue.get())
+
+
+@unittest.skipUnless(inotify.is_available(), 'inotify is not available')
+class InotifyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.path)
+
+    def test_completed_files(self):
+        with inotify.Inotify() as watcher:
+            wd = watcher.add_watch(self.path)
+            with open(os.path.join(self.path, 'a.xml'), 'w') as f:
+                f.write('foo')
+            os.mkdir(os.path.join(self.path, '_PROCESSED'))
+            with open(os.path.join(self.path, '_PROCESSED', 'b.xml'), 'w') as f:
+                f.write('foo')
+            os.rename(os.path.join(self.path, '_PROCESSED', 'b.xml'), os.path.join(self.path, 'b.xml'))
+            events = watcher.read(timeout=1)
+        self.assertEqual([(wd, inotify.IN_CLOSE_WRITE, 'a.xml'), (wd, inotify.IN_MOVED_TO, 'b.xml')], events)
+
+
+class FileUpdateFilesTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.path)
+        for filename in ('a.xml', 'b.xml', 'c.xml'):
+            with open(os.path.join(self.path, filename), 'w') as f:
+                f.write('foo')
+
+    @mock.patch('superdesk.io.feeding_services.file_service.push_notification')
+    def test_only_given_files_are_ingested(self, push_notification):
+        service = FileFeedingService()
+        provider = {'name': 'test', 'config': {'path': self.path}}
+        with mock.patch.object(service, '_ingest_files', return_value=iter([])) as ingest_files:
+            list(service.update_files(provider, {}, ['c.xml', 'a.xml', 'missing.xml']))
+        ingest_files.assert_called_once_with(provider, ['a.xml', 'c.xml'])
@@ -15,7 +15,8 @@ from superdesk.tests import TestCase
 from superdesk.media.crop import CropService
 from superdesk.errors import SuperdeskApiError
 from superdesk.media.media_operations import crop_image
-from superdesk.media.renditions import _resize_image, get_renditions_spec, can_generate_custom_crop_from_original
+from superdesk.media.renditions import _resize_image, get_renditions_spec, can_generate_custom_crop_from_original, \
+    generate_renditions
 from apps.prepopulate.app_populate import populate_table_json
 
 from ..media import get_picture_fixture
@@ -171,6 +172,29 @@ class CropTestCase(TestCase):
             resized, width, height = _resize_image(imgfile, ('200', None), 'jpeg')
             self.assertEqual(150, height)
 
+    def test_generate_renditions(self):
+        img = get_picture_fixture()
+        spec = {
+            'thumbnail': {'width': 100},
+            'wide': {'ratio': '16:9'},
+            'baseImage': {'width': 200, 'height': 200},
+        }
+        inserted = []
+        with open(img, 'rb') as imgfile:
+            renditions = generate_renditions(imgfile, 'original', inserted, 'image', 'image/jpeg',
+                                             spec, self.app.media.url_for_media)
+
+        self.assertEqual(3, len(inserted))
+        self.assertEqual(['original', 'baseImage', 'thumbnail', 'wide'], list(renditions.keys()))
+        self.assertEqual((200, 150), (renditions['baseImage']['width'], renditions['baseImage']['height']))
+        self.assertEqual((100, 75), (renditions['thumbnail']['width'], renditions['thumbnail']['height']))
+        # crops are generated from baseImage
+        self.assertEqual((200, 112), (renditions['wide']['width'], renditions['wide']['height']))
+        self.assertEqual(19, renditions['wide']['CropTop'])
+        for rendition in ('baseImage', 'thumbnail', 'wide'):
+            self.assertEqual('image/jpeg', renditions[rendition]['mimetype'])
+            self.assertIsNotNone(self.app.media.get(renditions[rendition]['media']))
+
     def test_get_rendition_spec_no_custom_crop(self):
         renditions = get_renditions_spec(no_custom_crops=True)
         for crop in self.crop_sizes.get('items'):
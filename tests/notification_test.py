@@ -0,0 +1,100 @@
+# -*- coding: utf-8; -*-
+#
+# This file is part of Superdesk.
+#
+# Copyright 2013 - 2018 Sourcefabric z.u. and contributors.
+#
+# For the full copyright and license information, please see the
+# AUTHORS and LICENSE files distributed with this source code, or
+# at https://www.sourcefabric.org/superdesk/license
+
+import json
+import time
+import flask
+import unittest
+
+from superdesk.notification import push_notification, flush_notifications, BATCH_EVENT
+from superdesk.tests import NotificationMock
+
+
+class NotificationBufferTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.app = flask.Flask(__name__)
+        self.app.config['NOTIFICATION_BUFFER_SIZE'] = 3
+        self.app.teardown_appcontext(flush_notifications)
+        self.app.notification_client = NotificationMock()
+
+    def test_notifications_are_merged(self):
+        with self.app.app_context():
+            push_notification('content:update', user='foo', items={'a': 1}, desks={'sports': 1})
+            push_notification('content:update', user='foo', items={'b': 1}, desks={'news': 1})
+            push_notification('item:lock', item='a')
+            self.assertEqual([], self.app.notification_client.messages)
+
+        self.assertEqual(1, len(self.app.notification_client.messages))
+        batch = json.loads(self.app.notification_client.messages[0])
+        self.assertEqual(BATCH_EVENT, batch['event'])
+        self.assertEqual(['content:update', 'item:lock'], [message['event'] for message in batch['messages']])
+
+        content_update = json.loads(batch['messages'][0]['message'])
+        self.assertEqual('content:update', content_update['event'])
+        self.assertEqual({'a': 1, 'b': 1}, content_update['extra']['items'])
+        self.assertEqual({'sports': 1, 'news': 1}, content_update['extra']['desks'])
+        self.assertEqual('foo', content_update['extra']['user'])
+        self.assertEqual(['news', 'sports'], batch['messages'][0]['topics']['desks'])
+
+    def test_single_notification_is_not_batched(self):
+        with self.app.app_context():
+            push_notification('item:lock', item='a')
+            push_notification('item:lock', item='a')
+
+        self.assertEqual(1, len(self.app.notification_client.messages))
+        message = json.loads(self.app.notification_client.messages[0])
+        self.assertEqual('item:lock', message['event'])
+        self.assertEqual({'item': 'a'}, message['extra'])
+
+    def test_item_ids_are_merged(self):
+        with self.app.app_context():
+            push_notification('item:updated', item='a', user='foo')
+            push_notification('item:updated', item='b', user='foo')
+            push_notification('item:updated', item='a', user='foo')
+            push_notification('item:updated', item='c', user='bar')
+            push_notification('item:move', item='d', from_desk='x', to_desk='y', desk=['x', 'y'])
+            push_notification('item:move', item='e', from_desk='x', to_desk='y', desk=['y', 'z'])
+
+        batch = json.loads(self.app.notification_client.messages[0])
+        messages = [json.loads(message['message']) for message in batch['messages']]
+        self.assertEqual(3, len(messages))
+        self.assertEqual({'item': ['a', 'b'], 'user': 'foo'}, messages[0]['extra'])
+        self.assertEqual({'item': 'c', 'user': 'bar'}, messages[1]['extra'])
+        self.assertEqual(['d', 'e'], messages[2]['extra']['item'])
+        self.assertEqual(['x', 'y', 'z'], messages[2]['extra']['desk'])
+        self.assertEqual(['x', 'y', 'z'], batch['messages'][2]['topics']['desks'])
+
+    def test_buffer_is_flushed_when_full(self):
+        with self.app.app_context():
+            for i in range(4):
+                push_notification('item:lock', item='a', user=str(i))
+            self.assertEqual(1, len(self.app.notification_client.messages))
+            self.assertEqual(3, len(json.loads(self.app.notification_client.messages[0])['messages']))
+        self.assertEqual(2, len(self.app.notification_client.messages))
+
+    def test_notifications_are_not_buffered_by_default(self):
+        self.app.config['NOTIFICATION_BUFFER_SIZE'] = 0
+        with self.app.app_context():
+            push_notification('item:lock', item='a')
+            self.assertEqual(1, len(self.app.notification_client.messages))
+
+    def test_buffer_is_flushed_on_timeout(self):
+        self.app.config['NOTIFICATION_BUFFER_TIME'] = 0.1
+        with self.app.app_context():
+            push_notification('item:lock', item='a')
+            for i in range(50):
+                if self.app.notification_client.messages:
+                    break
+                time.sleep(0.1)
+            self.assertEqual(1, len(self.app.notification_client.messages))
+            push_notification('item:lock', item='b')
+            self.assertEqual(1, len(self.app.notification_client.messages))
+        self.assertEqual(2, len(self.app.notification_client.messages))
@@ -0,0 +1,63 @@
+# -*- coding: utf-8; -*-
+#
+# This file is part of Superdesk.
+#
+# Copyright 2013 - 2018 Sourcefabric z.u. and contributors.
+#
+# For the full copyright and license information, please see the
+# AUTHORS and LICENSE files distributed with this source code, or
+# at https://www.sourcefabric.org/superdesk/license
+
+import sys
+import unittest
+
+from collections import Counter
+from unittest import mock
+from superdesk.tests import TestCase
+from superdesk.profiling import dump_samples
+from superdesk.profiling.sampler import Sampler, fold_stack
+from superdesk.profiling.service import ProfilingService, get_samples_collection
+
+
+class SamplerTestCase(unittest.TestCase):
+
+    def test_fold_stack(self):
+        stack = fold_stack(sys._getframe()).split(';')
+        self.assertEqual('tests.profiling_test:test_fold_stack', stack[-1])
+        self.assertGreater(len(stack), 1)
+
+    def test_sample_blocks(self):
+        sampler = Sampler(3600, 3600, None)
+        sampler.start_block('outer')
+        sampler.sample()
+        sampler.start_block('inner')
+        sampler.sample()
+        sampler.sample()
+        sampler.end_block()
+        sampler.end_block()
+        sampler.sample()
+
+        stacks = sampler.pop_stacks()
+        self.assertEqual(['inner', 'outer'], sorted(stacks))
+        self.assertEqual(1, sum(stacks['outer'].values()))
+        self.assertEqual(2, sum(stacks['inner'].values()))
+        self.assertTrue(all(':test_sample_blocks;' in stack for stack in stacks['inner']))
+        self.assertEqual({}, sampler.pop_stacks())
+        self.assertEqual({}, sampler.blocks)
+
+
+class DumpSamplesTestCase(TestCase):
+
+    def test_dump_samples_increments_stacks(self):
+        long_stack = ';'.join(['module:func'] * 500)
+        with mock.patch('superdesk.profiling.get_resource_service') as get_service:
+            get_service.return_value.find_one.side_effect = [None, {'_id': 'foo'}, {'_id': 'bar'}]
+            dump_samples(Counter({'a;b': 2, long_stack: 1}), 'foo')
+            dump_samples(Counter({'a;b': 3}), 'foo')
+            dump_samples(Counter({'a;b': 1}), 'bar')
+        self.assertEqual(1, get_service.return_value.post.call_count)
+        doc = {'_id': 'foo'}
+        with mock.patch.dict(self.app.config, {'PROFILING_MAX_STACKS': 1}):
+            ProfilingService().on_fetched_item(doc)
+        self.assertEqual('a;b 5', doc['folded'])
+        self.assertEqual(3, get_samples_collection().count())
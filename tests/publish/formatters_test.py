@@ -0,0 +1,71 @@
+# -*- coding: utf-8; -*-
+#
+# This file is part of Superdesk.
+#
+# Copyright 2013 - 2018 Sourcefabric z.u. and contributors.
+#
+# For the full copyright and license information, please see the
+# AUTHORS and LICENSE files distributed with this source code, or
+# at https://www.sourcefabric.org/superdesk/license
+
+import unittest
+
+from superdesk.publish import formatters
+from superdesk.publish.formatters import Formatter, get_formatter, get_all_formatters, is_reusable
+from superdesk.publish.formatters.nitf_formatter import NITFFormatter
+from superdesk.publish.formatters.ninjs_formatter import NINJSFormatter
+from superdesk.publish.formatters.ninjs_newsroom_formatter import NewsroomNinjsFormatter
+
+
+class FormattersTestCase(unittest.TestCase):
+
+    def setUp(self):
+        # formatters defined in tests are registered, so restore registry afterwards
+        registered = list(formatters.formatters)
+        instances = dict(formatters._instances)
+
+        def restore():
+            formatters.formatters[:] = registered
+            formatters._instances.clear()
+            formatters._instances.update(instances)
+            formatters._candidates.clear()
+
+        self.addCleanup(restore)
+
+    def test_get_formatter_by_format_type(self):
+        self.assertIs(NINJSFormatter, type(get_formatter('ninjs', {'type': 'text'})))
+        self.assertIs(NewsroomNinjsFormatter, type(get_formatter('newsroom ninjs', {'type': 'text'})))
+        self.assertIs(NITFFormatter, type(get_formatter('nitf', {'type': 'text'})))
+        self.assertIsNone(get_formatter('nitf', {'type': 'picture'}))
+        self.assertIsNone(get_formatter('foo', {'type': 'text'}))
+
+    def test_get_formatter_dynamic(self):
+
+        class DynamicFormatter(Formatter):
+
+            instances = 0
+
+            def __init__(self):
+                super().__init__()
+                DynamicFormatter.instances += 1
+
+            def can_format(self, format_type, article):
+                return format_type == 'dynamic' and article.get('dynamic')
+
+        formatter = get_formatter('dynamic', {'type': 'text', 'dynamic': True})
+        self.assertIsInstance(formatter, DynamicFormatter)
+        self.assertIsNone(get_formatter('dynamic', {'type': 'text'}))
+        self.assertIsNot(formatter, get_formatter('dynamic', {'type': 'text', 'dynamic': True}))
+        self.assertEqual(1, DynamicFormatter.instances)
+        self.assertFalse(is_reusable(formatter))
+
+    def test_formatter_state_is_not_shared(self):
+        formatter = get_formatter('nitf', {'type': 'text'})
+        formatter.set_destination({'name': 'foo'}, {'_id': 'sub'})
+        self.assertIsNone(get_formatter('nitf', {'type': 'text'}).destination)
+        self.assertTrue(all(f.destination is None for f in get_all_formatters() if isinstance(f, NITFFormatter)))
+
+    def test_reusable_is_not_inherited(self):
+        self.assertTrue(is_reusable(NINJSFormatter()))
+        self.assertTrue(is_reusable(NITFFormatter()))
+        self.assertFalse(is_reusable(NewsroomNinjsFormatter()))
@@ -10,9 +10,12 @@
 
 
 import os
+import flask
 import unittest
 import ftplib
 
+from unittest import mock
+from superdesk.ftp import ftp_connect, FTPConnectionPool
 from superdesk.publish.transmitters.ftp import FTPPublishService
 
 
@@ -48,3 +51,52 @@ class FTPPublishTestCase(unittest.TestCase):
 
         service._transmit(self.item, destination={'config': config})
         self.assertTrue(self.is_item_loaded(config, 'abc.ntf'))
+
+
+class FTPConnectionPoolTestCase(unittest.TestCase):
+
+    config = {'host': 'example.com', 'username': 'foo', 'password': 'bar', 'path': 'test'}
+
+    def setUp(self):
+        self.app = flask.Flask(__name__)
+
+    def new_connection(self, *args, **kwargs):
+        return mock.MagicMock()
+
+    @mock.patch('superdesk.ftp.ftplib.FTP')
+    def test_connection_is_reused(self, ftp_mock):
+        ftp_mock.side_effect = self.new_connection
+        pool = FTPConnectionPool()
+        with self.app.app_context():
+            with mock.patch('superdesk.ftp.ftp_pool', pool):
+                with ftp_connect(self.config, pooled=True) as ftp:
+                    ftp.storbinary('STOR foo', None)
+                with ftp_connect(self.config, pooled=True) as ftp:
+                    ftp.storbinary('STOR bar', None)
+        self.assertEqual(1, ftp_mock.call_count)
+        ftp.cwd.assert_called_with(ftp.superdesk_path)
+        ftp.close.assert_not_called()
+
+    @mock.patch('superdesk.ftp.ftplib.FTP')
+    def test_broken_connection_is_replaced(self, ftp_mock):
+        ftp_mock.side_effect = self.new_connection
+        pool = FTPConnectionPool()
+        with self.app.app_context():
+            ftp = pool.get(self.config)
+            pool.put(self.config, ftp)
+            ftp.cwd.side_effect = ftplib.error_temp('421 timeout')
+            self.assertIsNot(ftp, pool.get(self.config))
+        ftp.close.assert_called_once_with()
+        self.assertEqual(2, ftp_mock.call_count)
+
+    @mock.patch('superdesk.ftp.ftplib.FTP')
+    def test_connection_is_closed_on_error(self, ftp_mock):
+        ftp_mock.side_effect = self.new_connection
+        pool = FTPConnectionPool()
+        with self.app.app_context():
+            with mock.patch('superdesk.ftp.ftp_pool', pool):
+                with self.assertRaises(ftplib.error_perm):
+                    with ftp_connect(self.config, pooled=True) as ftp:
+                        raise ftplib.error_perm('550')
+            ftp.close.assert_called_once_with()
+            self.assertIsNot(ftp, pool.get(self.config))
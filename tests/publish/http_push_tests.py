@@ -18,7 +18,7 @@ import unittest
 import requests
 
 from superdesk.publish import SUBSCRIBER_TYPES
-from superdesk.publish.transmitters.http_push import HTTPPushService
+from superdesk.publish.transmitters.http_push import HTTPPushService, HTTPSessionPool
 
 from unittest import mock
 from unittest.mock import Mock
@@ -151,7 +151,7 @@ class HTTPPushPublishTestCase(unittest.TestCase):
         self.assertEqual(item['version'], 2)
 
     @mock.patch('superdesk.errors.notifiers')
-    @mock.patch('requests.post')
+    @mock.patch('requests.Session.post')
     def test_client_publish_error_thrown(self, fake_post, fake_notifiers):
         with self.app.app_context():
             raise_http_exception = Mock(side_effect=PublishHTTPPushClientError.httpPushError(Exception('client 4xx')))
@@ -168,7 +168,7 @@ class HTTPPushPublishTestCase(unittest.TestCase):
                 service._push_item(self.destination, json.dumps(self.item))
 
     @mock.patch('superdesk.errors.notifiers')
-    @mock.patch('requests.post')
+    @mock.patch('requests.Session.post')
     def test_server_publish_error_thrown(self, fake_post, fake_notifiers):
         with self.app.app_context():
             raise_http_exception = Mock(side_effect=PublishHTTPPushServerError.httpPushError(Exception('server 5xx')))
@@ -186,7 +186,7 @@ class HTTPPushPublishTestCase(unittest.TestCase):
 
     @mock.patch('superdesk.publish.transmitters.http_push.app')
     @mock.patch('superdesk.publish.transmitters.http_push.requests.Session.send', return_value=CreatedResponse)
-    @mock.patch('requests.get', return_value=NotFoundResponse)
+    @mock.patch('requests.Session.get', return_value=NotFoundResponse)
     def test_push_associated_assets(self, get_mock, send_mock, app_mock):
         app_mock.media.get.return_value = TestMedia(b'bin')
 
@@ -215,7 +215,7 @@ class HTTPPushPublishTestCase(unittest.TestCase):
 
     @mock.patch('superdesk.publish.transmitters.http_push.app')
     @mock.patch('superdesk.publish.transmitters.http_push.requests.Session.send', return_value=CreatedResponse)
-    @mock.patch('requests.get', return_value=NotFoundResponse)
+    @mock.patch('requests.Session.get', return_value=NotFoundResponse)
     def test_push_attachments(self, get_mock, send_mock, app_mock):
         app_mock.media.get.return_value = TestMedia(b'bin')
 
@@ -243,7 +243,7 @@ class HTTPPushPublishTestCase(unittest.TestCase):
                          'sha1=%s' % hmac.new(b'foo', request.body, 'sha1').hexdigest())
 
     @mock.patch('superdesk.publish.transmitters.http_push.requests.Session.send', return_value=CreatedResponse)
-    @mock.patch('requests.get', return_value=NotFoundResponse)
+    @mock.patch('requests.Session.get', return_value=NotFoundResponse)
     def test_push_binaries(self, get_mock, send_mock):
         media = TestMedia(b'content')
         dest = {'config': {'assets_url': 'http://example.com', 'secret_token': 'foo'}}
@@ -254,3 +254,16 @@ class HTTPPushPublishTestCase(unittest.TestCase):
         request = send_mock.call_args[0][0]
         self.assertEqual('http://example.com/', request.url)
         self.assertIn(b'content', request.body)
+
+    def test_session_pool(self):
+        pool = HTTPSessionPool()
+        session = pool.get(self.destination)
+        self.assertIs(session, pool.get(self.destination))
+        self.assertIsNot(session, pool.get({'config': {'resource_url': 'http://example.com'}}))
+
+        with self.app.app_context(), mock.patch.dict(self.app.config, {'HTTP_PUSH_MAX_SESSIONS': 1}):
+            with mock.patch.object(session, 'close') as close:
+                pool.get({'config': {'resource_url': 'http://example.com'}})
+            self.assertFalse(close.called, 'session might be used by other thread')
+        self.assertIsNot(session, pool.get(self.destination))
+        pool.clear()
@@ -380,3 +380,25 @@ class TransmitItemTestCase(TestCase):
         pending_item = self.app.data.find_one('publish_queue', req=None, _id=items[1].get('_id'))
         self.assertEqual(pending_item['state'], 'pending')
         self.app.config['CELERY_TASK_ALWAYS_EAGER'] = True
+
+    @mock.patch('superdesk.publish.registered_transmitters')
+    def test_transmit_destinations_in_parallel(self, *mocks):
+        self.app.config['MAX_TRANSMIT_THREADS'] = 2
+        subscriber_id = ObjectId()
+        items = [{'_id': ObjectId(), 'state': 'pending', 'item_id': 'item_%d' % i, 'item_version': 1,
+                  'headline': 'headline', 'published_seq_num': i, 'subscriber_id': subscriber_id,
+                  'destination': {'delivery_type': 'ftp', 'name': 'ftp%d' % (i % 2)}, 'formatted_item': 'test'}
+                 for i in range(6)]
+        self.app.data.insert('publish_queue', items)
+
+        transmitted = []
+        fake_transmitter = MagicMock()
+        fake_transmitter.transmit.side_effect = lambda queue_item: transmitted.append(
+            (queue_item['destination']['name'], queue_item['published_seq_num']))
+        mocks[0].__getitem__.return_value = fake_transmitter
+
+        superdesk.publish.publish_content.transmit_destinations_items(items)
+
+        self.assertEqual([0, 2, 4], [seq for name, seq in transmitted if name == 'ftp0'])
+        self.assertEqual([1, 3, 5], [seq for name, seq in transmitted if name == 'ftp1'])
+        self.assertGreaterEqual(superdesk.publish.publish_content.transmit_metrics['ftp0']['items'], 3)
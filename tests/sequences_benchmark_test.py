@@ -0,0 +1,47 @@
+import time
+import logging
+
+from unittest.mock import patch
+from superdesk import get_resource_service
+from superdesk.tests import TestCase
+
+logger = logging.getLogger(__name__)
+
+SUBSCRIBERS = 200
+ITEMS = 20
+BLOCK_SIZE = 10
+
+
+class SequencesBenchmarkTestCase(TestCase):
+
+    def setUp(self):
+        self.subscribers = [{'_id': 'subscriber-%d' % i, 'name': 'subscriber-%d' % i} for i in range(SUBSCRIBERS)]
+        self.sequences = get_resource_service('sequences')
+        self.sequences.release_blocks()
+
+    def publish(self):
+        """Generate sequence numbers like publishing of items to all subscribers does."""
+        subscribers_service = get_resource_service('subscribers')
+        numbers = []
+        with patch.object(self.sequences, 'find_and_modify', wraps=self.sequences.find_and_modify) as find_and_modify:
+            start = time.time()
+            for i in range(ITEMS):
+                self.sequences.get_next_sequence_number('published_seq')
+                numbers.extend(subscribers_service.generate_sequence_number(subscriber)
+                               for subscriber in self.subscribers)
+            elapsed = time.time() - start
+        return numbers, find_and_modify.call_count, elapsed
+
+    def test_publish_sequence_numbers(self):
+        numbers, round_trips, elapsed = self.publish()
+        self.assertEqual(ITEMS * (SUBSCRIBERS + 1), round_trips)
+        logger.info('%d sequence numbers for %d subscribers took %.3fs and %d round trips',
+                    len(numbers), SUBSCRIBERS, elapsed, round_trips)
+
+        self.sequences.release_blocks()
+        with patch.dict(self.app.config, {'SEQUENCE_BLOCK_SIZE': BLOCK_SIZE}):
+            block_numbers, round_trips, elapsed = self.publish()
+        self.assertEqual(ITEMS * (SUBSCRIBERS + 1) / BLOCK_SIZE, round_trips)
+        self.assertEqual([number + ITEMS for number in numbers], block_numbers)
+        logger.info('%d block sequence numbers for %d subscribers took %.3fs and %d round trips',
+                    len(block_numbers), SUBSCRIBERS, elapsed, round_trips)
@@ -9,6 +9,7 @@
 # at https://www.sourcefabric.org/superdesk/license
 
 
+from unittest.mock import patch
 from superdesk import get_resource_service
 from superdesk.tests import TestCase
 from nose.tools import assert_raises
@@ -19,6 +20,7 @@ class SequencesTestCase(TestCase):
     def setUp(self):
         with self.app.app_context():
             self.service = get_resource_service('sequences')
+            self.service.release_blocks()
         self.min_seq_number = 1
         self.max_seq_number = 10
 
@@ -55,3 +57,27 @@ class SequencesTestCase(TestCase):
                 min_seq_number=self.min_seq_number
             )
             self.assertEqual(last_sequence_number, self.min_seq_number)
+
+    def test_block_sequence_numbers(self):
+        with patch.dict(self.app.config, {'SEQUENCE_BLOCK_SIZE': 5}), self.app.app_context():
+            with patch.object(self.service, 'find_and_modify', wraps=self.service.find_and_modify) as find_and_modify:
+                numbers = [self.service.get_next_sequence_number('test_sequence_1') for i in range(12)]
+            self.assertEqual(list(range(1, 13)), numbers)
+            self.assertEqual(3, find_and_modify.call_count)
+
+    def test_rotate_block_sequence_number(self):
+        with patch.dict(self.app.config, {'SEQUENCE_BLOCK_SIZE': 4}), self.app.app_context():
+            numbers = [self.service.get_next_sequence_number(
+                'test_sequence_1',
+                max_seq_number=self.max_seq_number,
+                min_seq_number=self.min_seq_number
+            ) for i in range(self.max_seq_number + 2)]
+            self.assertEqual(list(range(1, self.max_seq_number + 1)) + [1, 2], numbers)
+
+    def test_gapless_sequence_number(self):
+        config = {'SEQUENCE_BLOCK_SIZE': 5, 'SEQUENCE_GAPLESS_KEYS': ['test_sequence_2']}
+        with patch.dict(self.app.config, config), self.app.app_context():
+            self.service.get_next_sequence_number('test_sequence_1', gapless=True)
+            self.service.get_next_sequence_number('test_sequence_2')
+            self.assertEqual(1, self.app.data.find_one('sequences', req=None, key='test_sequence_1')['sequence_number'])
+            self.assertEqual(1, self.app.data.find_one('sequences', req=None, key='test_sequence_2')['sequence_number'])
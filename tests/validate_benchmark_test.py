@@ -0,0 +1,64 @@
+import time
+import logging
+
+from unittest.mock import patch
+from apps.validate.validate import ValidateService, validator_cache
+from superdesk import get_resource_service
+from superdesk.tests import TestCase
+
+logger = logging.getLogger(__name__)
+
+PACKAGES = 10
+PACKAGE_ITEMS = 50
+
+
+class ValidateBenchmarkTestCase(TestCase):
+
+    def setUp(self):
+        self.app.data.insert('vocabularies', [
+            {'_id': 'extra%d' % i, 'field_type': 'text', 'display_name': 'Extra %d' % i, 'items': []}
+            for i in range(5)
+        ])
+        schema = {
+            'headline': {'required': True, 'type': 'string', 'maxlength': 64},
+            'slugline': {'required': True, 'type': 'string', 'maxlength': 24},
+            'abstract': {'required': False, 'type': 'string', 'maxlength': 160},
+            'body_html': {'required': True, 'type': 'string', 'minlength': 10},
+            'subject': {'required': True, 'type': 'list'},
+        }
+        schema.update({'extra%d' % i: {'required': False, 'type': 'text', 'maxlength': 20} for i in range(5)})
+        self.app.data.insert('content_types', [{'_id': 'story', 'schema': schema}])
+        self.items = [{
+            'act': 'publish',
+            'type': 'text',
+            'validate': {
+                'profile': 'story',
+                'headline': 'headline %d' % i,
+                'slugline': 'slugline',
+                'body_html': '<p>body of item %d</p>' % i,
+                'subject': [{'qcode': '01000000', 'name': 'arts', 'scheme': 'extra1'}],
+            },
+        } for i in range(PACKAGE_ITEMS)]
+
+    def validate_packages(self):
+        """Validate package items like publishing of packages does."""
+        service = ValidateService()
+        vocabularies = get_resource_service('vocabularies')
+        with patch.object(vocabularies, 'get_extra_fields', wraps=vocabularies.get_extra_fields) as extra_fields:
+            start = time.time()
+            for i in range(PACKAGES):
+                errors = service.create(self.items)
+            elapsed = time.time() - start
+        self.assertEqual([[]] * PACKAGE_ITEMS, errors)
+        return PACKAGES * PACKAGE_ITEMS / elapsed, extra_fields.call_count
+
+    def test_validate_packages(self):
+        throughput, queries = self.validate_packages()
+        self.assertEqual(PACKAGES * PACKAGE_ITEMS, queries)
+        logger.info('validated %.1f items/s without cache, %d items per package', throughput, PACKAGE_ITEMS)
+
+        with patch.dict(self.app.config, {'VALIDATOR_CACHE_TTL': 60}):
+            validator_cache.clear()
+            throughput, queries = self.validate_packages()
+        self.assertEqual(1, queries)
+        logger.info('validated %.1f items/s with cache, %d items per package', throughput, PACKAGE_ITEMS)
@@ -1,9 +1,10 @@
 
+import json
 import asyncio
 import unittest
 from json import dumps
 from datetime import datetime, timedelta
-from superdesk.websockets_comms import SocketCommunication
+from superdesk.websockets_comms import SocketCommunication, get_subscription, get_topics
 
 
 class TestClient():
@@ -12,10 +13,31 @@ class TestClient():
         self.open = True
         self.messages = []
 
+    @asyncio.coroutine
     def send(self, message):
         self.messages.append(message)
 
 
+class SlowClient(TestClient):
+
+    @asyncio.coroutine
+    def send(self, message):
+        yield from asyncio.sleep(0.1)
+        self.messages.append(message)
+
+
+class FailingClient(TestClient):
+
+    @asyncio.coroutine
+    def send(self, message):
+        raise RuntimeError('closed')
+
+
+def broadcast(loop, com, message):
+    loop.run_until_complete(com.broadcast(message))
+    loop.run_until_complete(com.drain())
+
+
 class WebsocketsTestCase(unittest.TestCase):
 
     def test_broadcast(self):
@@ -23,29 +45,126 @@ class WebsocketsTestCase(unittest.TestCase):
         asyncio.set_event_loop(loop)
         client = TestClient()
         com = SocketCommunication('host', 'port', 'url')
-        com.clients.add(client)
+        com.add_client(client)
 
-        loop.run_until_complete(com.broadcast(dumps({
+        broadcast(loop, com, dumps({
             'event': 'ingest:update',
-            '_created': datetime.now().isoformat()})))
+            '_created': datetime.now().isoformat()}))
         self.assertEqual(1, len(client.messages))
 
-        loop.run_until_complete(com.broadcast(dumps({
+        broadcast(loop, com, dumps({
             'event': 'ingest:update',
-            '_created': datetime.now().isoformat()})))
+            '_created': datetime.now().isoformat()}))
         self.assertEqual(1, len(client.messages))
 
-        loop.run_until_complete(com.broadcast(dumps({
+        broadcast(loop, com, dumps({
             'event': 'foo',
-            '_created': datetime.now().isoformat()})))
+            '_created': datetime.now().isoformat()}))
         self.assertEqual(2, len(client.messages))
 
-        loop.run_until_complete(com.broadcast(dumps({
+        broadcast(loop, com, dumps({
             'event': 'foo',
-            '_created': datetime.now().isoformat()})))
+            '_created': datetime.now().isoformat()}))
         self.assertEqual(3, len(client.messages))
 
-        loop.run_until_complete(com.broadcast(dumps({
+        broadcast(loop, com, dumps({
             'event': 'ingest:update',
-            '_created': (datetime.now() + timedelta(seconds=3600)).isoformat()})))
+            '_created': (datetime.now() + timedelta(seconds=3600)).isoformat()}))
         self.assertEqual(4, len(client.messages))
+
+    def test_broadcast_batch(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        client = TestClient()
+        com = SocketCommunication('host', 'port', 'url')
+        com.add_client(client)
+
+        created = datetime.now().isoformat()
+        messages = [
+            dumps({'event': 'foo', '_created': created, 'extra': {'item': 'a'}}),
+            dumps({'event': 'bar', '_created': created}),
+        ]
+        broadcast(loop, com, dumps({
+            'event': 'batch',
+            '_created': created,
+            'messages': [{'event': 'foo', '_created': created, 'message': messages[0]},
+                         {'event': 'bar', '_created': created, 'message': messages[1]}],
+        }))
+        self.assertEqual(messages, client.messages)
+
+    def test_slow_client_drops_oldest_messages(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        client = TestClient()
+        slow_client = SlowClient()
+        failing_client = FailingClient()
+        com = SocketCommunication('host', 'port', 'url', queue_size=2)
+        com.add_client(slow_client)
+        com.add_client(failing_client)
+        com.add_client(client)
+
+        messages = [dumps({'event': 'foo', 'extra': {'i': i}}) for i in range(5)]
+        for message in messages:
+            loop.run_until_complete(com.broadcast(message))
+        loop.run_until_complete(asyncio.sleep(0.01))
+        self.assertEqual(messages, client.messages)
+        self.assertEqual([], slow_client.messages)
+
+        loop.run_until_complete(com.drain())
+        self.assertEqual([messages[0], messages[3], messages[4]], slow_client.messages)
+
+        metrics = com.get_metrics()
+        self.assertEqual(3, metrics['clients'])
+        self.assertEqual(0, metrics['queued'])
+        self.assertEqual(5, metrics['failed'])
+        self.assertEqual(len(messages) - len(slow_client.messages), metrics['dropped'])
+        self.assertEqual(len(messages) + len(slow_client.messages), metrics['sent'])
+
+    def test_topic_subscriptions(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        client = TestClient()
+        desk_client = TestClient()
+        user_client = TestClient()
+        com = SocketCommunication('host', 'port', 'url')
+        com.add_client(client, get_subscription('/'))
+        com.add_client(desk_client, get_subscription('/?desks=d1,d3'))
+        com.add_client(user_client, get_subscription('/?events=activity&users=u1'))
+
+        broadcast(loop, com, dumps({'event': 'content:update', 'extra': {'desks': {'d1': 1, 'd2': 1}}}))
+        broadcast(loop, com, dumps({'event': 'content:update', 'extra': {'desks': {'d2': 1}}}))
+        broadcast(loop, com, dumps({'event': 'foo'}))
+        broadcast(loop, com, dumps({'event': 'activity', 'extra': {'_dest': [{'user_id': 'u2'}]}}))
+        broadcast(loop, com, dumps({'event': 'activity', 'extra': {'_dest': [{'user_id': 'u1'}]}}))
+        self.assertEqual(5, len(client.messages))
+        self.assertEqual(['content:update', 'foo', 'activity', 'activity'],
+                         [json.loads(message)['event'] for message in desk_client.messages])
+        self.assertEqual([{'_dest': [{'user_id': 'u1'}]}],
+                         [json.loads(message)['extra'] for message in user_client.messages])
+
+        message = dumps({'event': 'item:move', 'extra': {'from_desk': 'd2', 'to_desk': 'd3'}})
+        broadcast(loop, com, dumps({
+            'event': 'batch',
+            'messages': [{'event': 'item:move', 'message': message,
+                          'topics': get_topics('item:move', {'from_desk': 'd2', 'to_desk': 'd3'})}],
+        }))
+        self.assertEqual(message, desk_client.messages[-1])
+        self.assertEqual(6, len(client.messages))
+        self.assertEqual(1, len(user_client.messages))
+
+        com.remove_client(desk_client, get_subscription('/?desks=d1,d3'))
+        self.assertEqual({}, com.topic_clients['desks'])
+        self.assertEqual({client, user_client}, com.topic_wildcards['desks'])
+
+    def test_get_topics(self):
+        self.assertEqual({
+            'events': ['content:update'],
+            'resources': ['content'],
+            'desks': ['d1', 'd2'],
+        }, get_topics('content:update', {'user': 'u1', 'desks': {'d1': 1}, 'desk_id': 'd2', 'stages': {'s1': 1}}))
+        self.assertEqual({
+            'events': ['activity'],
+            'resources': ['activity'],
+            'desks': ['d1'],
+            'users': ['u1'],
+        }, get_topics('activity', {'_dest': [{'user_id': 'u1'}, {'desk_id': 'd1'}]}))